@@ -0,0 +1,8 @@
+"""
+Service API de scoring crédit en ligne
+"""
+
+from .batcher import MicroBatcher
+from .rate_limiter import RateLimiter
+
+__all__ = ['MicroBatcher', 'RateLimiter']
@@ -0,0 +1,352 @@
+"""
+🌐 API DE SCORING CRÉDIT
+=======================
+
+Service FastAPI lancé par `python main.py run-api` (uvicorn api_service.app:app).
+
+Endpoints:
+    POST /v1/score        Score d'une demande (regroupée en micro-lots)
+    POST /v1/score/batch  Lot de demandes : tableau JSON, ou NDJSON
+                          (Content-Type: application/x-ndjson) validé à la
+                          lecture et renvoyé en flux, ligne à ligne ; un
+                          jeton de rate limiting par demande du lot, lots
+                          de plus de max_batch_items demandes refusés (413)
+    GET  /v1/model        Modèle courant et modèles disponibles
+    GET  /health          État du service
+
+Les demandes sont traduites par le CreditScoringProcessor de l'application
+Streamlit dans le schéma brut des données d'entraînement, puis passent par le
+pipeline d'entrée du modèle (plan de nettoyage, graphe de scoring compilé) du
+registre partagé du processus. Une erreur de scoring renvoie une erreur 5xx
+(503 sans modèle) : l'API ne simule jamais de prédiction. Le scoring, lié au
+CPU, s'exécute dans un pool de threads hors de la boucle d'événements.
+
+Test local sans serveur :
+    from fastapi.testclient import TestClient
+    from api_service.app import create_app
+    with TestClient(create_app()) as client:
+        client.post("/v1/score", json={"Age": 35, "Credit_amount": 5000})
+
+Auteur: Équipe Data Science
+Version: 1.0.0
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+from functools import partial
+from pathlib import Path
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import yaml
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+
+# Accès aux modules du projet (src/) et de l'application Streamlit (utils/, config/)
+PROJECT_ROOT = Path(__file__).parent.parent
+for path in (PROJECT_ROOT, PROJECT_ROOT / "streamlit_app"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from utils.data_processor import CreditScoringProcessor
+from utils.model_registry import get_model_registry
+
+from .batcher import MicroBatcher
+from .rate_limiter import RateLimiter
+
+logger = logging.getLogger("api_service")
+
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Sections détaillées du résultat, omises si response_format.include_explanations est désactivé
+_EXPLANATION_KEYS = ['profile_analysis', 'recommendations', 'business_interpretation']
+
+
+class ClientApplication(BaseModel):
+    """Demande de crédit (champs du formulaire ; valeurs absentes = valeurs par défaut du processeur)"""
+
+    Age: Optional[int] = Field(None, description="Âge du client (18-100)")
+    Credit_amount: Optional[float] = Field(None, description="Montant du crédit")
+    Duration: Optional[int] = Field(None, description="Durée en mois (3-72)")
+    monthly_income: Optional[float] = Field(None, description="Revenu mensuel")
+    monthly_expenses: Optional[float] = Field(None, description="Charges mensuelles")
+    existing_debt: Optional[float] = Field(None, description="Dettes existantes")
+    Job: Optional[str] = None
+    Housing: Optional[str] = None
+    Saving_accounts: Optional[str] = None
+    Checking_account: Optional[str] = None
+    Purpose: Optional[str] = None
+    Sex: Optional[str] = None
+    current_credit_score: Optional[str] = None
+    payment_history: Optional[str] = None
+    marital_status: Optional[str] = None
+
+    def to_client_data(self) -> Dict[str, Any]:
+        return self.model_dump(exclude_none=True)
+
+
+def load_api_config(config_path: Optional[os.PathLike] = None) -> Dict[str, Any]:
+    """Section `api` du fichier de configuration"""
+    config_path = Path(config_path or DEFAULT_CONFIG_PATH)
+    if not config_path.exists():
+        logger.warning(f"⚠️ Configuration introuvable ({config_path}), valeurs par défaut utilisées")
+        return {}
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return (yaml.safe_load(f) or {}).get('api', {})
+
+
+def create_app(config: Optional[Dict[str, Any]] = None,
+               processor: Optional[CreditScoringProcessor] = None) -> FastAPI:
+    """
+    Construit l'application FastAPI
+
+    Args:
+        config: Section `api` de la configuration (lue depuis config/config.yaml si absente)
+        processor: Processeur de scoring (créé si absent)
+
+    Returns:
+        Application FastAPI
+    """
+    config = load_api_config() if config is None else config
+    batching = config.get('batching', {})
+    response_format = config.get('response_format', {})
+    include_metadata = response_format.get('include_metadata', True)
+    include_explanations = response_format.get('include_explanations', True)
+    max_batch_size = int(batching.get('max_batch_size', 64))
+
+    processor = processor or CreditScoringProcessor()
+    # Pas de simulation côté API : les erreurs de scoring remontent en 5xx
+    score_clients = partial(processor.process_clients_batch, strict=True)
+    executor = ThreadPoolExecutor(max_workers=int(batching.get('scoring_threads', 4)),
+                                  thread_name_prefix="scoring")
+    batcher = MicroBatcher(
+        score_clients,
+        max_batch_size=max_batch_size,
+        max_wait_ms=float(batching.get('max_wait_ms', 5)),
+        executor=executor
+    ) if batching.get('enabled', True) else None
+    rate_limiting = config.get('rate_limiting', {})
+    rate_limiter = RateLimiter(int(rate_limiting.get('requests_per_minute', 0)))
+    # Un lot plus grand que le seau d'un client ne pourrait jamais être accepté
+    max_batch_items = int(rate_limiting.get('max_batch_items', 1000))
+    if rate_limiter.enabled:
+        max_batch_items = min(max_batch_items, rate_limiter.requests_per_minute)
+    started_at = time.time()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if batcher is not None:
+            await batcher.start()
+        # Chargement du modèle au démarrage plutôt qu'à la première demande
+        try:
+            await asyncio.get_running_loop().run_in_executor(executor, get_model_registry().get)
+        except FileNotFoundError:
+            logger.warning("⚠️ Aucun modèle disponible, les demandes de scoring renverront 503")
+        logger.info("🚀 API de scoring démarrée")
+        yield
+        if batcher is not None:
+            await batcher.stop()
+        executor.shutdown(wait=True)
+        logger.info("⏹️ API de scoring arrêtée")
+
+    app = FastAPI(
+        title="Credit Scoring API",
+        description="Scoring de demandes de crédit (score sur 1000, classe de risque, décision)",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+    app.state.processor = processor
+    app.state.batcher = batcher
+    app.state.rate_limiter = rate_limiter
+
+    cors = config.get('cors', {})
+    if cors.get('enabled', False):
+        app.add_middleware(CORSMiddleware, allow_origins=cors.get('origins', ["*"]),
+                           allow_methods=["*"], allow_headers=["*"])
+
+    def charge(request: Request, cost: int = 1):
+        """Consomme `cost` jetons du client (identifié par X-API-Key ou adresse IP), 429 si épuisés"""
+        client = request.headers.get('x-api-key') or (request.client.host if request.client else 'anonymous')
+        allowed, retry_after = rate_limiter.acquire(client, cost)
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Limite de {rate_limiter.requests_per_minute} requêtes/minute atteinte",
+                headers={'Retry-After': str(max(1, int(retry_after + 0.999)))}
+            )
+
+    async def rate_limit(request: Request):
+        """Dépendance : un jeton par appel"""
+        charge(request)
+
+    def check_batch_size(count: int):
+        """413 si le lot dépasse max_batch_items demandes"""
+        if count > max_batch_items:
+            raise HTTPException(status_code=413,
+                                detail=f"Lot de plus de {max_batch_items} demandes ({count} reçues)")
+
+    def format_result(result: Dict[str, Any], started: float) -> Dict[str, Any]:
+        if not include_explanations:
+            result = {k: v for k, v in result.items() if k not in _EXPLANATION_KEYS}
+        if include_metadata:
+            result = {**result, 'metadata': {
+                'model_version': result.get('model_version'),
+                'latency_ms': round((time.perf_counter() - started) * 1000, 3)
+            }}
+        return result
+
+    async def score_batch(clients: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score un lot hors de la boucle d'événements, par paquets de max_batch_size"""
+        loop = asyncio.get_running_loop()
+        results = []
+        for start in range(0, len(clients), max_batch_size):
+            chunk = clients[start:start + max_batch_size]
+            results.extend(await loop.run_in_executor(executor, score_clients, chunk))
+        return results
+
+    @app.post("/v1/score", dependencies=[Depends(rate_limit)])
+    async def score(application: ClientApplication) -> Dict[str, Any]:
+        """Score d'une demande unique"""
+        started = time.perf_counter()
+        client_data = application.to_client_data()
+        if batcher is not None:
+            result = await batcher.submit(client_data)
+        else:
+            result = (await score_batch([client_data]))[0]
+        return format_result(result, started)
+
+    @app.post("/v1/score/batch")
+    async def score_batch_endpoint(request: Request):
+        """Score d'un lot : tableau JSON, ou flux NDJSON renvoyé en NDJSON (un jeton par demande)"""
+        if request.headers.get('content-type', '').startswith(NDJSON_MEDIA_TYPE):
+            items = await read_ndjson(request)
+            charge(request, max(1, len(items)))
+            return StreamingResponse(score_ndjson(items), media_type=NDJSON_MEDIA_TYPE)
+
+        started = time.perf_counter()
+        try:
+            payload = await request.json()
+            if not isinstance(payload, list):
+                raise ValueError("un tableau JSON de demandes est attendu")
+            check_batch_size(len(payload))
+            clients = [ClientApplication.model_validate(item).to_client_data() for item in payload]
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        charge(request, max(1, len(clients)))
+
+        results = await score_batch(clients)
+        return {
+            'count': len(results),
+            'results': [format_result(result, started) for result in results]
+        }
+
+    async def read_ndjson(request: Request) -> List[tuple]:
+        """
+        Lit le corps NDJSON par morceaux et valide chaque ligne à la volée
+
+        Le corps est lu entièrement avant la réponse : une réponse en flux
+        consomme elle-même les messages ASGI de la requête pour détecter la
+        déconnexion du client. La lecture s'arrête (413) au-delà de
+        max_batch_items lignes non vides.
+
+        Returns:
+            Liste (numéro de ligne, données client ou message d'erreur)
+        """
+        items: List[tuple] = []
+        buffer = b''
+        line_number = 0
+
+        def parse(raw: bytes):
+            nonlocal line_number
+            line_number += 1
+            if not raw.strip():
+                return
+            check_batch_size(len(items) + 1)
+            try:
+                items.append((line_number, ClientApplication.model_validate_json(raw).to_client_data()))
+            except ValidationError as e:
+                items.append((line_number, str(e)))
+
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            for raw in lines:
+                parse(raw)
+        if buffer:
+            parse(buffer)
+        return items
+
+    async def score_ndjson(items: List[tuple]) -> AsyncIterator[bytes]:
+        """Score par paquets de max_batch_size et renvoie une ligne par demande, dans l'ordre"""
+        for start in range(0, len(items), max_batch_size):
+            started = time.perf_counter()
+            chunk = items[start:start + max_batch_size]
+            valid = [item for _, item in chunk if isinstance(item, dict)]
+            scored = iter(await score_batch(valid))
+            for number, item in chunk:
+                if isinstance(item, dict):
+                    line = {'line': number, **format_result(next(scored), started)}
+                else:
+                    line = {'line': number, 'error': item}
+                yield (json.dumps(line, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+
+    @app.get("/v1/model", dependencies=[Depends(rate_limit)])
+    async def model_info() -> Dict[str, Any]:
+        """Modèle courant (chargé si nécessaire) et modèles disponibles"""
+        registry = get_model_registry()
+        loop = asyncio.get_running_loop()
+        try:
+            entry = await loop.run_in_executor(executor, registry.get)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+
+        return {
+            'version': entry['version'],
+            'path': str(entry['path']),
+            'model_type': entry['model_type'],
+            'metadata': entry['metadata'],
+            'n_features': len(entry['features']) if entry['features'] else 0,
+            'fast_scoring': entry['fast_scorer'] is not None,
+            'loaded_at': entry['loaded_at'].isoformat(),
+            'loaded_versions': registry.loaded_versions(),
+            'available_models': registry.loader.list_models()
+        }
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        """État du service (ne déclenche pas de chargement de modèle)"""
+        registry = get_model_registry()
+        entry = registry.current_entry()
+        input_pipeline = entry is not None and entry['scoring_graph'] is not None
+        return {
+            'status': 'ok' if input_pipeline else 'degraded',
+            'model_loaded': entry is not None,
+            'model_version': registry.current_version,
+            'input_pipeline': input_pipeline,
+            'uptime_seconds': round(time.time() - started_at, 1),
+            'batching': batcher.stats() if batcher is not None else None,
+            'rate_limit_per_minute': rate_limiter.requests_per_minute
+        }
+
+    @app.exception_handler(FileNotFoundError)
+    async def model_unavailable(request: Request, exc: FileNotFoundError):
+        logger.error(f"❌ Aucun modèle sur {request.url.path}: {str(exc)}")
+        return JSONResponse(status_code=503, content={'detail': f"Aucun modèle disponible: {str(exc)}"})
+
+    @app.exception_handler(Exception)
+    async def unexpected_error(request: Request, exc: Exception):
+        logger.error(f"❌ Erreur sur {request.url.path}: {str(exc)}")
+        return JSONResponse(status_code=500, content={'detail': f"Erreur de scoring: {str(exc)}"})
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,214 @@
+"""
+⏱️ MICRO-BATCHING - REGROUPEMENT DES DEMANDES DE SCORING
+=======================================================
+
+Les demandes unitaires concurrentes sont placées dans une file asyncio puis
+regroupées en micro-lots : un lot part dès qu'il atteint `max_batch_size`
+demandes ou que la plus ancienne attend depuis `max_wait_ms`, au premier des
+deux termes. Chaque lot donne lieu à un seul appel de la fonction de scoring
+(un seul `predict_proba`), exécuté hors de la boucle d'événements.
+
+Le délai ajouté est borné par `max_wait_ms` ; en contrepartie le coût fixe
+d'un appel au modèle est partagé par toutes les demandes du lot. Si le lot
+échoue, ses demandes sont rejouées une par une : seule la demande fautive
+reçoit l'erreur. La fonction de scoring doit donc lever ses erreurs plutôt
+que de renvoyer un résultat de repli (CreditScoringProcessor :
+`process_clients_batch(..., strict=True)`).
+
+Auteur: Équipe Data Science
+Version: 1.0.0
+"""
+
+import time
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    File de demandes regroupées en micro-lots.
+
+    Usage:
+        batcher = MicroBatcher(partial(processor.process_clients_batch, strict=True),
+                               max_batch_size=64, max_wait_ms=5)
+        await batcher.start()
+        result = await batcher.submit(client_data)
+        await batcher.stop()
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], Sequence[Any]],
+                 max_batch_size: int = 64, max_wait_ms: float = 5.0,
+                 max_queue_size: int = 10000,
+                 executor: Optional[Executor] = None):
+        """
+        Args:
+            process_batch: Fonction synchrone traitant une liste de demandes et
+                retournant un résultat par demande, dans le même ordre
+            max_batch_size: Taille maximale d'un lot
+            max_wait_ms: Attente maximale (ms) de la plus ancienne demande d'un lot
+            max_queue_size: Demandes en attente au-delà desquelles submit attend
+            executor: Pool d'exécution du scoring (pool de threads par défaut de la boucle)
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size doit être >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms doit être >= 0")
+
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self.executor = executor
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stats = {'requests': 0, 'batches': 0, 'errors': 0, 'batch_retries': 0,
+                       'full_batches': 0, 'scoring_seconds': 0.0, 'max_batch': 0}
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self):
+        """Démarre la tâche de regroupement (à appeler dans la boucle d'événements)"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker = asyncio.create_task(self._run())
+        logger.info(f"⏱️ Micro-batching démarré (lot max {self.max_batch_size}, "
+                    f"attente max {self.max_wait * 1000:.1f} ms)")
+
+    async def stop(self):
+        """Traite les demandes déjà en file puis arrête la tâche"""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        logger.info("⏹️ Micro-batching arrêté")
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Soumet une demande et attend son résultat
+
+        Args:
+            item: Demande unitaire (ex: données de formulaire d'un client)
+
+        Returns:
+            Résultat de process_batch pour cette demande
+
+        Raises:
+            RuntimeError: Si le batcher n'est pas démarré
+            Exception: Erreur levée par process_batch pour cette demande
+        """
+        if not self.running:
+            raise RuntimeError("MicroBatcher non démarré")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> List[tuple]:
+        """Attend une demande puis complète le lot jusqu'à la taille ou l'échéance"""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Demandes déjà arrivées : prises sans attendre
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """Boucle de regroupement : un lot à la fois, scoring hors de la boucle d'événements"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+
+            start = time.perf_counter()
+            try:
+                try:
+                    outcomes = [(result, None) for result in
+                                await loop.run_in_executor(self.executor, self._process, items)]
+                except Exception as e:
+                    if len(items) == 1:
+                        outcomes = [(None, e)]
+                    else:
+                        # Lot en échec : demandes rejouées une par une pour isoler la fautive
+                        self._stats['batch_retries'] += 1
+                        logger.warning(f"⚠️ Échec du lot ({len(items)} demandes): {str(e)} - "
+                                       f"nouvel essai demande par demande")
+                        outcomes = await loop.run_in_executor(self.executor, self._process_each, items)
+            except Exception as e:
+                outcomes = [(None, e)] * len(items)
+
+            try:
+                for (_, future), (result, error) in zip(batch, outcomes):
+                    if future.done():  # Demande annulée par le client
+                        continue
+                    if error is None:
+                        future.set_result(result)
+                    else:
+                        self._stats['errors'] += 1
+                        logger.error(f"❌ Erreur de scoring d'une demande: {str(error)}")
+                        future.set_exception(error)
+            finally:
+                self._record(len(items), time.perf_counter() - start)
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _process(self, items: List[Any]) -> Sequence[Any]:
+        """Appel de process_batch, avec un résultat par demande"""
+        results = self.process_batch(items)
+        if len(results) != len(items):
+            raise ValueError(f"{len(results)} résultats pour {len(items)} demandes")
+        return results
+
+    def _process_each(self, items: List[Any]) -> List[tuple]:
+        """Demandes traitées une par une : (résultat, None) ou (None, exception) pour chacune"""
+        outcomes = []
+        for item in items:
+            try:
+                outcomes.append((self._process([item])[0], None))
+            except Exception as e:
+                outcomes.append((None, e))
+        return outcomes
+
+    def _record(self, size: int, seconds: float):
+        self._stats['requests'] += size
+        self._stats['batches'] += 1
+        self._stats['scoring_seconds'] += seconds
+        self._stats['max_batch'] = max(self._stats['max_batch'], size)
+        if size == self.max_batch_size:
+            self._stats['full_batches'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques de regroupement (taille moyenne des lots, temps de scoring)"""
+        stats = dict(self._stats)
+        stats['mean_batch_size'] = stats['requests'] / stats['batches'] if stats['batches'] else 0.0
+        stats['queued'] = self._queue.qsize() if self._queue is not None else 0
+        stats['max_batch_size'] = self.max_batch_size
+        stats['max_wait_ms'] = self.max_wait * 1000
+        return stats
@@ -0,0 +1,91 @@
+"""
+🚦 RATE LIMITING - LIMITATION DU DÉBIT PAR CLIENT
+================================================
+
+Seau à jetons par client (adresse IP ou clé fournie) : `requests_per_minute`
+jetons au maximum, rechargés en continu. Une demande consomme un jeton (un
+lot, un jeton par demande du lot) ; un client sans assez de jetons reçoit le
+délai d'attente avant qu'ils soient disponibles.
+
+Auteur: Équipe Data Science
+Version: 1.0.0
+"""
+
+import time
+import threading
+from typing import Dict, Tuple
+
+
+class RateLimiter:
+    """
+    Limiteur de débit en mémoire (un processus).
+
+    Les seaux inactifs depuis plus d'une minute sont pleins par construction
+    et sont purgés périodiquement.
+    """
+
+    def __init__(self, requests_per_minute: int = 100):
+        """
+        Args:
+            requests_per_minute: Demandes autorisées par minute et par client (0 = illimité)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.capacity = float(requests_per_minute)
+        self.refill_rate = requests_per_minute / 60.0  # Jetons par seconde
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # client -> (jetons, horodatage)
+        self._last_purge = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0
+
+    def acquire(self, client: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Consomme des jetons pour un client
+
+        Args:
+            client: Identifiant du client
+            cost: Nombre de jetons consommés
+
+        Returns:
+            (autorisé, secondes avant qu'assez de jetons soient disponibles)
+        """
+        if not self.enabled:
+            return True, 0.0
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(client, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.refill_rate)
+
+            if tokens >= cost:
+                self._buckets[client] = (tokens - cost, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[client] = (tokens, now)
+                allowed, retry_after = False, (cost - tokens) / self.refill_rate
+
+            if now - self._last_purge > 60:
+                self._purge(now)
+
+        return allowed, retry_after
+
+    def remaining(self, client: str) -> int:
+        """Jetons disponibles pour un client"""
+        if not self.enabled:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(client, (self.capacity, now))
+        return int(min(self.capacity, tokens + (now - updated) * self.refill_rate))
+
+    def _purge(self, now: float):
+        """Supprime les seaux rechargés (appelé sous _lock)"""
+        full_after = self.capacity / self.refill_rate
+        self._buckets = {
+            client: state for client, state in self._buckets.items()
+            if now - state[1] < full_after
+        }
+        self._last_purge = now
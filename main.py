@@ -25,6 +25,9 @@ from pipelines.data_pipeline import DataPipeline
 from pipelines.training_pipeline import TrainingPipeline
 from pipelines.inference_pipeline import InferencePipeline
 
+# Models directory shared by training, the model index and the model loader
+MODELS_DIR = Path(__file__).resolve().parent / "modeling" / "models"
+
 
 def load_config(config_path: str = "config/config.yaml") -> dict:
     """Load configuration from YAML file."""
@@ -58,7 +61,7 @@ def cli(ctx, config: str, verbose: bool):
     
     # Create necessary directories
     os.makedirs("logs", exist_ok=True)
-    os.makedirs("models", exist_ok=True)
+    os.makedirs(MODELS_DIR, exist_ok=True)
     os.makedirs("data/processed", exist_ok=True)
     
     logging.info("Credit Scoring System initialized")
@@ -66,8 +69,9 @@ def cli(ctx, config: str, verbose: bool):
 
 @cli.command()
 @click.option('--force', is_flag=True, help='Force reprocessing even if processed data exists')
+@click.option('--explain-cache', is_flag=True, help='Show stage cache hits and misses (and why a stage reran)')
 @click.pass_context
-def process_data(ctx, force: bool):
+def process_data(ctx, force: bool, explain_cache: bool):
     """Process raw data and prepare it for training."""
     config = ctx.obj['config']
     
@@ -75,7 +79,7 @@ def process_data(ctx, force: bool):
     
     try:
         pipeline = DataPipeline(config)
-        pipeline.run(force_reprocess=force)
+        pipeline.run(force_reprocess=force, explain_cache=explain_cache)
         logging.info("Data processing completed successfully")
     except Exception as e:
         logging.error(f"Data processing failed: {e}")
@@ -85,19 +89,33 @@ def process_data(ctx, force: bool):
 @cli.command()
 @click.option('--experiment-name', default=None, help='MLflow experiment name')
 @click.option('--auto-tune', is_flag=True, help='Enable hyperparameter tuning')
+@click.option('--search-method', default=None,
+              help='Tuning strategy, or a comma-separated list to compare '
+                   '(grid_search, random_search, successive_halving, bayesian, regularization_path)')
+@click.option('--tournament', is_flag=True,
+              help='Train and rank all candidate algorithms in parallel (model.tournament)')
 @click.pass_context
-def train_model(ctx, experiment_name: Optional[str], auto_tune: bool):
+def train_model(ctx, experiment_name: Optional[str], auto_tune: bool, search_method: Optional[str],
+                tournament: bool):
     """Train the credit scoring model."""
     config = ctx.obj['config']
     
+    if search_method:
+        methods = [m.strip() for m in search_method.split(',') if m.strip()]
+        tuning = config.setdefault('model', {}).setdefault('hyperparameter_tuning', {})
+        tuning['method'] = methods[0] if len(methods) == 1 else methods
+    
     logging.info("Starting model training pipeline")
     
     try:
         pipeline = TrainingPipeline(config)
-        pipeline.run(
-            experiment_name=experiment_name,
-            hyperparameter_tuning=auto_tune
-        )
+        if tournament:
+            pipeline.run_tournament()
+        else:
+            pipeline.run(
+                experiment_name=experiment_name,
+                hyperparameter_tuning=auto_tune
+            )
         logging.info("Model training completed successfully")
     except Exception as e:
         logging.error(f"Model training failed: {e}")
@@ -108,8 +126,12 @@ def train_model(ctx, experiment_name: Optional[str], auto_tune: bool):
 @click.option('--model-path', default=None, help='Path to trained model')
 @click.option('--input-data', required=True, help='Path to input data for prediction')
 @click.option('--output-path', default='predictions.csv', help='Path to save predictions')
+@click.option('--streaming', is_flag=True, help='Score the input chunk by chunk with bounded memory')
+@click.option('--chunk-size', default=None, type=int, help='Rows per chunk in streaming mode (default: data.loading.chunk_size)')
+@click.option('--workers', default=1, type=click.IntRange(min=1), help='Number of scoring processes (shards are merged in input order)')
 @click.pass_context
-def predict(ctx, model_path: Optional[str], input_data: str, output_path: str):
+def predict(ctx, model_path: Optional[str], input_data: str, output_path: str,
+            streaming: bool, chunk_size: Optional[int], workers: int):
     """Make predictions using trained model."""
     config = ctx.obj['config']
     
@@ -120,7 +142,10 @@ def predict(ctx, model_path: Optional[str], input_data: str, output_path: str):
         pipeline.run(
             model_path=model_path,
             input_data_path=input_data,
-            output_path=output_path
+            output_path=output_path,
+            streaming=streaming or chunk_size is not None,
+            chunk_size=chunk_size,
+            workers=workers
         )
         logging.info(f"Predictions saved to {output_path}")
     except Exception as e:
@@ -128,6 +153,65 @@ def predict(ctx, model_path: Optional[str], input_data: str, output_path: str):
         sys.exit(1)
 
 
+@cli.command()
+@click.option('--models-dir', default=str(MODELS_DIR), help='Directory holding the legacy .pkl models')
+@click.option('--overwrite', is_flag=True, help='Re-convert models that already have an artifact')
+@click.pass_context
+def convert_models(ctx, models_dir: str, overwrite: bool):
+    """Convert legacy pickled models to the artifact directory format."""
+    from src.model_artifact import convert_legacy_models, list_artifacts
+    
+    artifacts_dir = Path(models_dir) / "artifacts"
+    logging.info(f"Converting legacy models from {models_dir} to {artifacts_dir}")
+    
+    try:
+        created = convert_legacy_models(models_dir, artifacts_dir, overwrite=overwrite)
+        logging.info(f"{len(created)} model(s) converted")
+        
+        for artifact in list_artifacts(artifacts_dir):
+            summary = artifact.summary()
+            print(f"  {summary['name']}  AUC={summary['auc_roc']}  fast_scoring={summary['fast_scoring']}")
+    except Exception as e:
+        logging.error(f"Model conversion failed: {e}")
+        sys.exit(1)
+
+
+@cli.command()
+@click.option('--models-dir', default=str(MODELS_DIR), help='Directory holding the models and model_index.db')
+@click.option('--backfill/--no-backfill', default=True, help='Index artifacts and .pkl models not yet in the index')
+@click.option('--pin', default=None, help='Pin a model version (selected before any other rule)')
+@click.option('--unpin', is_flag=True, help='Remove the pinned version')
+@click.option('--production', default=None, help='Mark a model version as production ready')
+@click.pass_context
+def index_models(ctx, models_dir: str, backfill: bool, pin: Optional[str], unpin: bool,
+                 production: Optional[str]):
+    """Build and manage the model index used for model selection."""
+    from src.model_index import ModelIndex
+    
+    index = ModelIndex(models_dir)
+    logging.info(f"Model index: {index.path}")
+    
+    try:
+        if backfill:
+            added = index.backfill(models_dir)
+            logging.info(f"{len(added)} model(s) added to the index")
+        if production:
+            index.set_production(production)
+        if unpin:
+            index.unpin()
+        if pin:
+            index.pin(pin)
+        
+        aliases = index.aliases()
+        for record in index.list():
+            tags = [alias for alias, version in aliases.items() if version == record['version']]
+            print(f"  {record['version']}  AUC={record['auc_roc']}  KS={record['ks_statistic']}  "
+                  f"production={record['production_ready']}  {' '.join(tags)}")
+    except Exception as e:
+        logging.error(f"Model indexing failed: {e}")
+        sys.exit(1)
+
+
 @cli.command()
 @click.option('--host', default='0.0.0.0', help='API host')
 @click.option('--port', default=8000, help='API port')
@@ -257,7 +341,7 @@ def status(ctx):
     
     # Check models
     print("\nMODEL STATUS:")
-    models_path = "models/"
+    models_path = str(MODELS_DIR)
     if os.path.exists(models_path):
         model_files = [f for f in os.listdir(models_path) if f.endswith(('.pkl', '.joblib'))]
         if model_files:
@@ -285,6 +369,8 @@ def status(ctx):
     print("  python main.py run-api         # Start API service")
     print("  python main.py run-app         # Start Streamlit app")
     print("  python main.py full-pipeline   # Run complete pipeline")
+    print("  python main.py convert-models  # Convert legacy .pkl models to artifacts")
+    print("  python main.py index-models    # Index models for selection (--pin, --production)")
     print()
 
 
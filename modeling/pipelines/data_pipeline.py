@@ -8,6 +8,7 @@ Created: 2024
 """
 
 import sys
+import joblib
 import pandas as pd
 import logging
 from pathlib import Path
@@ -16,10 +17,17 @@ from typing import Dict, Optional
 # Add src to Python path
 sys.path.append(str(Path(__file__).parent.parent / "src"))
 
-from src.data_processing import DataProcessor
+from src.data_processing import DataProcessor, CleaningPlan
 from src.eda_analyzer import EDAAnalyzer
 from src.transformers.feature_engineer import FeatureEngineer
 from src.transformers.variable_transformer import VariableTransformer
+from src.transformers.lookup_stage import LookupStage
+from src.transformers.streaming_stats import QuantileSketch
+from src.stage_cache import StageCache, code_version, file_fingerprint
+from src.utils import resolve_dataset_path, save_dataset
+
+# Modalité de 'cible' (données nettoyées) codée 1 pour l'entraînement
+DEFAULT_TARGET_LABEL = 'credit avec impaye'
 
 
 class DataPipeline:
@@ -35,63 +43,137 @@ class DataPipeline:
         self.config = config
         self.logger = logging.getLogger(__name__)
         
-    def run(self, force_reprocess: bool = False):
+    def run(self, force_reprocess: bool = False, explain_cache: bool = False):
         """
         Exécute le pipeline de données complet
         
+        Les étapes nettoyage, feature engineering et transformation passent par
+        un cache adressé par contenu (voir src/stage_cache.py) : seules les
+        étapes dont les données d'entrée, la configuration ou le code ont
+        changé sont recalculées.
+        
         Args:
-            force_reprocess: Force le retraitement même si les données existent
+            force_reprocess: Recalcule toutes les étapes (le cache est mis à jour)
+            explain_cache: Affiche les succès et échecs du cache par étape
         """
         print("\n🔄 PIPELINE DE DONNÉES COMPLET")
         print("=" * 50)
         
-        # Vérifier si les données finales existent déjà
-        final_data_path = Path("data/processed/credit_engineered_transformed.csv")
-        if final_data_path.exists() and not force_reprocess:
+        pipeline_config = self.config.get('data_pipeline', {})
+        use_stage_cache = pipeline_config.get('stage_cache', True)
+        storage = self.config.get('data', {}).get('storage', {})
+        storage_format = storage.get('format', 'parquet')
+        export_csv = storage.get('export_csv', False)
+        
+        # Sans cache d'étapes : données finales existantes réutilisées telles quelles
+        final_data_path = resolve_dataset_path("data/processed/credit_engineered_transformed.parquet")
+        if not use_stage_cache and final_data_path.exists() and not force_reprocess:
             print("✅ Données déjà traitées trouvées. Utilisation des données existantes.")
             print(f"📁 Fichier: {final_data_path}")
             return
         
+        cache_root = Path(self.config.get('data', {}).get('cache_path', 'data/cache'))
+        cache = StageCache(cache_root / "stages", enabled=use_stage_cache, refresh=force_reprocess)
+        
         # 1. Chargement et nettoyage des données
         print("\n📊 1. Chargement et nettoyage des données...")
-        processor = DataProcessor(self.config)
-        df_cleaned = processor.load_and_clean_data()
+        raw_path = Path(self.config.get('data', {}).get('raw_data_path', 'data/raw/')) / "credit.csv"
+        # Le nettoyage ne lit aucune section de configuration
+        clean_key = cache.key('clean', file_fingerprint(raw_path), {}, code_version(DataProcessor))
+        cached = cache.load('clean', clean_key)
+        if cached is not None:
+            df_cleaned, clean_state = cached
+            cleaning_plan = CleaningPlan.from_state(clean_state['cleaning_plan'])
+            save_dataset(df_cleaned, "data/processed/credit_cleaned", format=storage_format, export_csv=export_csv)
+            print(f"♻️ Données nettoyées reprises du cache ({clean_key})")
+        else:
+            processor = DataProcessor(storage_format=storage_format, export_csv=export_csv)
+            processor.load_data(str(raw_path))
+            df_cleaned = processor.clean_data()
+            cleaning_plan = processor.cleaning_plan
+            cache.save('clean', clean_key, df_cleaned, {
+                'quality_report': processor.get_quality_report(),
+                'cleaning_plan': cleaning_plan.get_state()
+            })
         
         # 2. Analyse exploratoire (optionnel)
-        if self.config.get('data_pipeline', {}).get('run_eda', False):
+        if pipeline_config.get('run_eda', False):
             print("\n📈 2. Analyse exploratoire des données...")
-            eda_analyzer = EDAAnalyzer(self.config)
-            eda_analyzer.run_complete_analysis(df_cleaned)
+            eda_analyzer = EDAAnalyzer()
+            eda_analyzer.data = df_cleaned
+            eda_analyzer.comprehensive_analysis()
         
         # 3. Feature Engineering
         print("\n🔧 3. Feature Engineering...")
-        feature_engineer = FeatureEngineer(self.config)
-        df_engineered = feature_engineer.engineer_all_features(df_cleaned)
+        feature_engineering_config = self.config.get('ml_workflow', self.config).get('feature_engineering', {})
+        engineer_key = cache.key('engineer', clean_key, feature_engineering_config,
+                                 code_version(FeatureEngineer, LookupStage))
+        cached = cache.load('engineer', engineer_key)
+        if cached is not None:
+            df_engineered, feature_state = cached
+            feature_engineer = FeatureEngineer(self.config).set_state(feature_state)
+            print(f"♻️ Features reprises du cache ({engineer_key})")
+        else:
+            feature_engineer = FeatureEngineer(self.config)
+            df_engineered = feature_engineer.fit_transform(df_cleaned)
+            cache.save('engineer', engineer_key, df_engineered, feature_engineer.get_state())
         
         # 4. Transformation des variables
         print("\n⚙️ 4. Transformation des variables...")
-        transformer = VariableTransformer(self.config)
-        
-        # Séparation des features et de la cible
-        X = df_engineered.drop(columns=['cible'])
-        y = df_engineered['cible']
-        
-        # Transformation complète
-        X_transformed = transformer.transform_all_variables(X, y, fit=True)
-        
-        # Reconstruction du DataFrame final
-        df_final = X_transformed.copy()
-        df_final['cible'] = y.values
+        # Sélection basée modèle mise en cache : un retraitement forcé sur des
+        # données inchangées ne réentraîne pas le sélecteur
+        transformer_config = {
+            **self.config,
+            'feature_selection': {'cache_dir': str(cache_root / "feature_selection"),
+                                  **self.config.get('feature_selection', {})}
+        }
+        transformer = VariableTransformer(transformer_config)
+        transform_key = cache.key('transform', engineer_key,
+                                  {section: transformer.config[section] for section in transformer.default_config},
+                                  code_version(VariableTransformer, QuantileSketch))
+        cached = cache.load('transform', transform_key)
+        if cached is not None:
+            df_final, transformer = cached
+            print(f"♻️ Variables transformées reprises du cache ({transform_key})")
+        else:
+            # Séparation des features et de la cible (1 = crédit avec impayé)
+            X = df_engineered.drop(columns=['cible'])
+            y = df_engineered['cible']
+            if not pd.api.types.is_numeric_dtype(y):
+                y = (y == DEFAULT_TARGET_LABEL).astype(int)
+            
+            # Transformation complète
+            X_transformed = transformer.transform_all_variables(X, y, fit=True)
+            
+            # Reconstruction du DataFrame final
+            df_final = X_transformed.copy()
+            df_final['cible'] = y.values
+            cache.save('transform', transform_key, df_final, transformer)
         
         # 5. Sauvegarde
         print("\n💾 5. Sauvegarde des données transformées...")
         output_path = Path("data/processed")
         output_path.mkdir(exist_ok=True)
         
-        # Sauvegarde du fichier final
-        final_path = output_path / "credit_engineered_transformed.csv"
-        df_final.to_csv(final_path, index=False)
+        # Sauvegarde du fichier final (colonnes typées ; copie CSV si data.storage.export_csv)
+        final_path = save_dataset(df_final, output_path / "credit_engineered_transformed",
+                                  format=storage_format, export_csv=export_csv)
+        
+        # Plan de nettoyage, état du feature engineering (bornes figées) et
+        # transformer entraîné : pipeline d'entrée repris avec le modèle
+        plan_path = cleaning_plan.save(output_path / "cleaning_plan.json")
+        state_path = feature_engineer.save_state(output_path / "feature_engineer_state.json")
+        transformer_path = output_path / "variable_transformer.joblib"
+        joblib.dump(transformer, transformer_path)
         
         print(f"✅ Pipeline de données terminé avec succès!")
         print(f"📁 Données sauvegardées: {final_path}")
-        print(f"📊 Shape finale: {df_final.shape}") 
\ No newline at end of file
+        print(f"📁 Plan de nettoyage: {plan_path}")
+        print(f"📁 État du feature engineering: {state_path}")
+        print(f"📁 Transformer entraîné: {transformer_path}")
+        print(f"📊 Shape finale: {df_final.shape}")
+        
+        if explain_cache:
+            print("\n🗂️ Cache des étapes:")
+            for line in cache.explain():
+                print(line)
@@ -7,17 +7,30 @@ Author: Credit Scoring Team
 Created: 2024
 """
 
+import os
 import sys
+import time
 import pandas as pd
 import numpy as np
 import logging
 import joblib
 from pathlib import Path
-from typing import Dict, Union, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Union, Optional, Iterator, Tuple
 
 # Add src to Python path
 sys.path.append(str(Path(__file__).parent.parent / "src"))
 
+from src.decision_engine import DecisionEngine
+from src.utils import load_dataset
+
+# Répertoire des modèles écrit par TrainingPipeline
+MODELS_DIR = Path(__file__).resolve().parent.parent / "models"
+
+# Pipeline chargé une seule fois par processus worker (voir _init_scoring_worker)
+_WORKER_PIPELINE = None
+
 
 class InferencePipeline:
     """Pipeline d'inférence pour les prédictions"""
@@ -33,10 +46,15 @@ class InferencePipeline:
         self.logger = logging.getLogger(__name__)
         self.model = None
         self.model_info = None
+        self.model_path = None
+        self.decision_engine = DecisionEngine(config)
         
     def run(self, model_path: Optional[str] = None, 
             input_data_path: str = None, 
-            output_path: str = "predictions.csv") -> pd.DataFrame:
+            output_path: str = "predictions.csv",
+            streaming: bool = False,
+            chunk_size: Optional[int] = None,
+            workers: int = 1) -> pd.DataFrame:
         """
         Exécute le pipeline d'inférence
         
@@ -44,9 +62,14 @@ class InferencePipeline:
             model_path: Chemin vers le modèle (None = utilise le meilleur modèle)
             input_data_path: Chemin vers les données d'entrée
             output_path: Chemin de sauvegarde des prédictions
+            streaming: Si True, lit, score et écrit les données par chunks
+            chunk_size: Taille des chunks en mode streaming
+                (None = data.loading.chunk_size de la configuration)
+            workers: Nombre de processus de scoring (> 1 active le mode
+                streaming, chaque chunk devient un shard scoré en parallèle)
             
         Returns:
-            DataFrame avec les prédictions
+            DataFrame avec les prédictions (en mode streaming : résumé par chunk)
         """
         print("\n🔮 PIPELINE D'INFÉRENCE")
         print("=" * 40)
@@ -55,6 +78,9 @@ class InferencePipeline:
         print("\n📦 1. Chargement du modèle...")
         self._load_model(model_path)
         
+        if streaming or workers > 1:
+            return self._run_streaming(input_data_path, output_path, chunk_size, workers)
+        
         # 2. Chargement des données
         print("\n📊 2. Chargement des données...")
         df = self._load_data(input_data_path)
@@ -73,12 +99,140 @@ class InferencePipeline:
         
         return predictions_df
     
-    def _load_model(self, model_path: Optional[str] = None):
+    def _run_streaming(self, input_data_path: str, output_path: str,
+                       chunk_size: Optional[int] = None, workers: int = 1) -> pd.DataFrame:
+        """
+        Mode streaming : chaque chunk est scoré puis ajouté au fichier de sortie.
+        
+        La mémoire utilisée est bornée par la taille du chunk (et le nombre de
+        shards en vol) et non par la taille du fichier. L'ordre des lignes et
+        les colonnes de sortie sont identiques au mode standard.
+        
+        Args:
+            input_data_path: Chemin vers les données d'entrée
+            output_path: Chemin de sauvegarde des prédictions
+            chunk_size: Nombre de lignes par chunk
+            workers: Nombre de processus de scoring
+            
+        Returns:
+            DataFrame résumé (une ligne par chunk)
+        """
+        chunk_size = chunk_size or self._get_chunk_size()
+        
+        print(f"\n📊 2. Lecture des données par chunks de {chunk_size} lignes...")
+        if workers > 1:
+            print(f"\n🎯 3. Scoring parallèle sur {workers} processus...")
+        else:
+            print("\n🎯 3. Génération et sauvegarde des prédictions en streaming...")
+        
+        chunks = self._iter_data_chunks(input_data_path, chunk_size)
+        if workers > 1:
+            scored_chunks = self._score_chunks_parallel(chunks, workers)
+        else:
+            scored_chunks = (self._score_chunk(chunk_id, chunk)
+                             for chunk_id, chunk in enumerate(chunks))
+        
+        chunk_stats = []
+        n_rows = n_approved = n_correct = n_with_target = 0
+        start = time.perf_counter()
+        
+        for chunk_id, predictions_df, stats in scored_chunks:
+            # Le premier chunk crée le fichier avec l'en-tête, les suivants sont ajoutés
+            predictions_df.to_csv(output_path, mode='w' if chunk_id == 0 else 'a',
+                                  header=chunk_id == 0, index=False)
+            
+            approved = int((predictions_df['prediction'] == 0).sum())
+            n_rows += len(predictions_df)
+            n_approved += approved
+            if 'actual_target' in predictions_df.columns:
+                n_correct += int((predictions_df['prediction'] == predictions_df['actual_target']).sum())
+                n_with_target += len(predictions_df)
+            
+            stats['approval_rate'] = approved / len(predictions_df) if len(predictions_df) else 0.0
+            chunk_stats.append(stats)
+        
+        elapsed = time.perf_counter() - start
+        
+        if n_with_target:
+            print(f"   ✅ Accuracy sur les données: {n_correct / n_with_target:.4f}")
+        if n_rows:
+            print(f"   ✅ Taux d'approbation: {n_approved / n_rows:.2%}")
+            print(f"   ✅ Taux de rejet: {(n_rows - n_approved) / n_rows:.2%}")
+        
+        summary = pd.DataFrame(chunk_stats, columns=['chunk', 'rows', 'approval_rate', 'seconds',
+                                                     'rows_per_second', 'worker'])
+        if workers > 1:
+            self._print_throughput_report(summary, elapsed)
+        
+        print(f"✅ Prédictions terminées!")
+        print(f"📁 Résultats sauvegardés: {output_path}")
+        print(f"📊 Nombre de prédictions: {n_rows} ({len(chunk_stats)} chunks)")
+        
+        return summary
+    
+    def _score_chunk(self, chunk_id: int, chunk: pd.DataFrame) -> Tuple[int, pd.DataFrame, Dict]:
+        """Score un chunk et mesure son débit"""
+        start = time.perf_counter()
+        predictions_df = self._make_predictions(chunk, verbose=False)
+        elapsed = time.perf_counter() - start
+        
+        stats = {
+            'chunk': chunk_id,
+            'rows': len(predictions_df),
+            'seconds': elapsed,
+            'rows_per_second': len(predictions_df) / elapsed if elapsed > 0 else float('inf'),
+            'worker': os.getpid()
+        }
+        return chunk_id, predictions_df, stats
+    
+    def _score_chunks_parallel(self, chunks: Iterator[pd.DataFrame],
+                               workers: int) -> Iterator[Tuple[int, pd.DataFrame, Dict]]:
+        """
+        Score les chunks (shards) dans un pool de processus.
+        
+        Chaque worker charge le modèle une seule fois à son démarrage. Au plus
+        2 shards par worker sont en vol, et les résultats sont rendus dans
+        l'ordre d'entrée.
+        """
+        max_in_flight = 2 * workers
+        pending = deque()
+        
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_scoring_worker,
+                                 initargs=(self.config, self.model_path)) as executor:
+            for chunk_id, chunk in enumerate(chunks):
+                pending.append(executor.submit(_score_shard, chunk_id, chunk))
+                if len(pending) >= max_in_flight:
+                    yield pending.popleft().result()
+            
+            while pending:
+                yield pending.popleft().result()
+    
+    def _print_throughput_report(self, summary: pd.DataFrame, elapsed: float):
+        """Affiche le débit par shard et le débit global"""
+        print("\n⚡ RAPPORT DE DÉBIT PAR SHARD")
+        print("-" * 60)
+        print(f"   {'Shard':>6} {'Lignes':>10} {'Durée (s)':>10} {'Lignes/s':>12} {'Worker':>8}")
+        for row in summary.itertuples(index=False):
+            print(f"   {row.chunk:>6} {row.rows:>10} {row.seconds:>10.3f} "
+                  f"{row.rows_per_second:>12,.0f} {row.worker:>8}")
+        print("-" * 60)
+        
+        total_rows = int(summary['rows'].sum())
+        print(f"   ✅ Workers utilisés: {summary['worker'].nunique()}")
+        print(f"   ✅ Débit global: {total_rows / elapsed if elapsed > 0 else 0:,.0f} lignes/s "
+              f"({total_rows} lignes en {elapsed:.2f}s)")
+    
+    def _get_chunk_size(self) -> int:
+        """Taille de chunk par défaut (data.loading.chunk_size)"""
+        return int(self.config.get('data', {}).get('loading', {}).get('chunk_size', 10000))
+    
+    def _load_model(self, model_path: Optional[str] = None, verbose: bool = True):
         """Charge le modèle entraîné"""
         
         if model_path is None:
             # Utiliser le meilleur modèle par défaut
-            model_path = Path("models") / "best_model.pkl"
+            model_path = MODELS_DIR / "best_model.pkl"
         else:
             model_path = Path(model_path)
         
@@ -88,10 +242,12 @@ class InferencePipeline:
         # Chargement du modèle
         self.model_info = joblib.load(model_path)
         self.model = self.model_info['model']
+        self.model_path = str(model_path)
         
-        print(f"   ✅ Modèle chargé: {model_path}")
-        print(f"   ✅ Version: {self.model_info.get('version', 'N/A')}")
-        print(f"   ✅ AUC-ROC: {self.model_info.get('metrics', {}).get('auc_roc', 'N/A')}")
+        if verbose:
+            print(f"   ✅ Modèle chargé: {model_path}")
+            print(f"   ✅ Version: {self.model_info.get('version', 'N/A')}")
+            print(f"   ✅ AUC-ROC: {self.model_info.get('metrics', {}).get('auc_roc', 'N/A')}")
     
     def _load_data(self, input_data_path: str) -> pd.DataFrame:
         """Charge les données d'entrée"""
@@ -100,14 +256,45 @@ class InferencePipeline:
         if not data_path.exists():
             raise FileNotFoundError(f"Fichier de données non trouvé: {data_path}")
         
-        df = pd.read_csv(data_path)
+        # Parquet : seules les colonnes du modèle (et la cible) sont lues
+        columns = None
+        if data_path.suffix == '.parquet' and hasattr(self.model, 'feature_names_in_'):
+            columns = list(self.model.feature_names_in_) + ['cible']
+        df = load_dataset(data_path, columns=columns)
         
         print(f"   ✅ Données chargées: {len(df)} échantillons")
         print(f"   ✅ Features: {len(df.columns)} variables")
         
         return df
     
-    def _make_predictions(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _iter_data_chunks(self, input_data_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Lit les données d'entrée par chunks successifs"""
+        
+        data_path = Path(input_data_path)
+        if not data_path.exists():
+            raise FileNotFoundError(f"Fichier de données non trouvé: {data_path}")
+        
+        if data_path.suffix == '.parquet':
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(data_path).iter_batches(batch_size=chunk_size):
+                yield batch.to_pandas()
+            return
+        
+        loading_config = self.config.get('data', {}).get('loading', {})
+        
+        reader = pd.read_csv(
+            data_path,
+            chunksize=chunk_size,
+            encoding=loading_config.get('encoding', 'utf-8'),
+            sep=loading_config.get('separator', ','),
+            decimal=loading_config.get('decimal', '.')
+        )
+        
+        with reader:
+            for chunk in reader:
+                yield chunk
+    
+    def _make_predictions(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
         """Génère les prédictions"""
         
         # Préparer les données (supprimer la cible si présente)
@@ -122,14 +309,14 @@ class InferencePipeline:
         y_pred = self.model.predict(X)
         y_proba = self.model.predict_proba(X)[:, 1]
         
-        # Conversion en score de crédit (300-850)
-        credit_scores = self._convert_to_credit_score(y_proba)
+        # Conversion en score de crédit (scoring.score_range)
+        credit_scores = self.decision_engine.credit_scores(y_proba)
         
-        # Détermination de la classe de risque
-        risk_classes = self._determine_risk_class(y_proba)
+        # Détermination de la classe de risque (scoring.risk_classes)
+        risk_classes = self.decision_engine.risk_classes(credit_scores)
         
-        # Recommandations
-        recommendations = self._generate_recommendations(y_proba, y_pred)
+        # Recommandations (scoring.decision_thresholds)
+        recommendations = self.decision_engine.recommendations(y_proba, y_pred)
         
         # Création du DataFrame de résultats
         results_df = pd.DataFrame({
@@ -150,78 +337,25 @@ class InferencePipeline:
             results_df['actual_target'] = df['cible'].values
             
             # Calculer l'accuracy si la cible est disponible
-            accuracy = (y_pred == df['cible']).mean()
-            print(f"   ✅ Accuracy sur les données: {accuracy:.4f}")
+            if verbose:
+                accuracy = (y_pred == df['cible']).mean()
+                print(f"   ✅ Accuracy sur les données: {accuracy:.4f}")
         
-        print(f"   ✅ Prédictions générées: {len(results_df)}")
-        print(f"   ✅ Taux d'approbation: {(y_pred == 0).mean():.2%}")
-        print(f"   ✅ Taux de rejet: {(y_pred == 1).mean():.2%}")
+        if verbose:
+            print(f"   ✅ Prédictions générées: {len(results_df)}")
+            print(f"   ✅ Taux d'approbation: {(y_pred == 0).mean():.2%}")
+            print(f"   ✅ Taux de rejet: {(y_pred == 1).mean():.2%}")
         
         return results_df
-    
-    def _convert_to_credit_score(self, probabilities: np.ndarray) -> np.ndarray:
-        """
-        Convertit les probabilités en scores de crédit (300-850)
-        
-        Args:
-            probabilities: Probabilités de défaut
-            
-        Returns:
-            Scores de crédit entre 300 et 850
-        """
-        # Inverser les probabilités (plus la probabilité de défaut est élevée, plus le score est bas)
-        inverted_proba = 1 - probabilities
-        
-        # Normaliser et convertir en score 300-850
-        credit_scores = 300 + (inverted_proba * 550)
-        
-        return credit_scores.astype(int)
-    
-    def _determine_risk_class(self, probabilities: np.ndarray) -> np.ndarray:
-        """
-        Détermine la classe de risque basée sur les probabilités
-        
-        Args:
-            probabilities: Probabilités de défaut
-            
-        Returns:
-            Classes de risque
-        """
-        risk_classes = np.where(
-            probabilities < 0.1, 'Très Faible',
-            np.where(probabilities < 0.2, 'Faible',
-                    np.where(probabilities < 0.4, 'Moyen',
-                            np.where(probabilities < 0.6, 'Élevé', 'Très Élevé')))
-        )
-        
-        return risk_classes
-    
-    def _generate_recommendations(self, probabilities: np.ndarray, 
-                                predictions: np.ndarray) -> np.ndarray:
-        """
-        Génère des recommandations basées sur les prédictions
-        
-        Args:
-            probabilities: Probabilités de défaut
-            predictions: Prédictions binaires
-            
-        Returns:
-            Recommandations
-        """
-        recommendations = []
-        
-        for prob, pred in zip(probabilities, predictions):
-            if pred == 0:  # Pas de défaut prédit
-                if prob < 0.1:
-                    recommendations.append("Approbation automatique")
-                elif prob < 0.2:
-                    recommendations.append("Approbation avec conditions standards")
-                else:
-                    recommendations.append("Approbation avec conditions renforcées")
-            else:  # Défaut prédit
-                if prob > 0.6:
-                    recommendations.append("Rejet automatique")
-                else:
-                    recommendations.append("Examen manuel requis")
-        
-        return np.array(recommendations) 
\ No newline at end of file
+
+
+def _init_scoring_worker(config: Dict, model_path: str):
+    """Initialise un worker de scoring : le modèle est chargé une seule fois"""
+    global _WORKER_PIPELINE
+    _WORKER_PIPELINE = InferencePipeline(config)
+    _WORKER_PIPELINE._load_model(model_path, verbose=False)
+
+
+def _score_shard(shard_id: int, shard: pd.DataFrame) -> Tuple[int, pd.DataFrame, Dict]:
+    """Score un shard dans un worker initialisé par _init_scoring_worker"""
+    return _WORKER_PIPELINE._score_chunk(shard_id, shard)
@@ -9,6 +9,7 @@ Created: 2024
 """
 
 import os
+import json
 import sys
 import pandas as pd
 import numpy as np
@@ -21,13 +22,20 @@ from datetime import datetime
 # Add src to Python path
 sys.path.append(str(Path(__file__).parent.parent / "src"))
 
-from sklearn.model_selection import train_test_split, GridSearchCV, RandomizedSearchCV
+from sklearn.model_selection import StratifiedKFold, cross_val_predict, train_test_split
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, roc_curve
-from sklearn.calibration import CalibratedClassifierCV
+from sklearn.metrics import classification_report, confusion_matrix
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from src.model_artifact import save_model_artifact
+from src.calibration import OOFCalibratedClassifier
+from src.hyperparameter_search import PATH_SOLVERS, prune_candidates, regularization_path, search_hyperparameters
+from src.metrics import score_metrics
+from src.model_index import ModelIndex
+from src.tournament import run_tournament
+from src.utils import load_dataset, resolve_dataset_path
+
 try:
     import mlflow
     import mlflow.sklearn
@@ -36,6 +44,18 @@ except ImportError:
     MLFLOW_AVAILABLE = False
     logging.warning("MLflow not available. Experiment tracking disabled.")
 
+# Répertoire des modèles lu par le loader et par `main.py index-models`
+MODELS_DIR = Path(__file__).resolve().parent.parent / "models"
+
+# Espace de recherche utilisé si la configuration n'en définit pas
+DEFAULT_SEARCH_SPACE = {
+    'C': [0.01, 0.1, 1.0, 10.0, 100.0],
+    'penalty': ['l1', 'l2', 'elasticnet'],
+    'solver': ['liblinear', 'lbfgs', 'saga'],
+    'max_iter': [1000, 2000, 3000],
+    'class_weight': [None, 'balanced']
+}
+
 
 class TrainingPipeline:
     """
@@ -71,13 +91,17 @@ class TrainingPipeline:
         
         # Paths
         self.data_path = Path("data/processed")
-        self.models_path = Path("models")
-        self.models_path.mkdir(exist_ok=True)
+        self.models_path = MODELS_DIR
+        self.models_path.mkdir(parents=True, exist_ok=True)
         
         # Métriques
         self.metrics = {}
         self.best_model = None
         self.best_params = None
+        self.search_results = []
+        self.oof_decision = None
+        self.regularization_path = None
+        self.gains_table = None
         
     def run(self, experiment_name: Optional[str] = None, 
             hyperparameter_tuning: bool = True) -> Dict[str, Any]:
@@ -106,6 +130,7 @@ class TrainingPipeline:
         print("\n🔧 2. Entraînement du modèle...")
         if hyperparameter_tuning:
             model = self._train_with_hyperparameter_tuning(X_train, y_train)
+            self._compute_regularization_path(X_train, y_train)
         else:
             model = self._train_basic_model(X_train, y_train)
         
@@ -130,7 +155,11 @@ class TrainingPipeline:
             'model_path': model_path,
             'metrics': metrics,
             'report_path': report_path,
-            'best_params': self.best_params
+            'best_params': self.best_params,
+            'search_results': [{k: v for k, v in r.items() if k not in ('best_estimator', 'oof_decision')}
+                               for r in self.search_results],
+            'regularization_path': self.regularization_path,
+            'gains_table': self.gains_table
         }
         
         print(f"\n✅ Pipeline d'entraînement terminé avec succès!")
@@ -140,15 +169,114 @@ class TrainingPipeline:
         
         return results
     
+    def run_tournament(self) -> Dict[str, Any]:
+        """
+        Tournoi multi-algorithmes (`model.tournament`)
+
+        Les familles candidates sont entraînées en parallèle dans leur budget
+        de temps, classées (AUC, KS, Gini, latence), enregistrées comme
+        artefacts dans l'index des modèles et résumées dans un rapport JSON.
+        Les candidats indexés sont marqués 'tournament' et ne participent pas
+        à la règle 'best_auc' : ils se sélectionnent explicitement
+        (`index-models --pin`, `version:<nom>`) ou via `--production`.
+
+        Returns:
+            Dictionnaire contenant le classement, le vainqueur et le rapport
+        """
+        print("\n🏆 TOURNOI D'ALGORITHMES")
+        print("=" * 60)
+        
+        tournament_config = self.model_config.get('tournament', {})
+        
+        print("\n📊 1. Chargement des données...")
+        X_train, X_test, y_train, y_test = self._load_and_split_data()
+        
+        # Régression logistique : paramètres du modèle standard
+        params = {family: dict(family_params or {})
+                  for family, family_params in tournament_config.get('params', {}).items()}
+        logistic_params = {**self.default_params, **self.model_config.get('params', {})}
+        logistic_params.pop('random_state', None)
+        params['logistic_regression'] = {**logistic_params, **params.get('logistic_regression', {})}
+        
+        time_budget = tournament_config.get('time_budget_s', 300)
+        print(f"\n🔧 2. Entraînement parallèle (budget {time_budget}s par candidat)...")
+        start = datetime.now()
+        ranking = run_tournament(
+            X_train, y_train, X_test, y_test,
+            families=tournament_config.get('candidates'),
+            params=params,
+            time_budget=time_budget,
+            n_workers=tournament_config.get('n_workers'),
+            random_state=self.config.get('model', {}).get('random_state', 42),
+            latency_calls=tournament_config.get('latency_calls', 200)
+        )
+        wall_time = (datetime.now() - start).total_seconds()
+        
+        print("\n📈 3. Classement:")
+        print(f"   {'Rang':<5} {'Candidat':<24} {'Statut':<8} {'AUC':>7} {'KS':>7} {'Gini':>7} "
+              f"{'p50 µs':>9} {'Fit s':>7}")
+        for result in ranking:
+            metrics = result.get('metrics') or {}
+            print(f"   {result['rank'] or '-':<5} {result['family']:<24} {result['status']:<8} "
+                  f"{metrics.get('auc_roc', float('nan')):>7.4f} {metrics.get('ks_statistic', float('nan')):>7.4f} "
+                  f"{metrics.get('gini_coefficient', float('nan')):>7.4f} "
+                  f"{metrics.get('latency_p50_us', float('nan')):>9.0f} {result.get('fit_time', float('nan')):>7.1f}")
+        
+        print("\n💾 4. Enregistrement dans l'index des modèles...")
+        timestamp = start.strftime("%Y%m%d_%H%M%S")
+        index = ModelIndex(self.models_path)
+        input_pipeline = self._load_input_pipeline()
+        for result in ranking:
+            if result['status'] != 'ok':
+                continue
+            name = f"tournament_{timestamp}_{result['family']}"
+            metadata = {'tournament': timestamp, 'family': result['family'], 'rank': result['rank'],
+                        'mean_rank': result['mean_rank'], 'fit_time': result['fit_time']}
+            artifact_path = save_model_artifact(
+                self.models_path / "artifacts", name, result['model'],
+                metrics=result['metrics'], params=params.get(result['family'], {}),
+                timestamp=timestamp, metadata=metadata, **input_pipeline
+            )
+            feature_names = getattr(result['model'], 'feature_names_in_', None)
+            index.register(
+                artifact_path.name, artifact_path,
+                metrics=result['metrics'],
+                features=list(feature_names) if feature_names is not None else None,
+                trained_at=timestamp,
+                metadata={**metadata, 'model_type': type(result['model']).__name__}
+            )
+            result['artifact_path'] = str(artifact_path)
+            print(f"   ✅ {artifact_path}")
+        
+        report_path = Path("reports") / f"tournament_{timestamp}.json"
+        report_path.parent.mkdir(exist_ok=True)
+        summary = [{k: v for k, v in result.items() if k != 'model'} for result in ranking]
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': timestamp, 'time_budget_s': time_budget, 'wall_time_s': wall_time,
+                       'ranking': summary}, f, indent=2, ensure_ascii=False)
+        
+        winner = next((result for result in ranking if result['rank'] == 1), None)
+        print(f"\n✅ Tournoi terminé en {wall_time:.1f}s")
+        if winner is not None:
+            print(f"🥇 Vainqueur: {winner['family']} (AUC {winner['metrics']['auc_roc']:.4f})")
+        print(f"📋 Rapport: {report_path}")
+        
+        return {
+            'ranking': ranking,
+            'winner': winner,
+            'report_path': str(report_path),
+            'wall_time': wall_time
+        }
+    
     def _load_and_split_data(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
         """Charge et divise les données"""
         
-        # Chargement des données transformées
-        data_file = self.data_path / "credit_engineered_transformed.csv"
+        # Chargement des données transformées (Parquet, ou CSV à défaut)
+        data_file = resolve_dataset_path(self.data_path / "credit_engineered_transformed.parquet")
         if not data_file.exists():
             raise FileNotFoundError(f"Fichier de données non trouvé: {data_file}")
         
-        df = pd.read_csv(data_file)
+        df = load_dataset(data_file)
         
         # Séparation des features et de la cible
         X = df.drop(columns=['cible'])
@@ -172,42 +300,126 @@ class TrainingPipeline:
     
     def _train_with_hyperparameter_tuning(self, X_train: pd.DataFrame, 
                                          y_train: pd.Series) -> Any:
-        """Entraîne le modèle avec optimisation des hyperparamètres"""
+        """
+        Entraîne le modèle avec optimisation des hyperparamètres
+
+        Espace de recherche : `model.hyperparameters` (grille par défaut sinon).
+        Stratégie : `model.hyperparameter_tuning.method` ; une liste de
+        stratégies les compare toutes et garde le meilleur score CV.
+        """
         
         print("   🔍 Optimisation des hyperparamètres...")
         
-        # Grille de paramètres
-        param_grid = {
-            'C': [0.01, 0.1, 1.0, 10.0, 100.0],
-            'penalty': ['l1', 'l2', 'elasticnet'],
-            'solver': ['liblinear', 'lbfgs', 'saga'],
-            'max_iter': [1000, 2000, 3000],
-            'class_weight': [None, 'balanced']
-        }
+        tuning_config = self.model_config.get('hyperparameter_tuning', {})
+        space = self.model_config.get('hyperparameters') or DEFAULT_SEARCH_SPACE
+        methods = tuning_config.get('method', 'regularization_path')
+        methods = [methods] if isinstance(methods, str) else list(methods)
         
         # Modèle de base
         base_model = LogisticRegression(random_state=42)
         
-        # GridSearchCV
-        grid_search = GridSearchCV(
-            base_model,
-            param_grid,
-            cv=5,
-            scoring='roc_auc',
-            n_jobs=-1,
-            verbose=1
+        print(f"   📐 Candidats valides: {len(prune_candidates(space))}")
+        
+        self.search_results = []
+        for method in methods:
+            result = search_hyperparameters(
+                base_model,
+                space,
+                X_train,
+                y_train,
+                method=method,
+                cv=tuning_config.get('cv_folds', 5),
+                scoring=tuning_config.get('scoring', 'roc_auc'),
+                n_jobs=tuning_config.get('n_jobs', -1),
+                n_iter=tuning_config.get('n_iter', 20),
+                halving_factor=tuning_config.get('halving_factor', 3),
+                random_state=tuning_config.get('random_state', 42)
+            )
+            self.search_results.append(result)
+            print(f"   ⏱️ {method}: {result['n_fits']} fits "
+                  f"(≈{result['fit_cost']:.0f} sur l'échantillon complet), "
+                  f"CV {result['best_score']:.4f}, {result['wall_time']:.1f}s")
+        
+        best = max(self.search_results, key=lambda r: r['best_score'])
+        self.best_params = best['best_params']
+        self.best_model = best['best_estimator']
+        self.oof_decision = best['oof_decision']
+        
+        print(f"   ✅ Stratégie retenue: {best['method']}")
+        print(f"   ✅ Meilleurs paramètres: {self.best_params}")
+        print(f"   ✅ Meilleur score CV: {best['best_score']:.4f}")
+        
+        return self.best_model
+    
+    def _compute_regularization_path(self, X_train: pd.DataFrame, y_train: pd.Series) -> Optional[Dict[str, Any]]:
+        """
+        Chemin de régularisation (AUC CV et coefficients en fonction de C)
+        pour les paramètres retenus, avec graphique pour la documentation du modèle
+        """
+        path_config = self.model_config.get('regularization_path', {})
+        if not path_config.get('enabled', True) or self.best_params is None:
+            return None
+        
+        tuning_config = self.model_config.get('hyperparameter_tuning', {})
+        low, high = path_config.get('C_range', [0.001, 100])
+        Cs = np.logspace(np.log10(low), np.log10(high), path_config.get('n_points', 25))
+        
+        params = {k: v for k, v in self.best_params.items() if k != 'C'}
+        params['solver'] = PATH_SOLVERS.get(params.get('penalty', 'l2'), 'saga')
+        
+        self.regularization_path = regularization_path(
+            LogisticRegression(random_state=42, **params),
+            X_train,
+            y_train,
+            Cs,
+            cv=tuning_config.get('cv_folds', 5),
+            scoring=tuning_config.get('scoring', 'roc_auc'),
+            n_jobs=tuning_config.get('n_jobs', -1),
+            random_state=tuning_config.get('random_state', 42)
         )
+        self.regularization_path['best_C'] = self.best_params.get('C')
+        self.regularization_path['plot_path'] = self._plot_regularization_path(self.regularization_path)
         
-        # Entraînement
-        grid_search.fit(X_train, y_train)
+        print(f"   ✅ Chemin de régularisation: {len(Cs)} valeurs de C "
+              f"en {self.regularization_path['wall_time']:.1f}s")
+        print(f"   ✅ Graphique: {self.regularization_path['plot_path']}")
         
-        self.best_params = grid_search.best_params_
-        self.best_model = grid_search.best_estimator_
+        return self.regularization_path
+    
+    def _plot_regularization_path(self, path: Dict[str, Any]) -> str:
+        """Graphique AUC CV et coefficients en fonction de C"""
         
-        print(f"   ✅ Meilleurs paramètres: {self.best_params}")
-        print(f"   ✅ Meilleur score CV: {grid_search.best_score_:.4f}")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        plot_path = Path("reports") / f"regularization_path_{timestamp}.png"
+        plot_path.parent.mkdir(exist_ok=True)
         
-        return self.best_model
+        Cs = np.asarray(path['C'])
+        mean, std = np.asarray(path['score_mean']), np.asarray(path['score_std'])
+        
+        fig, (ax_score, ax_coef) = plt.subplots(2, 1, figsize=(10, 10), sharex=True)
+        
+        ax_score.plot(Cs, mean, marker='o', color='steelblue')
+        ax_score.fill_between(Cs, mean - std, mean + std, color='steelblue', alpha=0.2)
+        ax_score.set_ylabel('AUC-ROC (validation croisée)')
+        ax_score.set_title('Chemin de régularisation')
+        
+        ax_coef.plot(Cs, np.asarray(path['coefs']))
+        ax_coef.axhline(0, color='black', linewidth=0.5)
+        ax_coef.set_xlabel('C (inverse de la force de régularisation)')
+        ax_coef.set_ylabel('Coefficients')
+        
+        for ax in (ax_score, ax_coef):
+            ax.set_xscale('log')
+            ax.grid(True, alpha=0.3)
+            if path.get('best_C') is not None:
+                ax.axvline(path['best_C'], color='red', linestyle='--', label=f"C retenu = {path['best_C']}")
+        ax_score.legend()
+        
+        plt.tight_layout()
+        plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+        plt.close(fig)
+        
+        return str(plot_path)
     
     def _train_basic_model(self, X_train: pd.DataFrame, y_train: pd.Series) -> Any:
         """Entraîne un modèle de base sans optimisation"""
@@ -239,12 +451,16 @@ class TrainingPipeline:
         # Métriques de classification
         from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
         
+        # AUC, KS, Gini et table de gains : un seul tri des scores
+        discrimination = score_metrics(y_test, y_proba)
+        self.gains_table = discrimination['gains_table']
+        
         metrics = {
             'accuracy': accuracy_score(y_test, y_pred),
             'precision': precision_score(y_test, y_pred),
             'recall': recall_score(y_test, y_pred),
             'f1_score': f1_score(y_test, y_pred),
-            'auc_roc': roc_auc_score(y_test, y_proba)
+            'auc_roc': discrimination['auc_roc']
         }
         
         # Métriques métier
@@ -257,13 +473,10 @@ class TrainingPipeline:
             'precision_1': tp / (tp + fp) if (tp + fp) > 0 else 0
         })
         
-        # Calcul KS Statistic
-        fpr, tpr, _ = roc_curve(y_test, y_proba)
-        ks_stat = np.max(tpr - fpr)
-        metrics['ks_statistic'] = ks_stat
-        
-        # Calcul Gini
-        metrics['gini_coefficient'] = 2 * metrics['auc_roc'] - 1
+        # Métriques de discrimination
+        metrics['ks_statistic'] = discrimination['ks_statistic']
+        metrics['ks_threshold'] = discrimination['ks_threshold']
+        metrics['gini_coefficient'] = discrimination['gini_coefficient']
         
         self.metrics = metrics
         
@@ -279,23 +492,61 @@ class TrainingPipeline:
     
     def _calibrate_model(self, model: Any, X_train: pd.DataFrame, 
                         y_train: pd.Series) -> Any:
-        """Calibre le modèle pour améliorer les probabilités"""
-        
-        print("   ⚖️ Calibration du modèle...")
+        """
+        Calibre le modèle pour améliorer les probabilités
+
+        Le calibrateur (`model.calibration.method` : platt ou isotonic) est
+        ajusté sur les fonctions de décision hors échantillon de la validation
+        croisée du tuning ; le modèle entraîné n'est pas ré-entraîné. Sans
+        tuning, ces scores sont obtenus par une validation croisée du modèle.
+        """
         
-        # Calibration avec validation croisée
-        calibrated_model = CalibratedClassifierCV(
-            model, 
-            method='isotonic',  # ou 'sigmoid'
-            cv=3
-        )
+        calibration_config = self.model_config.get('calibration', {})
+        if not calibration_config.get('enabled', True):
+            print("   ⏭️ Calibration désactivée")
+            return model
+        
+        method = calibration_config.get('method', 'platt')
+        print(f"   ⚖️ Calibration du modèle ({method})...")
+        
+        oof_decision = self.oof_decision
+        if oof_decision is None or len(oof_decision) != len(y_train):
+            tuning_config = self.model_config.get('hyperparameter_tuning', {})
+            folds = StratifiedKFold(n_splits=tuning_config.get('cv_folds', 5), shuffle=True,
+                                    random_state=tuning_config.get('random_state', 42))
+            oof_decision = cross_val_predict(model, X_train, y_train, cv=folds,
+                                             method='decision_function', n_jobs=tuning_config.get('n_jobs', -1))
+        else:
+            print("   ♻️ Scores hors échantillon repris de la validation croisée du tuning")
         
-        calibrated_model.fit(X_train, y_train)
+        calibrated_model = OOFCalibratedClassifier(model, method=method).fit(oof_decision, y_train)
         
         print("   ✅ Modèle calibré avec succès")
         
         return calibrated_model
     
+    def _load_input_pipeline(self) -> Dict[str, Any]:
+        """
+        Pipeline d'entrée figé par le pipeline de données, à joindre aux artefacts
+        
+        Returns:
+            Arguments feature_state, cleaning_state et variable_transformer de
+            save_model_artifact (None pour chaque fichier absent)
+        """
+        def read_json(filename: str) -> Optional[Dict[str, Any]]:
+            path = self.data_path / filename
+            if not path.exists():
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        
+        transformer_path = self.data_path / "variable_transformer.joblib"
+        return {
+            'feature_state': read_json("feature_engineer_state.json"),
+            'cleaning_state': read_json("cleaning_plan.json"),
+            'variable_transformer': joblib.load(transformer_path) if transformer_path.exists() else None
+        }
+    
     def _save_model(self, model: Any, metrics: Dict[str, float]) -> str:
         """Sauvegarde le modèle entraîné"""
         
@@ -321,8 +572,29 @@ class TrainingPipeline:
         best_model_path = self.models_path / "best_model.pkl"
         joblib.dump(model_info, best_model_path)
         
+        # Artefact versionné (manifeste JSON + arrays .npy + estimateur chargé à la demande)
+        artifact_path = save_model_artifact(
+            self.models_path / "artifacts", model_path.stem, model,
+            metrics=metrics, params=self.best_params,
+            version=model_info['version'], timestamp=timestamp,
+            **self._load_input_pipeline()
+        )
+        
+        # Index des modèles (sélection du loader sans scan du répertoire)
+        feature_names = getattr(model, 'feature_names_in_', None)
+        ModelIndex(self.models_path).register(
+            artifact_path.name, artifact_path,
+            metrics=metrics,
+            features=list(feature_names) if feature_names is not None else None,
+            trained_at=timestamp,
+            metadata={'model_type': type(model).__name__, 'params': self.best_params,
+                      'pickle_path': str(model_path)}
+        )
+        
         print(f"   ✅ Modèle sauvegardé: {model_path}")
         print(f"   ✅ Meilleur modèle: {best_model_path}")
+        print(f"   ✅ Artefact: {artifact_path}")
+        print(f"   ✅ Index des modèles: {self.models_path / 'model_index.db'}")
         
         return str(model_path)
     
@@ -363,6 +635,10 @@ MÉTRIQUES MÉTIER:
 KS Statistic: {metrics.get('ks_statistic', 'N/A'):.4f}
 Gini Coefficient: {metrics.get('gini_coefficient', 'N/A'):.4f}
 
+TABLE DE GAINS (DÉCILES, JEU DE TEST):
+{'-' * 37}
+{self._format_gains_table()}
+
 INTERPRÉTATION:
 {'-' * 15}
 - AUC-ROC > 0.7: Modèle acceptable
@@ -382,6 +658,16 @@ STATUS: {'✅ MODÈLE ACCEPTABLE' if metrics.get('auc_roc', 0) > 0.7 else '⚠
         
         return str(report_path)
     
+    def _format_gains_table(self) -> str:
+        """Formate la table de gains pour le rapport"""
+        if self.gains_table is None or self.gains_table.empty:
+            return "N/A"
+        lines = [f"{'Décile':<7} {'N':>5} {'Défauts':>8} {'Taux':>7} {'Gain cumulé':>12} {'Lift':>6}"]
+        for row in self.gains_table.itertuples():
+            lines.append(f"{row.bin:<7} {row.n:>5.0f} {row.n_defaults:>8.0f} {row.default_rate:>7.1%} "
+                         f"{row.cumulative_gain:>12.1%} {row.lift:>6.2f}")
+        return '\n'.join(lines)
+    
     def _format_params(self, params: Dict) -> str:
         """Formate les paramètres pour le rapport"""
         return '\n'.join([f"{k}: {v}" for k, v in params.items()])
@@ -10,14 +10,19 @@ from datetime import datetime
 import json
 import warnings
 import sys
+from pathlib import Path
 warnings.filterwarnings('ignore')
 
+# Accès aux modules du projet (src/)
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.metrics import score_metrics
+from src.utils import load_dataset, resolve_dataset_path
+
 # CORRECTION: Import global explicite avant pickle
 import sklearn
 from sklearn.calibration import CalibratedClassifierCV
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import roc_auc_score, accuracy_score, precision_score, recall_score, f1_score
-from scipy import stats
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 
 # Maintenant pickle avec les modules correctement importés
 import pickle
@@ -37,13 +42,6 @@ def load_model_with_imports(model_path):
     except Exception as e:
         return None, str(e)
 
-def calculate_ks_statistic(y_true, y_scores):
-    """Calcul KS Statistic"""
-    scores_pos = y_scores[y_true == 1]
-    scores_neg = y_scores[y_true == 0]
-    ks_stat, _ = stats.ks_2samp(scores_pos, scores_neg)
-    return ks_stat
-
 def main():
     """
     Exécution complète ÉTAPE 6
@@ -53,7 +51,7 @@ def main():
     
     # 1. Vérifications préalables
     model_path = "modeling/models/best_model.pkl"
-    data_path = "data/processed/credit_all_transformed.csv"
+    data_path = str(resolve_dataset_path("data/processed/credit_all_transformed.parquet"))
     
     print("\n📋 VÉRIFICATION DES PRÉREQUIS")
     print("-" * 40)
@@ -82,7 +80,7 @@ def main():
     
     # Chargement données
     try:
-        data = pd.read_csv(data_path)
+        data = load_dataset(data_path)
         X = data.drop('cible', axis=1)
         y = data['cible']
         print(f"✅ Données: {len(data)} échantillons, {len(X.columns)} features")
@@ -98,14 +96,15 @@ def main():
         y_pred_proba = model.predict_proba(X)[:, 1]
         y_pred = model.predict(X)
         
-        # Métriques
-        auc_roc = roc_auc_score(y, y_pred_proba)
+        # Métriques (AUC, KS, Gini et déciles : un seul tri des scores)
+        base_metrics = score_metrics(y, y_pred_proba)
+        auc_roc = base_metrics['auc_roc']
         accuracy = accuracy_score(y, y_pred)
         precision = precision_score(y, y_pred)
         recall = recall_score(y, y_pred)
         f1 = f1_score(y, y_pred)
-        ks_stat = calculate_ks_statistic(y, y_pred_proba)
-        gini = 2 * auc_roc - 1
+        ks_stat = base_metrics['ks_statistic']
+        gini = base_metrics['gini_coefficient']
         
         print(f"📊 MÉTRIQUES DE PERFORMANCE:")
         print(f"   AUC-ROC: {auc_roc:.4f}")
@@ -113,8 +112,10 @@ def main():
         print(f"   Precision: {precision:.4f}")
         print(f"   Recall: {recall:.4f}")
         print(f"   F1-Score: {f1:.4f}")
-        print(f"   KS Statistic: {ks_stat:.4f}")
+        print(f"   KS Statistic: {ks_stat:.4f} (seuil {base_metrics['ks_threshold']:.4f})")
         print(f"   Gini Coefficient: {gini:.4f}")
+        print(f"   Taux de défaut par décile: "
+              f"{', '.join(f'{rate:.0%}' for rate in base_metrics['gains_table']['default_rate'])}")
         
     except Exception as e:
         print(f"❌ Erreur test performance: {e}")
@@ -140,8 +141,9 @@ def main():
         y_period = y.loc[sample_indices]
         
         y_pred_proba_period = model.predict_proba(X_period)[:, 1]
-        auc_period = roc_auc_score(y_period, y_pred_proba_period)
-        ks_period = calculate_ks_statistic(y_period, y_pred_proba_period)
+        period_metrics = score_metrics(y_period, y_pred_proba_period)
+        auc_period = period_metrics['auc_roc']
+        ks_period = period_metrics['ks_statistic']
         
         temporal_results.append({
             'period': period,
@@ -185,7 +187,7 @@ def main():
                 new_defaults = np.random.choice(non_defaults, additional, replace=False)
                 y_stress.loc[new_defaults] = 1
         
-        auc_stress = roc_auc_score(y_stress, y_pred_proba)
+        auc_stress = score_metrics(y_stress, y_pred_proba)['auc_roc']
         degradation = auc_roc - auc_stress
         
         stress_results[name.lower()] = {
@@ -227,7 +229,9 @@ def main():
         'performance_metrics': {
             'auc_roc': float(auc_roc),
             'ks_statistic': float(ks_stat),
-            'gini_coefficient': float(gini)
+            'ks_threshold': float(base_metrics['ks_threshold']),
+            'gini_coefficient': float(gini),
+            'gains_table': base_metrics['gains_table'].to_dict('records')
         },
         'temporal_stability': {
             'auc_mean': float(auc_mean),
@@ -10,8 +10,15 @@ import os
 from datetime import datetime
 import json
 import warnings
+import sys
+from pathlib import Path
 warnings.filterwarnings('ignore')
 
+# Accès aux modules du projet (src/)
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.metrics import score_metrics
+from src.utils import load_dataset, resolve_dataset_path
+
 # Imports nécessaires pour le modèle existant
 import sklearn
 from sklearn.linear_model import LogisticRegression
@@ -19,7 +26,7 @@ from sklearn.calibration import CalibratedClassifierCV
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import (
-    roc_auc_score, accuracy_score, precision_score, recall_score,
+    accuracy_score, precision_score, recall_score,
     f1_score, confusion_matrix, classification_report
 )
 from sklearn.pipeline import Pipeline
@@ -35,26 +42,6 @@ def load_model_safely(model_path):
     except Exception as e:
         return None, str(e)
 
-def calculate_ks_statistic(y_true, y_scores):
-    """
-    Calcul de la statistique KS (Kolmogorov-Smirnov)
-    """
-    # Séparation des scores par classe
-    scores_pos = y_scores[y_true == 1]
-    scores_neg = y_scores[y_true == 0]
-    
-    # Calcul KS manuel
-    from scipy import stats
-    ks_stat, _ = stats.ks_2samp(scores_pos, scores_neg)
-    return ks_stat
-
-def calculate_gini_coefficient(y_true, y_scores):
-    """
-    Calcul du coefficient de Gini
-    """
-    auc = roc_auc_score(y_true, y_scores)
-    return 2 * auc - 1
-
 def run_etape6_validation():
     """
     Exécution complète de l'ÉTAPE 6 : Backtesting et Validation
@@ -67,7 +54,7 @@ def run_etape6_validation():
     print("-" * 40)
     
     model_path = "modeling/models/best_model.pkl"
-    data_path = "data/processed/credit_all_transformed.csv"
+    data_path = str(resolve_dataset_path("data/processed/credit_all_transformed.parquet"))
     
     # Vérifications
     checks = {
@@ -99,7 +86,7 @@ def run_etape6_validation():
     print("-" * 40)
     
     try:
-        data = pd.read_csv(data_path)
+        data = load_dataset(data_path)
         X = data.drop('cible', axis=1)
         y = data['cible']
         print(f"✅ Données: {len(data)} échantillons, {len(X.columns)} features")
@@ -117,25 +104,28 @@ def run_etape6_validation():
         y_pred_proba = model.predict_proba(X)[:, 1]
         y_pred = model.predict(X)
         
-        # Métriques principales
-        auc_roc = roc_auc_score(y, y_pred_proba)
+        # Métriques de discrimination (AUC, KS, Gini et déciles : un seul tri des scores)
+        base_metrics = score_metrics(y, y_pred_proba)
+        auc_roc = base_metrics['auc_roc']
+        ks_stat = base_metrics['ks_statistic']
+        gini = base_metrics['gini_coefficient']
+        
+        # Métriques de classification
         accuracy = accuracy_score(y, y_pred)
         precision = precision_score(y, y_pred)
         recall = recall_score(y, y_pred)
         f1 = f1_score(y, y_pred)
         
-        # Métriques métier
-        ks_stat = calculate_ks_statistic(y, y_pred_proba)
-        gini = calculate_gini_coefficient(y, y_pred_proba)
-        
         print(f"📊 MÉTRIQUES DE PERFORMANCE:")
         print(f"   AUC-ROC: {auc_roc:.4f}")
         print(f"   Accuracy: {accuracy:.4f}")
         print(f"   Precision: {precision:.4f}")
         print(f"   Recall: {recall:.4f}")
         print(f"   F1-Score: {f1:.4f}")
-        print(f"   KS Statistic: {ks_stat:.4f}")
+        print(f"   KS Statistic: {ks_stat:.4f} (seuil {base_metrics['ks_threshold']:.4f})")
         print(f"   Gini Coefficient: {gini:.4f}")
+        print(f"   Taux de défaut par décile: "
+              f"{', '.join(f'{rate:.0%}' for rate in base_metrics['gains_table']['default_rate'])}")
         
     except Exception as e:
         print(f"❌ Erreur validation de base: {e}")
@@ -176,8 +166,9 @@ def run_etape6_validation():
         y_pred_proba_period = model.predict_proba(X_period)[:, 1]
         
         # Métriques
-        auc_period = roc_auc_score(y_period, y_pred_proba_period)
-        ks_period = calculate_ks_statistic(y_period, y_pred_proba_period)
+        period_metrics = score_metrics(y_period, y_pred_proba_period)
+        auc_period = period_metrics['auc_roc']
+        ks_period = period_metrics['ks_statistic']
         
         period_result = {
             'period': period,
@@ -247,8 +238,9 @@ def run_etape6_validation():
                 y_stress.loc[new_defaults] = 1
         
         # Performance sous stress
-        auc_stress = roc_auc_score(y_stress, y_pred_proba)
-        ks_stress = calculate_ks_statistic(y_stress, y_pred_proba)
+        stress_metrics = score_metrics(y_stress, y_pred_proba)
+        auc_stress = stress_metrics['auc_roc']
+        ks_stress = stress_metrics['ks_statistic']
         performance_degradation = auc_roc - auc_stress
         
         stress_results[scenario['name']] = {
@@ -308,7 +300,9 @@ def run_etape6_validation():
             'recall': recall,
             'f1_score': f1,
             'ks_statistic': ks_stat,
-            'gini_coefficient': gini
+            'ks_threshold': base_metrics['ks_threshold'],
+            'gini_coefficient': gini,
+            'gains_table': base_metrics['gains_table'].to_dict('records')
         },
         'temporal_stability': {
             'auc_mean': auc_mean,
@@ -16,7 +16,7 @@ __version__ = "1.0.0"
 __author__ = "Credit Scoring Team"
 
 # Import main classes for easy access
-from .data_processing import DataProcessor
+from .data_processing import DataProcessor, CleaningPlan
 from .utils import setup_logging, load_config
 
 # Import transformers
@@ -29,6 +29,7 @@ except ImportError:
 
 __all__ = [
     "DataProcessor",
+    "CleaningPlan",
     "setup_logging",
     "load_config"
 ]
@@ -0,0 +1,127 @@
+"""
+Calibration des probabilités sur des scores hors échantillon (out-of-fold).
+
+La validation croisée de l'optimisation des hyperparamètres produit déjà,
+pour chaque ligne d'entraînement, la fonction de décision d'un modèle qui ne
+l'a pas vue. Le calibrateur (Platt ou isotonique) est ajusté directement sur
+ces scores : le modèle de base, entraîné une seule fois sur toutes les
+lignes, n'est pas ré-entraîné (équivalent de
+`CalibratedClassifierCV(ensemble=False)` sans ses K fits supplémentaires).
+"""
+
+from typing import Any, Optional
+
+import numpy as np
+from scipy.optimize import minimize
+from scipy.special import expit
+from sklearn.isotonic import IsotonicRegression
+
+
+# Méthodes acceptées (noms de la configuration et de scikit-learn)
+CALIBRATION_METHODS = {'platt': 'sigmoid', 'sigmoid': 'sigmoid', 'isotonic': 'isotonic'}
+
+
+class PlattCalibrator:
+    """
+    Calibration sigmoïde de Platt : p = 1 / (1 + exp(a * d + b))
+
+    Mêmes conventions que le calibrateur sigmoïde de scikit-learn (attributs
+    `a_`, `b_`, cibles lissées par les a priori de Platt).
+    """
+
+    def fit(self, decision: np.ndarray, y: np.ndarray) -> 'PlattCalibrator':
+        """Ajuste a et b par maximum de vraisemblance"""
+        decision = np.asarray(decision, dtype=np.float64).ravel()
+        y = np.asarray(y).ravel()
+
+        # Cibles lissées (Platt 2000, section 2.2)
+        n_positive = float(np.sum(y > 0))
+        n_negative = len(y) - n_positive
+        target = np.where(y > 0, (n_positive + 1.0) / (n_positive + 2.0), 1.0 / (n_negative + 2.0))
+
+        def loss_grad(ab):
+            raw = -(ab[0] * decision + ab[1])
+            proba = expit(raw)
+            loss = np.sum(np.logaddexp(0, raw) - target * raw)
+            residual = proba - target
+            return loss, np.array([-residual @ decision, -residual.sum()])
+
+        start = np.array([0.0, np.log((n_negative + 1.0) / (n_positive + 1.0))])
+        result = minimize(loss_grad, start, jac=True, method='L-BFGS-B')
+        self.a_, self.b_ = float(result.x[0]), float(result.x[1])
+        return self
+
+    def predict(self, decision: np.ndarray) -> np.ndarray:
+        """Probabilités calibrées"""
+        return expit(-(self.a_ * np.asarray(decision, dtype=np.float64) + self.b_))
+
+
+class OOFCalibratedClassifier:
+    """
+    Classifieur binaire calibré sur des scores hors échantillon
+
+    Enveloppe un estimateur déjà entraîné (ex: LogisticRegression) et un
+    calibrateur ajusté sur les fonctions de décision out-of-fold. Expose
+    l'interface de prédiction de scikit-learn (`predict_proba`, `predict`,
+    `classes_`, `feature_names_in_`).
+    """
+
+    def __init__(self, estimator: Any, method: str = 'platt'):
+        """
+        Args:
+            estimator: Classifieur binaire entraîné, avec decision_function
+            method: 'platt' (ou 'sigmoid') ou 'isotonic'
+        """
+        if method not in CALIBRATION_METHODS:
+            raise ValueError(f"Méthode de calibration inconnue: {method} (attendu: {list(CALIBRATION_METHODS)})")
+        self.estimator = estimator
+        self.method = CALIBRATION_METHODS[method]
+
+    def fit(self, oof_decision: np.ndarray, y: np.ndarray) -> 'OOFCalibratedClassifier':
+        """
+        Ajuste le calibrateur
+
+        Args:
+            oof_decision: Fonction de décision hors échantillon de chaque ligne d'entraînement
+            y: Cible des mêmes lignes
+
+        Returns:
+            self
+        """
+        oof_decision = np.asarray(oof_decision, dtype=np.float64).ravel()
+        y = np.asarray(y).ravel()
+        if len(oof_decision) != len(y):
+            raise ValueError(f"{len(oof_decision)} scores hors échantillon pour {len(y)} cibles")
+
+        self.classes_ = self.estimator.classes_
+        if len(self.classes_) != 2:
+            raise ValueError("Seuls les modèles binaires sont supportés")
+        y = (y == self.classes_[1]).astype(int)
+
+        if self.method == 'isotonic':
+            self.calibrator = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip')
+        else:
+            self.calibrator = PlattCalibrator()
+        self.calibrator.fit(oof_decision, y)
+        return self
+
+    @property
+    def feature_names_in_(self) -> Optional[np.ndarray]:
+        return getattr(self.estimator, 'feature_names_in_', None)
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.estimator.n_features_in_
+
+    def decision_function(self, X: Any) -> np.ndarray:
+        """Fonction de décision du modèle de base"""
+        return self.estimator.decision_function(X)
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Probabilités calibrées (n_lignes, 2)"""
+        proba = np.clip(self.calibrator.predict(self.decision_function(X)), 0.0, 1.0)
+        return np.column_stack([1.0 - proba, proba])
+
+    def predict(self, X: Any) -> np.ndarray:
+        """Classe prédite (seuil 0.5 sur la probabilité calibrée)"""
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
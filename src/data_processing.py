@@ -6,8 +6,234 @@ Suit le workflow ML défini dans l'architecture.
 import pandas as pd
 import numpy as np
 import os
+import json
 import logging
-from typing import Tuple, Dict, Any
+from pathlib import Path
+from typing import Tuple, Dict, Any, List, Optional, Union
+
+try:
+    from .utils import save_dataset, get_memory_usage
+except ImportError:  # Module importé directement depuis src/
+    from utils import save_dataset, get_memory_usage
+
+# Variables qualitatives du jeu de crédit, typées `category` dès le chargement
+CATEGORICAL_COLUMNS = [
+    'historique', 'objet', 'epargne', 'anciennete_emploi', 'taux_endettement',
+    'statut', 'autres_debiteurs', 'domicile', 'biens', 'credit_exterieur',
+    'logement', 'emploi', 'nombre_personnes', 'telephone', 'cible', 'compte',
+    'nombre_credit', 'travailleur_etranger'
+]
+
+# Variables numériques à valeurs entières, réduites au plus petit type exact
+INTEGER_COLUMNS = ['duree', 'montant', 'age']
+
+# Variables numériques écrêtées par la méthode IQR
+OUTLIER_COLUMNS = ['duree', 'montant', 'age']
+
+CLEANING_PLAN_VERSION = 1
+
+
+def _downcast_integer(series: pd.Series) -> pd.Series:
+    """
+    Plus petit type entier pour une colonne entière ; float32 si elle contient
+    des valeurs manquantes (conversion appliquée seulement si elle est exacte)
+    """
+    if not pd.api.types.is_numeric_dtype(series):
+        return series
+    
+    values = series.dropna()
+    if not (values % 1 == 0).all():
+        return series
+    if len(values) == len(series):
+        return pd.to_numeric(series, downcast='integer')
+    
+    as_float32 = series.astype(np.float32)
+    return as_float32 if (as_float32[values.index] == values).all() else series
+
+
+def _normalize_categories(series: pd.Series) -> pd.Series:
+    """Espaces et casse normalisés sur les modalités d'une colonne `category` (un calcul par niveau)"""
+    levels = series.cat.categories.astype(str).str.strip().str.lower()
+    if levels.is_unique:
+        return series.cat.rename_categories(levels)
+    
+    # Modalités confondues après normalisation (ex: 'Propriétaire ' et 'propriétaire')
+    merged = pd.Index(levels.unique())
+    level_codes = merged.get_indexer(levels)
+    codes = series.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, level_codes[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(new_codes, merged), index=series.index, name=series.name)
+
+
+def _to_python(value: Any) -> Any:
+    """Scalaire NumPy -> type Python (sérialisation JSON), NaN -> None"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+class CleaningPlan:
+    """
+    Plan de nettoyage appris en une passe : valeur d'imputation de chaque
+    colonne (médiane des variables numériques, mode des autres) et bornes
+    d'écrêtage IQR des variables numériques.
+    
+    Toutes les médianes, tous les modes et tous les quartiles sont calculés
+    par un appel DataFrame chacun ; l'application est un `fillna` et un
+    `clip` par colonne vectorisés. Le plan se sauvegarde en JSON et
+    s'applique tel quel à de nouveaux lots, sans réapprentissage.
+    """
+    
+    def __init__(self, fill_values: Optional[Dict[str, Any]] = None,
+                 clip_bounds: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Args:
+            fill_values: Valeur d'imputation par colonne
+            clip_bounds: Bornes (basse, haute) d'écrêtage par colonne
+        """
+        self.fill_values = dict(fill_values or {})
+        self.clip_bounds = {col: (float(low), float(high)) for col, (low, high) in (clip_bounds or {}).items()}
+    
+    @classmethod
+    def fit(cls, df: pd.DataFrame, outlier_columns: List[str] = OUTLIER_COLUMNS,
+            iqr_multiplier: float = 1.5) -> 'CleaningPlan':
+        """
+        Apprend le plan sur les données d'entraînement
+        
+        Args:
+            df: Données (doublons déjà supprimés)
+            outlier_columns: Variables numériques à écrêter
+            iqr_multiplier: Largeur des bornes en nombre d'écarts interquartiles
+        """
+        numeric_cols = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+        other_cols = [col for col in df.columns if col not in numeric_cols]
+        
+        fill_values = {}
+        if numeric_cols:
+            fill_values.update(df[numeric_cols].median().to_dict())
+        if other_cols:
+            modes = df[other_cols].mode()
+            for col in other_cols:
+                mode_value = modes[col].iloc[0] if len(modes) else np.nan
+                fill_values[col] = 'unknown' if pd.isna(mode_value) else mode_value
+        
+        # Quartiles des données imputées (l'écrêtage suit l'imputation), en float64 quel que soit le type stocké
+        clip_cols = [col for col in outlier_columns if col in numeric_cols]
+        clip_bounds = {}
+        if clip_cols:
+            values = df[clip_cols].fillna({col: fill_values[col] for col in clip_cols}).astype(float)
+            quartiles = values.quantile([0.25, 0.75])
+            iqr = quartiles.loc[0.75] - quartiles.loc[0.25]
+            lower = quartiles.loc[0.25] - iqr_multiplier * iqr
+            upper = quartiles.loc[0.75] + iqr_multiplier * iqr
+            clip_bounds = {col: (lower[col], upper[col]) for col in clip_cols}
+        
+        return cls(fill_values, clip_bounds)
+    
+    def impute(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int], int]:
+        """
+        Impute les valeurs manquantes
+        
+        Returns:
+            (données imputées, nombre de valeurs imputées par colonne,
+            nombre de valeurs restées manquantes faute de valeur d'imputation)
+        """
+        missing = df.isnull().sum()
+        fill_values = {col: value for col, value in self.fill_values.items()
+                       if col in df.columns and missing[col] > 0 and not pd.isna(value)}
+        remaining = int(missing.sum()) - int(missing[list(fill_values)].sum())
+        if not fill_values:
+            return df, {}, remaining
+        
+        df = df.copy()
+        for col, value in fill_values.items():
+            if isinstance(df[col].dtype, pd.CategoricalDtype) and value not in df[col].cat.categories:
+                df[col] = df[col].cat.add_categories([value])
+        
+        return df.fillna(fill_values), {col: int(missing[col]) for col in fill_values}, remaining
+    
+    def clip(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """
+        Écrête les variables numériques à leurs bornes (winsorization)
+        
+        Seules les colonnes qui ont des valeurs hors bornes sont modifiées ;
+        une colonne entière garde son type si les valeurs écrêtées le permettent.
+        
+        Returns:
+            (données écrêtées, nombre de valeurs hors bornes par colonne)
+        """
+        clip_cols = [col for col in self.clip_bounds if col in df.columns]
+        if not clip_cols:
+            return df, {}
+        
+        values = df[clip_cols].astype(float)
+        lower = pd.Series({col: self.clip_bounds[col][0] for col in clip_cols})
+        upper = pd.Series({col: self.clip_bounds[col][1] for col in clip_cols})
+        outliers = (values.lt(lower, axis=1) | values.gt(upper, axis=1)).sum()
+        
+        clipped_cols = outliers.index[outliers > 0]
+        if len(clipped_cols):
+            df = df.copy()
+            clipped = values[clipped_cols].clip(lower=lower[clipped_cols], upper=upper[clipped_cols], axis=1)
+            for col in clipped_cols:
+                column = clipped[col]
+                if pd.api.types.is_integer_dtype(df[col]) and (column % 1 == 0).all():
+                    column = column.astype(df[col].dtype)
+                df[col] = column
+        
+        return df, {col: int(outliers[col]) for col in clip_cols}
+    
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Imputation puis écrêtage d'un nouveau lot avec le plan appris"""
+        df, _, _ = self.impute(df)
+        df, _ = self.clip(df)
+        return df
+    
+    def clean(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Nettoyage d'un nouveau lot comme `DataProcessor.clean_data` : plan
+        appris, puis chaînes sans espaces de bord et en minuscules
+        """
+        df = self.apply(df)
+        text_cols = df.select_dtypes(include=['object', 'string']).columns
+        if len(text_cols):
+            df = df.copy()
+            for col in text_cols:
+                df[col] = df[col].astype(str).str.strip().str.lower()
+        return df
+    
+    def get_state(self) -> Dict[str, Any]:
+        """État du plan, sérialisable en JSON"""
+        return {
+            'version': CLEANING_PLAN_VERSION,
+            'fill_values': {col: _to_python(value) for col, value in self.fill_values.items()},
+            'clip_bounds': {col: list(bounds) for col, bounds in self.clip_bounds.items()}
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'CleaningPlan':
+        """Plan restauré depuis get_state"""
+        if state.get('version') != CLEANING_PLAN_VERSION:
+            raise ValueError(f"Version de plan de nettoyage non supportée: {state.get('version')}")
+        fill_values = {col: np.nan if value is None else value for col, value in state['fill_values'].items()}
+        return cls(fill_values, state['clip_bounds'])
+    
+    def save(self, path: Union[str, Path]) -> Path:
+        """Sauvegarde le plan (JSON)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.get_state(), f, indent=2, ensure_ascii=False)
+        return path
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'CleaningPlan':
+        """Charge un plan sauvegardé"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_state(json.load(f))
+
 
 class DataProcessor:
     """
@@ -15,11 +241,21 @@ class DataProcessor:
     Suit l'ordre exact du workflow ML défini dans l'architecture.
     """
     
-    def __init__(self):
-        """Initialisation du processeur de données"""
+    def __init__(self, storage_format: str = 'parquet', export_csv: bool = False):
+        """
+        Initialisation du processeur de données
+        
+        Args:
+            storage_format: Format des données nettoyées sauvegardées ('parquet' ou 'csv')
+            export_csv: Écrit aussi une copie CSV des données nettoyées
+        """
+        self.storage_format = storage_format
+        self.export_csv = export_csv
         self.data = None
         self.cleaned_data = None
+        self.cleaning_plan = None
         self.quality_report = {}
+        self._cleaning_stats = {}
         
         # Configuration du logging
         logging.basicConfig(level=logging.INFO)
@@ -39,6 +275,9 @@ class DataProcessor:
         except Exception as e:
             print(f"❌ Erreur de chargement: {e}")
             return None
+        
+        # Typage des colonnes (category, entiers réduits)
+        self.optimize_dtypes()
             
         # Validation de l'intégrité du fichier
         self.validate_file_integrity()
@@ -54,6 +293,31 @@ class DataProcessor:
         
         return self.data
     
+    def optimize_dtypes(self) -> pd.DataFrame:
+        """
+        Typage des colonnes à l'ingestion
+        
+        Les variables qualitatives connues passent en `category` (codes
+        entiers + une chaîne par modalité) et les variables entières au plus
+        petit type exact. La mémoire avant/après est ajoutée au rapport qualité.
+        """
+        print("\n🗜️ Typage des colonnes...")
+        memory_before = get_memory_usage(self.data)
+        
+        for col in CATEGORICAL_COLUMNS:
+            if col in self.data.columns:
+                self.data[col] = self.data[col].astype('category')
+        
+        for col in INTEGER_COLUMNS:
+            if col in self.data.columns:
+                self.data[col] = _downcast_integer(self.data[col])
+        
+        memory_after = get_memory_usage(self.data)
+        self.quality_report['memory'] = {'before': memory_before, 'after': memory_after}
+        print(f"✅ Mémoire: {memory_before} → {memory_after}")
+        
+        return self.data
+    
     def validate_file_integrity(self):
         """Vérification de l'intégrité du fichier"""
         print("\n🔍 Validation de l'intégrité...")
@@ -125,9 +389,14 @@ class DataProcessor:
         print(f"✅ Rapport qualité généré")
         print(f"   • Valeurs manquantes: {len(missing_analysis)} colonnes affectées")
     
-    def clean_data(self) -> pd.DataFrame:
+    def clean_data(self, plan: Optional[CleaningPlan] = None, save: bool = True) -> pd.DataFrame:
         """
         ÉTAPE 1.2: Nettoyage des données
+        
+        Args:
+            plan: Plan de nettoyage déjà appris, appliqué sans réapprentissage
+                (nouveau lot) ; appris sur les données sinon
+            save: Sauvegarde les données nettoyées (data/processed/credit_cleaned)
         """
         print("\n🧹 ÉTAPE 1.2: NETTOYAGE DES DONNÉES")
         print("=" * 50)
@@ -142,6 +411,9 @@ class DataProcessor:
         # 1. Suppression des doublons
         self.remove_duplicates()
         
+        # Plan de nettoyage (imputation + écrêtage) appris en une passe
+        self.cleaning_plan = plan if plan is not None else CleaningPlan.fit(self.cleaned_data)
+        
         # 2. Traitement des valeurs manquantes
         self.handle_missing_values()
         
@@ -155,7 +427,7 @@ class DataProcessor:
         self.clean_target_variable()
         
         # 6. Validation finale
-        self.validate_cleaned_data()
+        self.validate_cleaned_data(save=save)
         
         return self.cleaned_data
     
@@ -166,6 +438,7 @@ class DataProcessor:
         initial_count = len(self.cleaned_data)
         self.cleaned_data = self.cleaned_data.drop_duplicates()
         removed_count = initial_count - len(self.cleaned_data)
+        self._cleaning_stats['duplicates_removed'] = removed_count
         
         if removed_count > 0:
             print(f"✅ {removed_count} doublons supprimés")
@@ -173,58 +446,34 @@ class DataProcessor:
             print("✅ Aucun doublon trouvé")
     
     def handle_missing_values(self):
-        """Traitement des valeurs manquantes"""
+        """Traitement des valeurs manquantes (médiane / mode du plan de nettoyage)"""
         print("\n🕳️ Traitement des valeurs manquantes...")
         
-        missing_before = self.cleaned_data.isnull().sum().sum()
+        self.cleaned_data, imputed, missing_after = self.cleaning_plan.impute(self.cleaned_data)
         
-        # Stratégies par type de variable
-        for col in self.cleaned_data.columns:
-            missing_count = self.cleaned_data[col].isnull().sum()
-            
-            if missing_count > 0:
-                if self.cleaned_data[col].dtype in ['int64', 'float64']:
-                    # Variables numériques: imputation par la médiane
-                    median_value = self.cleaned_data[col].median()
-                    self.cleaned_data[col].fillna(median_value, inplace=True)
-                    print(f"   • {col}: {missing_count} valeurs → médiane ({median_value:.1f})")
-                    
-                else:
-                    # Variables catégorielles: imputation par le mode
-                    mode_value = self.cleaned_data[col].mode().iloc[0] if not self.cleaned_data[col].mode().empty else 'unknown'
-                    self.cleaned_data[col].fillna(mode_value, inplace=True)
-                    print(f"   • {col}: {missing_count} valeurs → mode ('{mode_value}')")
-        
-        missing_after = self.cleaned_data.isnull().sum().sum()
+        for col, missing_count in imputed.items():
+            fill_value = self.cleaning_plan.fill_values[col]
+            if pd.api.types.is_numeric_dtype(self.cleaned_data[col]):
+                print(f"   • {col}: {missing_count} valeurs → médiane ({fill_value:.1f})")
+            else:
+                print(f"   • {col}: {missing_count} valeurs → mode ('{fill_value}')")
+        
+        # Restent manquantes : colonnes sans valeur d'imputation (vides à l'apprentissage, inconnues du plan)
+        missing_before = missing_after + sum(imputed.values())
+        self._cleaning_stats['missing_after'] = missing_after
         print(f"✅ Valeurs manquantes: {missing_before} → {missing_after}")
     
     def treat_outliers(self):
-        """Traitement des valeurs aberrantes"""
+        """Traitement des valeurs aberrantes (bornes IQR du plan de nettoyage)"""
         print("\n📈 Traitement des valeurs aberrantes...")
         
-        # Variables numériques à traiter
-        numeric_cols = ['duree', 'montant', 'age']
-        
-        for col in numeric_cols:
-            if col in self.cleaned_data.columns:
-                # Méthode IQR pour détecter les outliers
-                Q1 = self.cleaned_data[col].quantile(0.25)
-                Q3 = self.cleaned_data[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                
-                # Compter les outliers
-                outliers_mask = (self.cleaned_data[col] < lower_bound) | (self.cleaned_data[col] > upper_bound)
-                outliers_count = outliers_mask.sum()
-                
-                if outliers_count > 0:
-                    # Écrêtage des valeurs aberrantes (winsorization)
-                    self.cleaned_data.loc[self.cleaned_data[col] < lower_bound, col] = lower_bound
-                    self.cleaned_data.loc[self.cleaned_data[col] > upper_bound, col] = upper_bound
-                    print(f"   • {col}: {outliers_count} outliers écrêtés")
-                else:
-                    print(f"   • {col}: aucun outlier détecté")
+        self.cleaned_data, outliers = self.cleaning_plan.clip(self.cleaned_data)
+        
+        for col, outliers_count in outliers.items():
+            if outliers_count > 0:
+                print(f"   • {col}: {outliers_count} outliers écrêtés")
+            else:
+                print(f"   • {col}: aucun outlier détecté")
     
     def standardize_formats(self):
         """Standardisation des formats"""
@@ -232,7 +481,10 @@ class DataProcessor:
         
         # Nettoyage des chaînes de caractères
         for col in self.cleaned_data.columns:
-            if self.cleaned_data[col].dtype == 'object':
+            if isinstance(self.cleaned_data[col].dtype, pd.CategoricalDtype):
+                # Suppression des espaces et minuscules sur les modalités, pas ligne à ligne
+                self.cleaned_data[col] = _normalize_categories(self.cleaned_data[col])
+            elif self.cleaned_data[col].dtype == 'object':
                 # Suppression des espaces en début/fin
                 self.cleaned_data[col] = self.cleaned_data[col].astype(str).str.strip()
                 # Conversion en minuscules pour cohérence
@@ -273,25 +525,34 @@ class DataProcessor:
         
         return self.cleaned_data
     
-    def validate_cleaned_data(self):
-        """Validation finale des données nettoyées"""
+    def validate_cleaned_data(self, save: bool = True):
+        """
+        Validation finale des données nettoyées
+        
+        Les valeurs manquantes restantes viennent de l'imputation (pas de
+        nouveau parcours) ; les doublons sont recomptés sur les données
+        finales, l'écrêtage et la standardisation des modalités pouvant en
+        créer après remove_duplicates.
+        
+        Args:
+            save: Sauvegarde les données nettoyées
+        """
         print("\n✅ Validation finale...")
         
         # Vérifications finales
         checks = {
-            'Valeurs manquantes': self.cleaned_data.isnull().sum().sum(),
-            'Doublons': self.cleaned_data.duplicated().sum(),
+            'Valeurs manquantes': self._cleaning_stats.get('missing_after', 0),
+            'Doublons': int(self.cleaned_data.duplicated().sum()),
             'Lignes finales': len(self.cleaned_data)
         }
         
         for check, value in checks.items():
             print(f"   • {check}: {value}")
         
-        # Sauvegarde optionnelle
-        output_path = "data/processed/credit_cleaned.csv"
-        os.makedirs("data/processed", exist_ok=True)
-        self.cleaned_data.to_csv(output_path, index=False)
-        print(f"💾 Données nettoyées sauvegardées: {output_path}")
+        if save:
+            output_path = save_dataset(self.cleaned_data, "data/processed/credit_cleaned",
+                                       format=self.storage_format, export_csv=self.export_csv)
+            print(f"💾 Données nettoyées sauvegardées: {output_path}")
         
         return True
     
@@ -0,0 +1,200 @@
+"""
+Moteur de décision vectorisé pour le système de crédit scoring.
+
+Affecte les classes de risque, les décisions et les recommandations à partir
+des bandes de score et des seuils de la configuration (section `scoring` de
+config/config.yaml), en une seule passe NumPy (`np.searchsorted` /
+`np.select`) au lieu de boucles Python par ligne.
+
+Les résultats sont des `pd.Categorical` : une seule copie de chaque libellé,
+des codes entiers par ligne.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+
+# Valeurs par défaut alignées sur config/config.yaml (section scoring)
+DEFAULT_SCORE_RANGE = {'min': 300, 'max': 850}
+
+DEFAULT_RISK_CLASSES = {
+    'very_low': [750, 850],
+    'low': [650, 749],
+    'medium': [550, 649],
+    'high': [450, 549],
+    'very_high': [300, 449]
+}
+
+DEFAULT_DECISION_THRESHOLDS = {
+    'auto_approve': 0.1,
+    'standard_conditions': 0.2,
+    'auto_reject': 0.7
+}
+
+# Libellés des recommandations du pipeline d'inférence (ordre des catégories)
+RECOMMENDATIONS = [
+    "Approbation automatique",
+    "Approbation avec conditions standards",
+    "Approbation avec conditions renforcées",
+    "Examen manuel requis",
+    "Rejet automatique"
+]
+
+DECISIONS = ['auto_approve', 'manual_review', 'auto_reject']
+
+
+class ScoreBanding:
+    """
+    Affectation vectorisée de scores à des bandes nommées.
+
+    Chaque bande est définie par sa borne inférieure ; un score appartient à la
+    bande dont la borne inférieure est la plus grande borne <= score. Les scores
+    sous la plus petite borne, au-dessus de `upper_bound` ou manquants reçoivent
+    `unknown_label`.
+    """
+
+    def __init__(self, labels: Sequence[str], lower_bounds: Sequence[float],
+                 upper_bound: float = np.inf, unknown_label: Optional[str] = 'unknown'):
+        """
+        Args:
+            labels: Libellés des bandes (ordre des catégories en sortie)
+            lower_bounds: Borne inférieure (incluse) de chaque bande
+            upper_bound: Borne supérieure (incluse) de la bande la plus haute
+            unknown_label: Libellé des scores hors bandes (peut être une des bandes)
+        """
+        if len(labels) != len(lower_bounds) or not len(labels):
+            raise ValueError("labels et lower_bounds doivent être non vides et de même taille")
+
+        self.labels = list(labels)
+        self.upper_bound = float(upper_bound)
+        self.unknown_label = unknown_label
+
+        # Bornes triées pour np.searchsorted + correspondance vers l'ordre des libellés
+        bounds = np.asarray(lower_bounds, dtype=float)
+        order = np.argsort(bounds, kind='stable')
+        self._sorted_bounds = bounds[order]
+        self._sorted_to_label = order
+
+        self.categories = list(self.labels)
+        if unknown_label is not None and unknown_label not in self.categories:
+            self.categories.append(unknown_label)
+        self._unknown_code = (self.categories.index(unknown_label)
+                              if unknown_label is not None else -1)
+
+    @classmethod
+    def from_ranges(cls, ranges: Mapping[str, Sequence[float]],
+                    unknown_label: Optional[str] = 'unknown') -> 'ScoreBanding':
+        """Construit les bandes depuis des intervalles fermés {label: [min, max]}"""
+        upper_bound = max(float(bounds[1]) for bounds in ranges.values())
+        return cls(list(ranges.keys()), [bounds[0] for bounds in ranges.values()],
+                   upper_bound=upper_bound, unknown_label=unknown_label)
+
+    @classmethod
+    def from_minimums(cls, minimums: Mapping[str, float],
+                      unknown_label: Optional[str] = 'unknown') -> 'ScoreBanding':
+        """Construit les bandes depuis des seuils minimums {label: score_min}"""
+        return cls(list(minimums.keys()), list(minimums.values()), unknown_label=unknown_label)
+
+    def codes(self, scores: Any) -> np.ndarray:
+        """
+        Calcule le code de catégorie de chaque score.
+
+        Args:
+            scores: Scores (scalaire, liste ou array)
+
+        Returns:
+            Array d'entiers indexant `self.categories` (-1 si hors bandes sans libellé)
+        """
+        values = np.asarray(scores, dtype=float).ravel()
+        position = np.searchsorted(self._sorted_bounds, values, side='right') - 1
+
+        in_band = (position >= 0) & (values <= self.upper_bound)  # NaN -> False
+        codes = np.full(values.shape, self._unknown_code, dtype=np.int8)
+        codes[in_band] = self._sorted_to_label[position[in_band]]
+        return codes
+
+    def assign(self, scores: Any) -> pd.Categorical:
+        """Affecte chaque score à sa bande (array catégoriel)"""
+        return pd.Categorical.from_codes(self.codes(scores), categories=self.categories)
+
+
+class DecisionEngine:
+    """
+    Moteur de décision du pipeline d'inférence.
+
+    Convertit les probabilités de défaut en scores de crédit, classes de risque
+    (scoring.risk_classes), décisions et recommandations
+    (scoring.decision_thresholds), le tout de façon vectorisée.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        """
+        Args:
+            config: Configuration du projet (seule la section `scoring` est lue)
+        """
+        scoring = (config or {}).get('scoring', {})
+
+        score_range = {**DEFAULT_SCORE_RANGE, **scoring.get('score_range', {})}
+        self.score_min = score_range['min']
+        self.score_max = score_range['max']
+
+        self.risk_banding = ScoreBanding.from_ranges(
+            scoring.get('risk_classes', DEFAULT_RISK_CLASSES)
+        )
+
+        thresholds = {**DEFAULT_DECISION_THRESHOLDS, **scoring.get('decision_thresholds', {})}
+        self.auto_approve = float(thresholds['auto_approve'])
+        self.standard_conditions = float(thresholds['standard_conditions'])
+        self.auto_reject = float(thresholds['auto_reject'])
+
+    def credit_scores(self, probabilities: np.ndarray) -> np.ndarray:
+        """
+        Convertit les probabilités de défaut en scores de crédit
+
+        Plus la probabilité de défaut est élevée, plus le score est bas.
+        """
+        probabilities = np.asarray(probabilities, dtype=float)
+        scores = self.score_min + (1 - probabilities) * (self.score_max - self.score_min)
+        return scores.astype(int)
+
+    def risk_classes(self, credit_scores: np.ndarray) -> pd.Categorical:
+        """Classe de risque de chaque score (scoring.risk_classes)"""
+        return self.risk_banding.assign(credit_scores)
+
+    def decisions(self, probabilities: np.ndarray) -> pd.Categorical:
+        """Décision automatique / examen manuel / rejet selon les seuils de probabilité"""
+        probabilities = np.asarray(probabilities, dtype=float)
+        codes = np.select(
+            [probabilities < self.auto_approve, probabilities >= self.auto_reject],
+            [0, 2],
+            default=1
+        ).astype(np.int8)
+        return pd.Categorical.from_codes(codes, categories=DECISIONS)
+
+    def recommendations(self, probabilities: np.ndarray,
+                        predictions: np.ndarray) -> pd.Categorical:
+        """
+        Recommandation métier à partir des probabilités et prédictions binaires
+
+        Args:
+            probabilities: Probabilités de défaut
+            predictions: Prédictions binaires (0 = pas de défaut)
+
+        Returns:
+            Recommandations (catégories = RECOMMENDATIONS)
+        """
+        probabilities = np.asarray(probabilities, dtype=float)
+        approved = np.asarray(predictions) == 0
+
+        codes = np.select(
+            [
+                approved & (probabilities < self.auto_approve),
+                approved & (probabilities < self.standard_conditions),
+                approved,
+                probabilities >= self.auto_reject
+            ],
+            [0, 1, 2, 4],
+            default=3
+        ).astype(np.int8)
+        return pd.Categorical.from_codes(codes, categories=RECOMMENDATIONS)
@@ -13,13 +13,18 @@ from typing import Dict, List, Tuple, Any
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from .utils import load_dataset
+except ImportError:  # Module importé directement depuis src/
+    from utils import load_dataset
+
 class EDAAnalyzer:
     """
     Classe d'analyse exploratoire des données avec commentaires automatiques.
     Suit l'ordre exact du workflow ML défini dans l'architecture.
     """
     
-    def __init__(self, data_path: str = "data/processed/credit_cleaned.csv"):
+    def __init__(self, data_path: str = "data/processed/credit_cleaned.parquet"):
         """Initialisation de l'analyseur EDA"""
         self.data_path = data_path
         self.data = None
@@ -39,7 +44,8 @@ class EDAAnalyzer:
         print("📂 Chargement des données nettoyées...")
         
         try:
-            self.data = pd.read_csv(self.data_path)
+            # Parquet ou CSV (l'autre format est cherché si le fichier n'existe pas)
+            self.data = load_dataset(self.data_path)
             print(f"✅ Données chargées : {len(self.data)} lignes, {len(self.data.columns)} colonnes")
             return self.data
         except Exception as e:
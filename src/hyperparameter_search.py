@@ -0,0 +1,412 @@
+"""
+Recherche d'hyperparamètres de la régression logistique.
+
+Les combinaisons de l'espace de recherche sont d'abord filtrées (couples
+solver/penalty incompatibles, l1_ratio hors elasticnet) : aucun fit n'est
+lancé sur une combinaison invalide. Cinq stratégies parcourent ensuite
+les candidats restants :
+
+    grid_search          Tous les candidats (GridSearchCV)
+    random_search        n_iter candidats tirés au hasard (RandomizedSearchCV)
+    successive_halving   Tous les candidats sur un petit échantillon, le
+                         meilleur tiers sur un échantillon trois fois plus
+                         grand, etc. (HalvingGridSearchCV)
+    bayesian             n_iter candidats choisis un par un : processus
+                         gaussien sur les scores déjà obtenus + amélioration
+                         espérée (Expected Improvement)
+    regularization_path  Pour chaque pénalité / class_weight et chaque fold,
+                         un seul chemin de régularisation du C le plus petit
+                         au plus grand, chaque fit partant des coefficients
+                         du précédent (warm start)
+
+Chaque recherche renvoie le meilleur modèle (réentraîné sur toutes les
+données), son score de validation croisée, sa fonction de décision hors
+échantillon (out-of-fold, pour la calibration), le nombre de fits, leur coût en
+équivalent fits sur l'échantillon complet (les tours du successive halving
+portent sur des sous-échantillons) et la durée.
+"""
+
+import time
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from joblib import Parallel, delayed
+from scipy.stats import norm
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import Matern, WhiteKernel
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import GridSearchCV, HalvingGridSearchCV, RandomizedSearchCV, StratifiedKFold
+
+
+SEARCH_METHODS = ['grid_search', 'random_search', 'successive_halving', 'bayesian', 'regularization_path']
+
+# Pénalités supportées par chaque solver de LogisticRegression
+SOLVER_PENALTIES = {
+    'liblinear': {'l1', 'l2'},
+    'lbfgs': {'l2', None},
+    'newton-cg': {'l2', None},
+    'newton-cholesky': {'l2', None},
+    'sag': {'l2', None},
+    'saga': {'l1', 'l2', 'elasticnet', None}
+}
+
+# Solver warm start utilisé pour le chemin de chaque pénalité (liblinear ignore warm_start)
+PATH_SOLVERS = {'l2': 'lbfgs', 'l1': 'saga', 'elasticnet': 'saga', None: 'lbfgs'}
+
+
+def prune_candidates(space: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Combinaisons valides de l'espace de recherche
+
+    Les couples solver/penalty non supportés sont écartés ; `l1_ratio`
+    n'est combiné qu'avec `elasticnet` (valeur par défaut 0.5 si l'espace
+    n'en propose pas).
+
+    Args:
+        space: Valeurs possibles par hyperparamètre
+
+    Returns:
+        Liste de candidats (un dictionnaire de paramètres chacun), sans doublon
+    """
+    space = dict(space)
+    l1_ratios = list(space.pop('l1_ratio', None) or [0.5])
+    names = list(space)
+
+    candidates, seen = [], set()
+    for values in itertools.product(*(space[name] for name in names)):
+        params = dict(zip(names, values))
+        penalty = params.get('penalty', 'l2')
+        solver = params.get('solver', 'lbfgs')
+        if penalty not in SOLVER_PENALTIES.get(solver, {penalty}):
+            continue
+
+        for l1_ratio in (l1_ratios if penalty == 'elasticnet' else [None]):
+            candidate = dict(params) if l1_ratio is None else {**params, 'l1_ratio': l1_ratio}
+            key = tuple(sorted((k, repr(v)) for k, v in candidate.items()))
+            if key not in seen:
+                seen.add(key)
+                candidates.append(candidate)
+    return candidates
+
+
+def _as_param_grid(candidates: List[Dict[str, Any]]) -> List[Dict[str, List[Any]]]:
+    """Candidats au format param_grid de scikit-learn (une grille d'un point par candidat)"""
+    return [{name: [value] for name, value in candidate.items()} for candidate in candidates]
+
+
+def _encode_candidates(candidates: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Représentation numérique des candidats pour le processus gaussien
+
+    Paramètres numériques : log10 si strictement positifs et étalés sur plus
+    d'une décade, puis ramenés dans [0, 1]. Autres paramètres : indicatrices.
+    """
+    names = sorted({name for candidate in candidates for name in candidate})
+    columns = []
+    for name in names:
+        values = [candidate.get(name) for candidate in candidates]
+        numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values)
+        if numeric:
+            column = np.asarray(values, dtype=float)
+            if column.min() > 0 and column.max() / column.min() > 10:
+                column = np.log10(column)
+            span = column.max() - column.min()
+            columns.append((column - column.min()) / span if span > 0 else np.zeros(len(column)))
+        else:
+            labels = [repr(v) for v in values]
+            for level in sorted(set(labels)):
+                columns.append(np.asarray([label == level for label in labels], dtype=float))
+    return np.column_stack(columns)
+
+
+def _take(data, indices):
+    return data.iloc[indices] if hasattr(data, 'iloc') else data[indices]
+
+
+def _fit_fold(estimator: Any, X, y, train, test, scorer: Any) -> Tuple[float, np.ndarray]:
+    """Score et fonction de décision d'un fold"""
+    model = clone(estimator).fit(_take(X, train), _take(y, train))
+    X_test = _take(X, test)
+    return float(scorer(model, X_test, _take(y, test))), model.decision_function(X_test)
+
+
+def _cross_validate_oof(estimator: Any, X, y, splits: List[tuple], scorer: Any,
+                        n_jobs: Optional[int]) -> Tuple[float, np.ndarray]:
+    """Score moyen des folds et fonction de décision hors échantillon de chaque ligne"""
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(estimator, X, y, train, test, scorer) for train, test in splits
+    )
+    oof = np.empty(len(y))
+    for (_, test), (_, decision) in zip(splits, results):
+        oof[test] = decision
+    return float(np.nanmean([score for score, _ in results])), oof
+
+
+def _bayesian_search(estimator: Any, candidates: List[Dict[str, Any]], X, y, cv: Any, scoring: str,
+                     n_iter: int, n_initial: int, n_jobs: Optional[int], random_state: int) -> Dict[str, Any]:
+    """Optimisation bayésienne séquentielle sur l'ensemble discret des candidats"""
+    rng = np.random.RandomState(random_state)
+    encoded = _encode_candidates(candidates)
+    n_iter = min(n_iter, len(candidates))
+    splits, scorer = list(cv.split(X, y)), get_scorer(scoring)
+    oof_decisions = {}
+
+    def evaluate(index: int) -> float:
+        model = clone(estimator).set_params(**candidates[index])
+        score, oof_decisions[index] = _cross_validate_oof(model, X, y, splits, scorer, n_jobs)
+        return score
+
+    evaluated = list(rng.permutation(len(candidates))[:min(n_initial, n_iter)])
+    scores = [evaluate(i) for i in evaluated]
+
+    while len(evaluated) < n_iter:
+        remaining = np.setdiff1d(np.arange(len(candidates)), evaluated)
+        observed = np.nan_to_num(np.asarray(scores), nan=np.nanmin(scores) if np.isfinite(scores).any() else 0.0)
+
+        gp = GaussianProcessRegressor(kernel=Matern(nu=2.5) + WhiteKernel(), normalize_y=True,
+                                      random_state=random_state)
+        gp.fit(encoded[evaluated], observed)
+        mean, std = gp.predict(encoded[remaining], return_std=True)
+
+        # Amélioration espérée par rapport au meilleur score observé
+        improvement = mean - observed.max()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.where(std > 0, improvement / std, 0.0)
+        expected_improvement = np.where(std > 0, improvement * norm.cdf(z) + std * norm.pdf(z), 0.0)
+
+        chosen = int(remaining[np.argmax(expected_improvement)])
+        evaluated.append(chosen)
+        scores.append(evaluate(chosen))
+
+    best = evaluated[int(np.nanargmax(scores))]
+    best_params = candidates[best]
+    return {
+        'best_params': best_params,
+        'best_score': float(np.nanmax(scores)),
+        'best_estimator': clone(estimator).set_params(**best_params).fit(X, y),
+        'oof_decision': oof_decisions[best],
+        'n_evaluated': len(evaluated)
+    }
+
+
+def _fold_path(estimator: Any, X, y, train, test, Cs: List[float], scorer: Any) -> Tuple[List[float], np.ndarray]:
+    """Scores et fonctions de décision d'un fold le long du chemin (C croissants, warm start)"""
+    model = clone(estimator).set_params(warm_start=True)
+    X_train, X_test = _take(X, train), _take(X, test)
+    y_train, y_test = _take(y, train), _take(y, test)
+
+    scores, decisions = [], []
+    for C in Cs:
+        model.set_params(C=C).fit(X_train, y_train)
+        scores.append(float(scorer(model, X_test, y_test)))
+        decisions.append(model.decision_function(X_test))
+    return scores, np.asarray(decisions)
+
+
+def regularization_path(estimator: Any, X, y, Cs: List[float], cv: Any = 5, scoring: str = 'roc_auc',
+                        n_jobs: Optional[int] = -1, random_state: int = 42) -> Dict[str, Any]:
+    """
+    Chemin de régularisation : score de validation croisée et coefficients en fonction de C
+
+    Chaque fold parcourt les C du plus petit (régularisation forte, solution
+    proche de zéro) au plus grand ; chaque fit part des coefficients du C
+    précédent. Les coefficients du chemin sont ceux d'un dernier parcours
+    sur toutes les lignes.
+
+    Args:
+        estimator: LogisticRegression (paramètres hors C déjà fixés)
+        X: Features
+        y: Cible
+        Cs: Valeurs de C (triées par la fonction)
+        cv: Nombre de folds stratifiés ou objet de validation croisée
+        scoring: Métrique scikit-learn
+        n_jobs: Parallélisme (un fold par tâche)
+        random_state: Graine du découpage en folds
+
+    Returns:
+        Dictionnaire : C, score_mean, score_std, coefs (une ligne par C),
+        n_nonzero, feature_names, n_fits, wall_time (s)
+    """
+    start = time.perf_counter()
+    Cs = sorted(float(C) for C in Cs)
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state) if isinstance(cv, int) else cv
+    scorer = get_scorer(scoring)
+
+    fold_scores = np.array([scores for scores, _ in Parallel(n_jobs=n_jobs)(
+        delayed(_fold_path)(estimator, X, y, train, test, Cs, scorer) for train, test in folds.split(X, y)
+    )])
+
+    model = clone(estimator).set_params(warm_start=True)
+    coefs = []
+    for C in Cs:
+        coefs.append(model.set_params(C=C).fit(X, y).coef_.ravel().tolist())
+
+    return {
+        'C': Cs,
+        'score_mean': np.nanmean(fold_scores, axis=0).tolist(),
+        'score_std': np.nanstd(fold_scores, axis=0).tolist(),
+        'coefs': coefs,
+        'n_nonzero': [int(np.count_nonzero(coef)) for coef in coefs],
+        'feature_names': list(getattr(X, 'columns', range(len(coefs[0])))),
+        'n_fits': len(Cs) * (len(fold_scores) + 1),
+        'wall_time': time.perf_counter() - start
+    }
+
+
+def _path_search(estimator: Any, candidates: List[Dict[str, Any]], X, y, folds: Any, scoring: str,
+                 n_jobs: Optional[int]) -> Dict[str, Any]:
+    """
+    Un chemin warm start par fold et par modèle distinct hors C, sur les C de l'espace
+
+    solver et max_iter ne changent pas l'optimum cherché, seulement la façon
+    de l'atteindre : les candidats qui ne diffèrent que par eux partagent un
+    chemin, calculé avec le solver warm start de leur pénalité et le plus
+    grand max_iter de l'espace.
+
+    Raises:
+        ValueError: Si aucun point du chemin n'a de score valide (tous NaN)
+    """
+    max_iter = max((c['max_iter'] for c in candidates if 'max_iter' in c), default=None)
+    groups: Dict[tuple, Dict[str, Any]] = {}
+    for candidate in candidates:
+        rest = {name: value for name, value in candidate.items() if name not in ('C', 'solver', 'max_iter')}
+        rest['solver'] = PATH_SOLVERS.get(rest.get('penalty', 'l2'), 'saga')
+        if max_iter is not None:
+            rest['max_iter'] = max_iter
+        key = tuple(sorted((name, repr(value)) for name, value in rest.items()))
+        groups.setdefault(key, {'params': rest, 'Cs': set()})['Cs'].add(float(candidate.get('C', 1.0)))
+
+    scorer = get_scorer(scoring)
+    splits = list(folds.split(X, y))
+    tasks = [(group['params'], sorted(group['Cs']), train, test)
+             for group in groups.values() for train, test in splits]
+    fold_results = Parallel(n_jobs=n_jobs)(
+        delayed(_fold_path)(clone(estimator).set_params(**params), X, y, train, test, Cs, scorer)
+        for params, Cs, train, test in tasks
+    )
+
+    # Moyenne des folds pour chaque (combinaison, C)
+    best_score, best_params, best_position, n_fits = -np.inf, None, None, 0
+    for index, group in enumerate(groups.values()):
+        group_results = fold_results[index * len(splits):(index + 1) * len(splits)]
+        scores = np.nanmean([fold_scores for fold_scores, _ in group_results], axis=0)
+        n_fits += len(splits) * len(scores)
+        if np.isfinite(scores).any() and np.nanmax(scores) > best_score:
+            best_score = float(np.nanmax(scores))
+            best_position = (index, int(np.nanargmax(scores)))
+            best_params = {**group['params'], 'C': sorted(group['Cs'])[best_position[1]]}
+
+    if best_position is None:
+        raise ValueError(f"Aucun score de validation croisée valide ({scoring}) sur le chemin de "
+                         f"régularisation : folds à une seule classe ou échec du scorer")
+
+    # Décisions hors échantillon du meilleur (combinaison, C), déjà calculées par les folds
+    index, c_index = best_position
+    oof = np.empty(len(y))
+    for (_, test), (_, decisions) in zip(splits, fold_results[index * len(splits):(index + 1) * len(splits)]):
+        oof[test] = decisions[c_index]
+
+    return {
+        'best_params': best_params,
+        'best_score': best_score,
+        'best_estimator': clone(estimator).set_params(**best_params).fit(X, y),
+        'oof_decision': oof,
+        'n_fits': n_fits
+    }
+
+
+def search_hyperparameters(estimator: Any, space: Dict[str, List[Any]], X, y,
+                           method: str = 'successive_halving', cv: int = 5, scoring: str = 'roc_auc',
+                           n_jobs: Optional[int] = -1, n_iter: int = 20, halving_factor: int = 3,
+                           random_state: int = 42) -> Dict[str, Any]:
+    """
+    Recherche d'hyperparamètres avec la stratégie demandée
+
+    Args:
+        estimator: Estimateur de base (paramètres non cherchés déjà fixés)
+        space: Valeurs possibles par hyperparamètre (filtrées par prune_candidates)
+        X: Features d'entraînement
+        y: Cible
+        method: Stratégie (voir SEARCH_METHODS)
+        cv: Nombre de folds de validation croisée (stratifiés)
+        scoring: Métrique scikit-learn à maximiser
+        n_jobs: Parallélisme des fits
+        n_iter: Nombre de candidats évalués (random_search, bayesian)
+        halving_factor: Facteur de réduction des candidats (successive_halving)
+        random_state: Graine des tirages
+
+    Returns:
+        Dictionnaire : method, best_params, best_score, best_estimator,
+        oof_decision (fonction de décision hors échantillon du meilleur candidat,
+        alignée sur les lignes de X), n_candidates (après filtrage),
+        n_fits (hors réentraînement final),
+        fit_cost (fits en équivalent échantillon complet), wall_time (s)
+
+    Raises:
+        ValueError: Si la stratégie est inconnue ou si aucun candidat n'est valide
+    """
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"Stratégie de recherche inconnue: {method} (attendu: {SEARCH_METHODS})")
+
+    candidates = prune_candidates(space)
+    if not candidates:
+        raise ValueError("Aucune combinaison d'hyperparamètres valide dans l'espace de recherche")
+
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    start = time.perf_counter()
+
+    if method == 'bayesian':
+        result = _bayesian_search(estimator, candidates, X, y, folds, scoring, n_iter,
+                                  n_initial=max(2, n_iter // 4), n_jobs=n_jobs, random_state=random_state)
+        n_fits = result.pop('n_evaluated') * cv
+        fit_cost = float(n_fits)
+    elif method == 'regularization_path':
+        result = _path_search(estimator, candidates, X, y, folds, scoring, n_jobs)
+        n_fits = result.pop('n_fits')
+        fit_cost = float(n_fits)
+    else:
+        param_grid = _as_param_grid(candidates)
+        if method == 'grid_search':
+            search = GridSearchCV(estimator, param_grid, cv=folds, scoring=scoring, n_jobs=n_jobs)
+        elif method == 'random_search':
+            search = RandomizedSearchCV(estimator, param_grid, n_iter=min(n_iter, len(candidates)), cv=folds,
+                                        scoring=scoring, n_jobs=n_jobs, random_state=random_state)
+        else:
+            search = HalvingGridSearchCV(estimator, param_grid, factor=halving_factor, cv=folds,
+                                         scoring=scoring, n_jobs=n_jobs, random_state=random_state)
+        search.fit(X, y)
+
+        if method == 'successive_halving':
+            n_fits = sum(search.n_candidates_) * cv
+            fit_cost = sum(n * r for n, r in zip(search.n_candidates_, search.n_resources_)) * cv / len(y)
+        else:
+            n_fits = len(search.cv_results_['params']) * cv
+            fit_cost = float(n_fits)
+        result = {
+            'best_params': search.best_params_,
+            'best_score': float(search.best_score_),
+            'best_estimator': search.best_estimator_
+        }
+
+        # Les recherches scikit-learn ne conservent pas les prédictions des
+        # folds : le meilleur candidat est revalidé sur les mêmes folds. Pour
+        # un halving dont le dernier tour portait sur un sous-échantillon, ce
+        # score sur toutes les lignes remplace aussi celui du dernier tour.
+        score, result['oof_decision'] = _cross_validate_oof(search.best_estimator_, X, y, list(folds.split(X, y)),
+                                                            get_scorer(scoring), n_jobs)
+        if method == 'successive_halving' and search.n_resources_[-1] < len(y):
+            result['best_score'] = score
+        n_fits += cv
+        fit_cost += cv
+
+    return {
+        'method': method,
+        **result,
+        'n_candidates': len(candidates),
+        'n_fits': n_fits,
+        'fit_cost': fit_cost,
+        'wall_time': time.perf_counter() - start
+    }
@@ -0,0 +1,301 @@
+"""
+Scoring rapide pour les modèles linéaires du système de crédit scoring.
+
+Exporte une `LogisticRegression` (ou le modèle calibré qui l'enveloppe :
+`OOFCalibratedClassifier`, tel que sauvegardé par `TrainingPipeline._save_model`,
+ou `CalibratedClassifierCV`) vers un scoreur NumPy
+compact : coefficients, intercepts et cartes de calibration (isotonique ou
+Platt). Une probabilité est obtenue par un seul produit matriciel suivi de
+l'interpolation (ou de la sigmoïde) de calibration, sans la validation
+sklearn appelée à chaque prédiction.
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+
+# Méthodes de calibration supportées
+CALIBRATION_METHODS = ['none', 'isotonic', 'sigmoid']
+
+
+def _unwrap_estimator(estimator: Any) -> Any:
+    """Retire les enveloppes sans effet sur le scoring (FrozenEstimator, Pipeline à une étape)"""
+    while hasattr(estimator, 'steps') and len(estimator.steps) == 1:
+        estimator = estimator.steps[0][1]
+    if type(estimator).__name__ == 'FrozenEstimator':
+        estimator = estimator.estimator
+    return estimator
+
+
+def _linear_parameters(estimator: Any):
+    """Coefficients et intercept d'un classifieur linéaire binaire"""
+    estimator = _unwrap_estimator(estimator)
+    coef = getattr(estimator, 'coef_', None)
+    if coef is None or not hasattr(estimator, 'intercept_'):
+        raise ValueError(f"Modèle non linéaire non supporté: {type(estimator).__name__}")
+    if coef.shape[0] != 1:
+        raise ValueError("Seuls les modèles binaires sont supportés")
+    return np.asarray(coef[0], dtype=np.float64), float(np.ravel(estimator.intercept_)[0])
+
+
+class LinearScorer:
+    """
+    Scoreur NumPy d'un modèle logistique, calibré ou non.
+
+    Pour un modèle à K classifieurs calibrés (K = 1 pour `OOFCalibratedClassifier`,
+    nombre de folds pour `CalibratedClassifierCV`), les K fonctions
+    de décision sont calculées par un seul produit matriciel, puis chacune passe
+    par sa carte de calibration ; la probabilité est la moyenne des K, comme
+    dans sklearn.
+    """
+
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, method: str = 'none',
+                 calibration_x: Optional[List[np.ndarray]] = None,
+                 calibration_y: Optional[List[np.ndarray]] = None,
+                 sigmoid_a: Optional[np.ndarray] = None,
+                 sigmoid_b: Optional[np.ndarray] = None,
+                 feature_names: Optional[Sequence[str]] = None):
+        """
+        Args:
+            coef: Coefficients (n_modeles, n_features)
+            intercept: Intercepts (n_modeles,)
+            method: Calibration ('none', 'isotonic' ou 'sigmoid')
+            calibration_x: Seuils isotoniques en entrée, un array par modèle
+            calibration_y: Seuils isotoniques en sortie, un array par modèle
+            sigmoid_a: Pentes de Platt (n_modeles,)
+            sigmoid_b: Biais de Platt (n_modeles,)
+            feature_names: Ordre des features attendu (optionnel)
+        """
+        if method not in CALIBRATION_METHODS:
+            raise ValueError(f"Méthode de calibration inconnue: {method}")
+
+        # Transposé et contigu : X @ coef_t donne directement (n_lignes, n_modeles)
+        self.coef_t = np.ascontiguousarray(np.atleast_2d(coef).T, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64).ravel()
+        self.method = method
+        self.calibration_x = [np.asarray(x, dtype=np.float64) for x in (calibration_x or [])]
+        self.calibration_y = [np.asarray(y, dtype=np.float64) for y in (calibration_y or [])]
+        self.sigmoid_a = None if sigmoid_a is None else np.asarray(sigmoid_a, dtype=np.float64)
+        self.sigmoid_b = None if sigmoid_b is None else np.asarray(sigmoid_b, dtype=np.float64)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+        self.n_features = self.coef_t.shape[0]
+        self.n_models = self.coef_t.shape[1]
+
+    @classmethod
+    def from_model(cls, model: Any) -> 'LinearScorer':
+        """
+        Exporte un modèle sklearn vers un LinearScorer
+
+        Args:
+            model: LogisticRegression, OOFCalibratedClassifier ou
+                CalibratedClassifierCV l'enveloppant, ou dictionnaire
+                sauvegardé par TrainingPipeline (clé 'model')
+
+        Returns:
+            LinearScorer équivalent
+
+        Raises:
+            ValueError: Si le modèle n'est pas un classifieur linéaire binaire
+        """
+        if isinstance(model, dict):
+            model = model['model']
+        model = _unwrap_estimator(model)
+        feature_names = getattr(model, 'feature_names_in_', None)
+
+        if hasattr(model, 'calibrated_classifiers_'):
+            # CalibratedClassifierCV : un couple (modèle, calibrateur) par fold
+            pairs = [(calibrated.estimator, calibrated.calibrators[0]) for calibrated in model.calibrated_classifiers_]
+        elif hasattr(model, 'calibrator'):
+            # OOFCalibratedClassifier : un modèle, un calibrateur ajusté hors échantillon
+            pairs = [(model.estimator, model.calibrator)]
+        else:
+            coef, intercept = _linear_parameters(model)
+            return cls(coef[np.newaxis, :], [intercept], feature_names=feature_names)
+
+        if len(model.classes_) != 2:
+            raise ValueError("Seuls les modèles binaires sont supportés")
+
+        coefs, intercepts = [], []
+        calibration_x, calibration_y, sigmoid_a, sigmoid_b = [], [], [], []
+        for estimator, calibrator in pairs:
+            coef, intercept = _linear_parameters(estimator)
+            coefs.append(coef)
+            intercepts.append(intercept)
+
+            if hasattr(calibrator, 'X_thresholds_'):
+                calibration_x.append(calibrator.X_thresholds_)
+                calibration_y.append(calibrator.y_thresholds_)
+            elif hasattr(calibrator, 'a_'):
+                sigmoid_a.append(calibrator.a_)
+                sigmoid_b.append(calibrator.b_)
+            else:
+                raise ValueError(f"Calibrateur non supporté: {type(calibrator).__name__}")
+
+        if calibration_x and sigmoid_a:
+            raise ValueError("Calibrations isotonique et sigmoïde mélangées non supportées")
+
+        if calibration_x:
+            return cls(np.vstack(coefs), intercepts, 'isotonic',
+                       calibration_x=calibration_x, calibration_y=calibration_y,
+                       feature_names=feature_names)
+        return cls(np.vstack(coefs), intercepts, 'sigmoid',
+                   sigmoid_a=sigmoid_a, sigmoid_b=sigmoid_b, feature_names=feature_names)
+
+    def _as_array(self, X: Any) -> np.ndarray:
+        """Convertit l'entrée en array float64 2D dans l'ordre des features"""
+        if isinstance(X, pd.DataFrame):
+            if self.feature_names is not None and list(X.columns) != self.feature_names:
+                X = X[self.feature_names]
+            X = X.to_numpy(dtype=np.float64)
+        else:
+            X = np.asarray(X, dtype=np.float64)
+
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"{X.shape[1]} features reçues, {self.n_features} attendues")
+        return X
+
+    def decision_function(self, X: Any) -> np.ndarray:
+        """Fonctions de décision (n_lignes, n_modeles)"""
+        return self._as_array(X) @ self.coef_t + self.intercept
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """
+        Probabilités de défaut (classe 1)
+
+        Args:
+            X: Features (array 2D, ligne unique 1D ou DataFrame)
+
+        Returns:
+            Array (n_lignes,) des probabilités de défaut
+        """
+        decision = self.decision_function(X)
+
+        if self.method == 'isotonic':
+            proba = np.interp(decision[:, 0], self.calibration_x[0], self.calibration_y[0])
+            for k in range(1, self.n_models):
+                proba += np.interp(decision[:, k], self.calibration_x[k], self.calibration_y[k])
+        else:
+            # Platt : expit(-(a*d + b)) ; sans calibration : expit(d)
+            if self.method == 'sigmoid':
+                exponent = self.sigmoid_a * decision + self.sigmoid_b
+            else:
+                exponent = -decision
+            proba = (1.0 / (1.0 + np.exp(exponent))).sum(axis=1)
+
+        if self.n_models > 1:
+            proba /= self.n_models
+        return proba
+
+    def predict(self, X: Any, threshold: float = 0.5) -> np.ndarray:
+        """Prédictions binaires (1 = défaut)"""
+        return (self.predict_proba(X) > threshold).astype(int)
+
+    def verify(self, model: Any, X: Any, tolerance: float = 1e-9) -> Dict[str, Any]:
+        """
+        Compare les probabilités du scoreur à celles de sklearn
+
+        Args:
+            model: Modèle sklearn d'origine (ou dictionnaire sauvegardé)
+            X: Données de contrôle
+            tolerance: Écart absolu maximal accepté
+
+        Returns:
+            Rapport (écart maximal, nombre de lignes hors tolérance, statut)
+        """
+        if isinstance(model, dict):
+            model = model['model']
+
+        reference = model.predict_proba(X)[:, 1]
+        fast = self.predict_proba(X)
+        differences = np.abs(reference - fast)
+        mismatches = np.flatnonzero(differences > tolerance)
+
+        return {
+            'rows': len(reference),
+            'tolerance': tolerance,
+            'max_abs_diff': float(differences.max()) if len(differences) else 0.0,
+            'mismatches': int(len(mismatches)),
+            'mismatch_rows': mismatches[:20].tolist(),
+            'decision_mismatches': int(((reference > 0.5) != (fast > 0.5)).sum()),
+            'within_tolerance': len(mismatches) == 0
+        }
+
+    def measure_latency(self, X: Any, n_calls: int = 1000) -> Dict[str, float]:
+        """
+        Mesure la latence du scoring d'une demande unique (ligne par ligne)
+
+        Args:
+            X: Données (les lignes sont scorées une à une, en boucle)
+            n_calls: Nombre d'appels mesurés
+
+        Returns:
+            Latences p50 / p99 / max en microsecondes
+        """
+        rows = self._as_array(X)
+        timings = np.empty(n_calls)
+        for i in range(n_calls):
+            row = rows[i % len(rows)]
+            start = time.perf_counter()
+            self.predict_proba(row)
+            timings[i] = time.perf_counter() - start
+
+        timings *= 1e6
+        return {
+            'calls': n_calls,
+            'p50_us': float(np.percentile(timings, 50)),
+            'p99_us': float(np.percentile(timings, 99)),
+            'max_us': float(timings.max())
+        }
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Représentation du scoreur en arrays NumPy (sans objet Python)"""
+        return {
+            'coef_t': self.coef_t,
+            'intercept': self.intercept,
+            'method': np.array(self.method),
+            'feature_names': np.array(self.feature_names or [], dtype=str),
+            'calibration_sizes': np.array([len(x) for x in self.calibration_x], dtype=np.int64),
+            'calibration_x': np.concatenate(self.calibration_x) if self.calibration_x else np.empty(0),
+            'calibration_y': np.concatenate(self.calibration_y) if self.calibration_y else np.empty(0),
+            'sigmoid_a': self.sigmoid_a if self.sigmoid_a is not None else np.empty(0),
+            'sigmoid_b': self.sigmoid_b if self.sigmoid_b is not None else np.empty(0)
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'LinearScorer':
+        """Reconstruit un scoreur depuis `to_arrays` (arrays éventuellement memory-mappés)"""
+        method = str(arrays['method'])
+        splits = np.cumsum(arrays['calibration_sizes'])[:-1]
+        feature_names = np.asarray(arrays['feature_names']).tolist()
+
+        return cls(
+            np.asarray(arrays['coef_t']).T,
+            arrays['intercept'],
+            method,
+            calibration_x=np.split(arrays['calibration_x'], splits) if method == 'isotonic' else None,
+            calibration_y=np.split(arrays['calibration_y'], splits) if method == 'isotonic' else None,
+            sigmoid_a=arrays['sigmoid_a'] if method == 'sigmoid' else None,
+            sigmoid_b=arrays['sigmoid_b'] if method == 'sigmoid' else None,
+            feature_names=feature_names or None
+        )
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Sauvegarde le scoreur au format .npz (sans pickle)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, 'wb') as f:
+            np.savez(f, **self.to_arrays())
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'LinearScorer':
+        """Charge un scoreur sauvegardé par `save`"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls.from_arrays({key: data[key] for key in data.files})
@@ -0,0 +1,432 @@
+"""
+Format d'artefact versionné des modèles de crédit scoring.
+
+Un artefact est un répertoire :
+
+    <nom>/
+        manifest.json       # métadonnées, métriques, paramètres, index des arrays,
+                            # état du FeatureEngineer (bornes, tables) et plan de nettoyage
+        arrays/*.npy        # arrays numériques (chargeables avec mmap_mode='r')
+        estimator.joblib    # estimateur sklearn complet, chargé à la demande
+        transformer.joblib  # VariableTransformer entraîné (encodeurs, scaler)
+
+Le manifeste se lit sans désérialiser l'estimateur : lister et classer des
+dizaines de versions archivées ne coûte qu'une lecture JSON par version. Pour
+les modèles linéaires, les coefficients et cartes de calibration du
+LinearScorer sont stockés en .npy, ce qui permet de scorer sans jamais
+charger l'estimateur. Le plan de nettoyage, l'état du FeatureEngineer et le
+VariableTransformer forment le pipeline d'entrée : `scoring_graph` calcule la
+matrice attendue par le modèle à partir de données brutes.
+"""
+
+import os
+import json
+import shutil
+import joblib
+import numpy as np
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from .linear_scorer import LinearScorer
+
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+ESTIMATOR_FILE = 'estimator.joblib'
+TRANSFORMER_FILE = 'transformer.joblib'
+ARRAYS_DIR = 'arrays'
+
+# Arrays du LinearScorer stockés hors du manifeste (numériques, memory-mappables)
+_SCORER_ARRAYS = ['coef_t', 'intercept', 'calibration_sizes', 'calibration_x',
+                  'calibration_y', 'sigmoid_a', 'sigmoid_b']
+
+
+def _to_json(value: Any) -> Any:
+    """Convertit récursivement les types NumPy en types JSON"""
+    if isinstance(value, dict):
+        return {str(k): _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def read_manifest(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Lit le manifeste d'un artefact (sans charger l'estimateur)
+
+    Args:
+        path: Répertoire de l'artefact
+
+    Returns:
+        Contenu du manifeste
+    """
+    with open(Path(path) / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def is_artifact(path: Union[str, Path]) -> bool:
+    """Indique si le chemin est un répertoire d'artefact"""
+    return (Path(path) / MANIFEST_FILE).is_file()
+
+
+class ModelArtifact:
+    """
+    Accès paresseux à un artefact de modèle.
+
+    Le manifeste est lu à la construction ; l'estimateur n'est désérialisé
+    qu'au premier accès à `estimator`, et les arrays sont memory-mappés.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Répertoire de l'artefact
+        """
+        self.path = Path(path)
+        self.manifest = read_manifest(self.path)
+        self._estimator = None
+
+    @property
+    def name(self) -> str:
+        return self.manifest['name']
+
+    @property
+    def metrics(self) -> Dict[str, float]:
+        return self.manifest.get('metrics', {})
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.manifest.get('params', {})
+
+    @property
+    def feature_names(self) -> Optional[List[str]]:
+        return self.manifest.get('feature_names')
+
+    @property
+    def estimator(self) -> Any:
+        """Estimateur sklearn (désérialisé au premier accès)"""
+        if self._estimator is None:
+            self._estimator = joblib.load(self.path / self.manifest['estimator']['file'])
+        return self._estimator
+
+    @property
+    def estimator_loaded(self) -> bool:
+        return self._estimator is not None
+
+    def load_array(self, name: str, mmap_mode: Optional[str] = 'r') -> np.ndarray:
+        """Charge un array de l'artefact (memory-mappé par défaut)"""
+        entry = self.manifest['arrays'][name]
+        return np.load(self.path / entry['file'], mmap_mode=mmap_mode, allow_pickle=False)
+
+    def feature_engineer(self, config: Optional[Dict[str, Any]] = None):
+        """
+        FeatureEngineer entraîné restauré depuis le manifeste
+
+        Returns:
+            FeatureEngineer, ou None si l'artefact ne contient pas d'état
+        """
+        state = self.manifest.get('feature_engineering')
+        if not state:
+            return None
+
+        from .transformers.feature_engineer import FeatureEngineer
+        return FeatureEngineer(config).set_state(state)
+
+    def cleaning_plan(self):
+        """
+        Plan de nettoyage (imputation, écrêtage) appris sur les données d'entraînement
+
+        Returns:
+            CleaningPlan, ou None si l'artefact ne contient pas de plan
+        """
+        state = self.manifest.get('cleaning_plan')
+        if not state:
+            return None
+
+        from .data_processing import CleaningPlan
+        return CleaningPlan.from_state(state)
+
+    def variable_transformer(self):
+        """
+        VariableTransformer entraîné (désérialisé à chaque appel)
+
+        Returns:
+            VariableTransformer, ou None si l'artefact n'en contient pas
+        """
+        entry = self.manifest.get('variable_transformer')
+        if not entry:
+            return None
+        return joblib.load(self.path / entry['file'])
+
+    def scoring_graph(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Graphe de scoring compilé : données nettoyées -> features du modèle
+
+        Le graphe n'embarque pas l'estimateur ; sa matrice se score avec
+        `linear_scorer()` ou `estimator`.
+
+        Returns:
+            CompiledScoringGraph, ou None si le pipeline d'entrée est incomplet
+        """
+        feature_engineer = self.feature_engineer(config)
+        transformer = self.variable_transformer()
+        if feature_engineer is None or transformer is None:
+            return None
+
+        from .transformers.inference_graph import CompiledScoringGraph
+        return CompiledScoringGraph(feature_engineer, transformer, output_features=self.feature_names)
+
+    def linear_scorer(self, mmap_mode: Optional[str] = 'r') -> Optional[LinearScorer]:
+        """
+        Scoreur linéaire reconstruit depuis les arrays, sans charger l'estimateur
+
+        Returns:
+            LinearScorer, ou None si le modèle n'est pas linéaire
+        """
+        scorer_info = self.manifest.get('scorer')
+        if not scorer_info:
+            return None
+
+        arrays = {name: self.load_array(name, mmap_mode) for name in _SCORER_ARRAYS}
+        arrays['method'] = np.array(scorer_info['method'])
+        arrays['feature_names'] = np.array(self.feature_names or [], dtype=str)
+        return LinearScorer.from_arrays(arrays)
+
+    def summary(self) -> Dict[str, Any]:
+        """Résumé du manifeste (nom, type, métriques principales, date)"""
+        return {
+            'name': self.name,
+            'path': str(self.path),
+            'version': self.manifest.get('version'),
+            'model_type': self.manifest.get('model_type'),
+            'created_at': self.manifest.get('created_at'),
+            'auc_roc': self.metrics.get('auc_roc'),
+            'ks_statistic': self.metrics.get('ks_statistic'),
+            'gini_coefficient': self.metrics.get('gini_coefficient'),
+            'n_features': self.manifest.get('n_features'),
+            'fast_scoring': bool(self.manifest.get('scorer'))
+        }
+
+
+def save_model_artifact(root: Union[str, Path], name: str, model: Any,
+                        metrics: Optional[Dict[str, float]] = None,
+                        params: Optional[Dict[str, Any]] = None,
+                        version: str = '1.0',
+                        timestamp: Optional[str] = None,
+                        metadata: Optional[Dict[str, Any]] = None,
+                        source: Optional[str] = None,
+                        feature_state: Optional[Dict[str, Any]] = None,
+                        cleaning_state: Optional[Dict[str, Any]] = None,
+                        variable_transformer: Any = None) -> Path:
+    """
+    Sauvegarde un modèle au format artefact
+
+    Le répertoire est écrit sous un nom temporaire puis renommé, pour qu'un
+    lecteur ne voie jamais d'artefact incomplet.
+
+    Args:
+        root: Répertoire racine des artefacts
+        name: Nom de l'artefact (nom du sous-répertoire)
+        model: Estimateur entraîné
+        metrics: Métriques d'évaluation
+        params: Hyperparamètres
+        version: Version du format de modèle du projet
+        timestamp: Horodatage d'entraînement (YYYYmmdd_HHMMSS)
+        metadata: Métadonnées complémentaires (validation, statut, ...)
+        source: Fichier d'origine en cas de conversion
+        feature_state: État du FeatureEngineer entraîné (FeatureEngineer.get_state)
+        cleaning_state: Plan de nettoyage des données d'entraînement (CleaningPlan.get_state)
+        variable_transformer: VariableTransformer entraîné sur les données d'entraînement
+
+    Returns:
+        Chemin du répertoire de l'artefact
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    final_path = root / name
+    tmp_path = root / f".{name}.tmp-{os.getpid()}"
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    (tmp_path / ARRAYS_DIR).mkdir(parents=True)
+
+    # 1. Arrays du scoreur linéaire (si le modèle s'y prête)
+    try:
+        scorer = LinearScorer.from_model(model)
+    except (ValueError, AttributeError):
+        scorer = None
+
+    # Le scoreur est servi sans l'estimateur : il doit en reproduire les probabilités
+    if scorer is not None:
+        check_data = np.random.default_rng(0).random((100, scorer.n_features))
+        if not scorer.verify(model, check_data, tolerance=1e-9)['within_tolerance']:
+            scorer = None
+
+    arrays_index = {}
+    if scorer is not None:
+        scorer_arrays = scorer.to_arrays()
+        for array_name in _SCORER_ARRAYS:
+            array = np.ascontiguousarray(scorer_arrays[array_name])
+            relative = f"{ARRAYS_DIR}/{array_name}.npy"
+            np.save(tmp_path / relative, array, allow_pickle=False)
+            arrays_index[array_name] = {
+                'file': relative,
+                'shape': list(array.shape),
+                'dtype': str(array.dtype)
+            }
+
+    # 2. Estimateur complet (chargé seulement si nécessaire) et transformer du pipeline d'entrée
+    joblib.dump(model, tmp_path / ESTIMATOR_FILE)
+    if variable_transformer is not None:
+        joblib.dump(variable_transformer, tmp_path / TRANSFORMER_FILE)
+
+    # 3. Manifeste (écrit en dernier)
+    feature_names = getattr(model, 'feature_names_in_', None)
+    base_estimator = getattr(model, 'estimator', None)
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'name': name,
+        'version': version,
+        'timestamp': timestamp,
+        'created_at': datetime.strptime(timestamp, "%Y%m%d_%H%M%S").isoformat(),
+        'model_type': type(model).__name__,
+        'base_estimator': type(base_estimator).__name__ if base_estimator is not None else None,
+        'n_features': int(getattr(model, 'n_features_in_', 0)) or None,
+        'feature_names': list(feature_names) if feature_names is not None else None,
+        'metrics': _to_json(metrics or {}),
+        'params': _to_json(params or {}),
+        'metadata': _to_json(metadata or {}),
+        'feature_engineering': _to_json(feature_state),
+        'cleaning_plan': _to_json(cleaning_state),
+        'variable_transformer': {'file': TRANSFORMER_FILE} if variable_transformer is not None else None,
+        'scorer': {'method': scorer.method, 'n_models': scorer.n_models} if scorer is not None else None,
+        'arrays': arrays_index,
+        'estimator': {
+            'file': ESTIMATOR_FILE,
+            'bytes': (tmp_path / ESTIMATOR_FILE).stat().st_size
+        },
+        'source': source
+    }
+    with open(tmp_path / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    if final_path.exists():
+        shutil.rmtree(final_path)
+    os.replace(tmp_path, final_path)
+
+    return final_path
+
+
+def list_artifacts(root: Union[str, Path], metric: str = 'auc_roc') -> List[ModelArtifact]:
+    """
+    Liste et classe les artefacts d'un répertoire à partir de leurs manifestes
+
+    Args:
+        root: Répertoire racine des artefacts
+        metric: Métrique de classement (décroissante), puis date la plus récente
+
+    Returns:
+        Artefacts du meilleur au moins bon (aucun estimateur chargé)
+    """
+    root = Path(root)
+    if not root.exists():
+        return []
+
+    artifacts = []
+    for path in root.iterdir():
+        if path.name.startswith('.') or not is_artifact(path):
+            continue
+        try:
+            artifacts.append(ModelArtifact(path))
+        except (OSError, ValueError, KeyError):
+            continue  # Manifeste illisible : artefact ignoré
+
+    return sorted(
+        artifacts,
+        key=lambda a: (a.metrics.get(metric) or float('-inf'), a.manifest.get('timestamp') or ''),
+        reverse=True
+    )
+
+
+def convert_legacy_model(pkl_path: Union[str, Path], root: Union[str, Path],
+                         metadata_path: Optional[Union[str, Path]] = None) -> Path:
+    """
+    Convertit un modèle pickle historique ({'model', 'metrics', 'params', ...})
+
+    Args:
+        pkl_path: Fichier .pkl sauvegardé par TrainingPipeline
+        root: Répertoire racine des artefacts
+        metadata_path: Fichier JSON de métadonnées associé (optionnel)
+
+    Returns:
+        Chemin du répertoire de l'artefact créé
+    """
+    pkl_path = Path(pkl_path)
+    model_info = joblib.load(pkl_path)
+    if not isinstance(model_info, dict):
+        model_info = {'model': model_info}
+
+    metadata = {}
+    if metadata_path is not None and Path(metadata_path).exists():
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+
+    # Les métriques absentes du pickle sont reprises du résumé de validation
+    metrics = {**metadata.get('performance_summary', {}), **model_info.get('metrics', {})}
+
+    timestamp = model_info.get('timestamp')
+    if timestamp is None:
+        timestamp = datetime.fromtimestamp(pkl_path.stat().st_mtime).strftime("%Y%m%d_%H%M%S")
+
+    return save_model_artifact(
+        root, pkl_path.stem, model_info['model'],
+        metrics=metrics,
+        params=model_info.get('params'),
+        version=str(model_info.get('version', '1.0')),
+        timestamp=timestamp,
+        metadata=metadata,
+        source=str(pkl_path)
+    )
+
+
+def convert_legacy_models(models_dir: Union[str, Path], root: Union[str, Path],
+                          overwrite: bool = False) -> List[Path]:
+    """
+    Convertit tous les pickles historiques d'un répertoire de modèles
+
+    Les fichiers de models_dir et de models_dir/final_models sont convertis ;
+    les métadonnées `model_metadata_<timestamp>.json` sont associées aux
+    modèles finaux portant le même horodatage.
+
+    Args:
+        models_dir: Répertoire des modèles (ex: modeling/models)
+        root: Répertoire racine des artefacts
+        overwrite: Reconvertit les modèles déjà convertis
+
+    Returns:
+        Chemins des artefacts créés
+    """
+    models_dir = Path(models_dir)
+    root = Path(root)
+    pkl_files = sorted(models_dir.glob("*.pkl")) + sorted((models_dir / "final_models").glob("*.pkl"))
+
+    created = []
+    for pkl_path in pkl_files:
+        if is_artifact(root / pkl_path.stem) and not overwrite:
+            continue
+
+        metadata_path = None
+        for candidate in pkl_path.parent.glob("model_metadata_*.json"):
+            if candidate.stem[len("model_metadata_"):] in pkl_path.stem:
+                metadata_path = candidate
+                break
+
+        created.append(convert_legacy_model(pkl_path, root, metadata_path))
+
+    return created
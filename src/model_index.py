@@ -0,0 +1,375 @@
+"""
+Index persistant des modèles de crédit scoring (SQLite).
+
+Chaque modèle entraîné est enregistré une fois (chemin, empreinte SHA-256,
+AUC, KS, Gini, liste des features, date d'entraînement, statut production).
+Les règles de sélection du loader ("meilleure AUC", "dernier modèle en
+production", "version épinglée") sont résolues par une table d'alias tenue à
+jour à chaque enregistrement : une recherche = deux lectures par clé primaire,
+quel que soit le nombre de modèles archivés. Les candidats d'un tournoi
+(métadonnée 'tournament') sont exclus de "meilleure AUC" : ils ne sont servis
+que s'ils sont épinglés, désignés par version ou passés en production.
+
+Les chemins sont stockés relativement au répertoire de l'index (absolus s'ils
+sont en dehors) et résolus à la lecture : l'index ne dépend ni du répertoire
+courant de l'écriture, ni de celui de la lecture.
+"""
+
+import json
+import hashlib
+import sqlite3
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from .model_artifact import (
+    MANIFEST_FILE, ESTIMATOR_FILE, ModelArtifact, is_artifact, _to_json
+)
+
+
+INDEX_FILENAME = 'model_index.db'
+
+# Règles de sélection (alias maintenus par l'index)
+BEST_AUC = 'best_auc'
+LATEST_PRODUCTION = 'latest_production'
+PINNED = 'pinned'
+SELECTION_RULES = [BEST_AUC, LATEST_PRODUCTION, PINNED]
+
+# Ordre de résolution par défaut du loader
+DEFAULT_SELECTION_RULES = [PINNED, LATEST_PRODUCTION, BEST_AUC]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    version           TEXT PRIMARY KEY,
+    path              TEXT NOT NULL,
+    format            TEXT NOT NULL,
+    sha256            TEXT,
+    auc_roc           REAL,
+    ks_statistic      REAL,
+    gini_coefficient  REAL,
+    features          TEXT,
+    n_features        INTEGER,
+    trained_at        TEXT,
+    production_ready  INTEGER NOT NULL DEFAULT 0,
+    registered_at     TEXT NOT NULL,
+    metadata          TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_models_auc ON models (auc_roc DESC, trained_at DESC);
+CREATE INDEX IF NOT EXISTS idx_models_production ON models (production_ready, trained_at DESC);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias       TEXT PRIMARY KEY,
+    version     TEXT NOT NULL REFERENCES models (version),
+    updated_at  TEXT NOT NULL
+);
+"""
+
+_COLUMNS = ['version', 'path', 'format', 'sha256', 'auc_roc', 'ks_statistic', 'gini_coefficient',
+            'features', 'n_features', 'trained_at', 'production_ready', 'registered_at', 'metadata']
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """
+    Empreinte SHA-256 d'un modèle
+
+    Pour un artefact, l'empreinte couvre le manifeste et l'estimateur.
+    """
+    path = Path(path)
+    files = [path / MANIFEST_FILE, path / ESTIMATOR_FILE] if path.is_dir() else [path]
+
+    digest = hashlib.sha256()
+    for file_path in files:
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _parse_timestamp(timestamp: Optional[str]) -> Optional[str]:
+    """Convertit un horodatage YYYYmmdd_HHMMSS en ISO (inchangé s'il l'est déjà)"""
+    if not timestamp:
+        return None
+    try:
+        return datetime.strptime(timestamp, "%Y%m%d_%H%M%S").isoformat()
+    except ValueError:
+        return timestamp
+
+
+class ModelIndex:
+    """
+    Catalogue SQLite des modèles sous modeling/models/.
+
+    Une connexion est ouverte par opération : l'index peut être partagé entre
+    threads et processus (écritures sérialisées par SQLite).
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Fichier SQLite, ou répertoire des modèles (model_index.db y est créé)
+        """
+        path = Path(path)
+        self.path = path / INDEX_FILENAME if path.suffix != '.db' else path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.root = self.path.parent.resolve()
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _stored_path(self, path: Union[str, Path]) -> str:
+        """Chemin enregistré : relatif au répertoire de l'index s'il s'y trouve, absolu sinon"""
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _to_record(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        record = dict(row)
+        record['path'] = str(self.root / record['path'])
+        record['features'] = json.loads(record['features']) if record['features'] else []
+        record['metadata'] = json.loads(record['metadata']) if record['metadata'] else {}
+        record['production_ready'] = bool(record['production_ready'])
+        return record
+
+    def register(self, version: str, path: Union[str, Path],
+                 metrics: Optional[Dict[str, float]] = None,
+                 features: Optional[Sequence[str]] = None,
+                 trained_at: Optional[str] = None,
+                 production_ready: bool = False,
+                 metadata: Optional[Dict[str, Any]] = None,
+                 sha256: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Enregistre (ou met à jour) un modèle et les alias qu'il remplace
+
+        Args:
+            version: Identifiant unique du modèle (nom du fichier ou de l'artefact)
+            path: Fichier .pkl ou répertoire d'artefact
+            metrics: Métriques (auc_roc, ks_statistic, gini_coefficient, ...)
+            features: Liste des features du modèle
+            trained_at: Date d'entraînement (ISO ou YYYYmmdd_HHMMSS)
+            production_ready: Modèle validé pour la production
+            metadata: Métadonnées complémentaires
+            sha256: Empreinte (calculée si absente)
+
+        Returns:
+            Enregistrement stocké
+        """
+        path = Path(path)
+        metrics = _to_json(metrics or {})
+        now = datetime.now().isoformat()
+
+        record = {
+            'version': version,
+            'path': self._stored_path(path),
+            'format': 'artifact' if is_artifact(path) else 'pickle',
+            'sha256': sha256 or file_sha256(path),
+            'auc_roc': metrics.get('auc_roc'),
+            'ks_statistic': metrics.get('ks_statistic'),
+            'gini_coefficient': metrics.get('gini_coefficient'),
+            'features': json.dumps(list(features) if features is not None else []),
+            'n_features': len(features) if features is not None else None,
+            'trained_at': _parse_timestamp(trained_at),
+            'production_ready': int(bool(production_ready)),
+            'registered_at': now,
+            'metadata': json.dumps(_to_json({**(metadata or {}), 'metrics': metrics}), ensure_ascii=False)
+        }
+
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO models ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                [record[col] for col in _COLUMNS]
+            )
+            # Alias recalculés à l'écriture : la lecture reste une recherche par clé
+            self._rebuild_alias(conn, BEST_AUC, now)
+            self._rebuild_alias(conn, LATEST_PRODUCTION, now)
+
+        return self._to_record(self._row(version))
+
+    def _rebuild_alias(self, conn: sqlite3.Connection, alias: str, now: str):
+        """Recalcule un alias depuis la table (parcours d'index SQL, une ligne lue)"""
+        queries = {
+            BEST_AUC: "SELECT version FROM models WHERE auc_roc IS NOT NULL "
+                      "AND json_extract(metadata, '$.tournament') IS NULL "
+                      "ORDER BY auc_roc DESC, trained_at DESC LIMIT 1",
+            LATEST_PRODUCTION: "SELECT version FROM models WHERE production_ready = 1 "
+                               "ORDER BY trained_at DESC LIMIT 1"
+        }
+        row = conn.execute(queries[alias]).fetchone()
+        if row is None:
+            conn.execute("DELETE FROM aliases WHERE alias = ?", (alias,))
+        else:
+            conn.execute("INSERT OR REPLACE INTO aliases (alias, version, updated_at) VALUES (?, ?, ?)",
+                         (alias, row['version'], now))
+
+    def _row(self, version: str) -> Optional[sqlite3.Row]:
+        with self._connect() as conn:
+            return conn.execute("SELECT * FROM models WHERE version = ?", (version,)).fetchone()
+
+    def get(self, version: str) -> Optional[Dict[str, Any]]:
+        """Enregistrement d'une version (None si inconnue)"""
+        return self._to_record(self._row(version))
+
+    def find_by_path(self, path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """Enregistrement associé à un chemin de modèle"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM models WHERE path = ?", (self._stored_path(path),)).fetchone()
+        return self._to_record(row)
+
+    def resolve(self, rule: str = BEST_AUC) -> Optional[Dict[str, Any]]:
+        """
+        Résout une règle de sélection
+
+        Args:
+            rule: 'best_auc', 'latest_production', 'pinned' ou 'version:<nom>'
+
+        Returns:
+            Enregistrement du modèle sélectionné (None si la règle ne désigne rien)
+        """
+        if rule.startswith('version:'):
+            return self.get(rule[len('version:'):])
+        if rule not in SELECTION_RULES:
+            raise ValueError(f"Règle de sélection inconnue: {rule} (attendu: {SELECTION_RULES} ou version:<nom>)")
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT m.* FROM aliases a JOIN models m ON m.version = a.version WHERE a.alias = ?",
+                (rule,)
+            ).fetchone()
+        return self._to_record(row)
+
+    def select(self, rules: Iterable[str] = DEFAULT_SELECTION_RULES) -> Optional[Dict[str, Any]]:
+        """Premier modèle désigné par une liste ordonnée de règles"""
+        for rule in rules:
+            record = self.resolve(rule)
+            if record is not None:
+                return record
+        return None
+
+    def pin(self, version: str):
+        """Épingle une version (prioritaire dans l'ordre de résolution par défaut)"""
+        if self.get(version) is None:
+            raise KeyError(f"Version inconnue de l'index: {version}")
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO aliases (alias, version, updated_at) VALUES (?, ?, ?)",
+                         (PINNED, version, datetime.now().isoformat()))
+
+    def unpin(self):
+        """Retire l'épinglage"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM aliases WHERE alias = ?", (PINNED,))
+
+    def set_production(self, version: str, production_ready: bool = True):
+        """Change le statut production d'une version et met à jour l'alias associé"""
+        with self._connect() as conn:
+            updated = conn.execute("UPDATE models SET production_ready = ? WHERE version = ?",
+                                   (int(production_ready), version)).rowcount
+            if not updated:
+                raise KeyError(f"Version inconnue de l'index: {version}")
+            self._rebuild_alias(conn, LATEST_PRODUCTION, datetime.now().isoformat())
+
+    def remove(self, version: str):
+        """Retire une version de l'index (et des alias qui la désignaient)"""
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            aliases = [row['alias'] for row in conn.execute(
+                "SELECT alias FROM aliases WHERE version = ?", (version,))]
+            conn.execute("DELETE FROM aliases WHERE version = ?", (version,))
+            conn.execute("DELETE FROM models WHERE version = ?", (version,))
+            for alias in aliases:
+                if alias != PINNED:
+                    self._rebuild_alias(conn, alias, now)
+
+    def aliases(self) -> Dict[str, str]:
+        """Alias courants {alias: version}"""
+        with self._connect() as conn:
+            return {row['alias']: row['version'] for row in conn.execute("SELECT alias, version FROM aliases")}
+
+    def list(self, limit: Optional[int] = None, production_only: bool = False) -> List[Dict[str, Any]]:
+        """Modèles classés par AUC décroissante puis date"""
+        query = "SELECT * FROM models"
+        if production_only:
+            query += " WHERE production_ready = 1"
+        query += " ORDER BY auc_roc DESC, trained_at DESC"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+
+        with self._connect() as conn:
+            return [self._to_record(row) for row in conn.execute(query)]
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM models").fetchone()[0]
+
+    def backfill(self, models_dir: Union[str, Path]) -> List[str]:
+        """
+        Indexe les modèles existants non encore enregistrés
+
+        Les artefacts sont indexés depuis leur manifeste ; les pickles
+        historiques de final_models/ sont désérialisés une fois pour leurs
+        métriques et associés à leur fichier `model_metadata_<timestamp>.json`
+        (métriques de validation, statut production).
+
+        Args:
+            models_dir: Répertoire des modèles (ex: modeling/models)
+
+        Returns:
+            Versions ajoutées
+        """
+        import joblib
+
+        models_dir = Path(models_dir)
+        added = []
+
+        artifacts_dir = models_dir / 'artifacts'
+        artifact_paths = sorted(p for p in artifacts_dir.iterdir() if is_artifact(p)) if artifacts_dir.exists() else []
+        for path in artifact_paths:
+            if self.get(path.name) is not None:
+                continue
+            manifest = ModelArtifact(path).manifest
+            metadata = manifest.get('metadata', {})
+            self.register(
+                path.name, path,
+                metrics=manifest.get('metrics'),
+                features=manifest.get('feature_names'),
+                trained_at=manifest.get('created_at'),
+                production_ready=bool(metadata.get('production_ready', False)),
+                metadata={**metadata, 'model_type': manifest.get('model_type')}
+            )
+            added.append(path.name)
+
+        indexed = {record['version'] for record in self.list()}
+        for pkl_path in sorted(models_dir.glob('*.pkl')) + sorted((models_dir / 'final_models').glob('*.pkl')):
+            if pkl_path.stem in indexed or pkl_path.stem == 'best_model':
+                continue
+
+            metadata = {}
+            for candidate in pkl_path.parent.glob('model_metadata_*.json'):
+                if candidate.stem[len('model_metadata_'):] in pkl_path.stem:
+                    with open(candidate, 'r', encoding='utf-8') as f:
+                        metadata = json.load(f)
+                    break
+
+            model_info = joblib.load(pkl_path)
+            if not isinstance(model_info, dict):
+                model_info = {'model': model_info}
+            features = getattr(model_info['model'], 'feature_names_in_', None)
+
+            self.register(
+                pkl_path.stem, pkl_path,
+                metrics={**metadata.get('performance_summary', {}), **model_info.get('metrics', {})},
+                features=list(features) if features is not None else None,
+                trained_at=metadata.get('creation_date') or model_info.get('timestamp'),
+                production_ready=bool(metadata.get('production_ready', False)),
+                metadata={**metadata, 'model_type': type(model_info['model']).__name__}
+            )
+            added.append(pkl_path.stem)
+
+        return added
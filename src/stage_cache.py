@@ -0,0 +1,169 @@
+"""
+Cache des étapes du pipeline de données, adressé par contenu.
+
+Chaque étape (nettoyage, feature engineering, transformation) est identifiée
+par une clé : hash de l'empreinte de ses données d'entrée, de sa section de
+configuration et de la version de son code (empreinte des fichiers sources).
+Une entrée stocke la sortie de l'étape (DataFrame) et son état appris.
+
+La clé d'une étape sert d'empreinte des données d'entrée de l'étape suivante :
+modifier un réglage du VariableTransformer ne relance que la transformation,
+modifier le fichier brut relance toute la chaîne.
+"""
+
+import json
+import inspect
+import hashlib
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import joblib
+import pandas as pd
+
+
+DATA_FILE = 'data.pkl'
+STATE_FILE = 'state.joblib'
+MANIFEST_FILE = 'manifest.json'
+
+# Composantes de la clé, dans l'ordre d'affichage des explications
+_COMPONENTS = {
+    'input': "données d'entrée modifiées",
+    'config': "configuration modifiée",
+    'code': "code modifié"
+}
+
+
+def file_fingerprint(path: Union[str, Path]) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_version(*objects: Any) -> str:
+    """Empreinte des fichiers sources des modules qui définissent les objets donnés"""
+    digest = hashlib.sha256()
+    for path in sorted({inspect.getsourcefile(obj) for obj in objects}):
+        digest.update(Path(path).name.encode('utf-8'))
+        digest.update(bytes.fromhex(file_fingerprint(path)))
+    return digest.hexdigest()
+
+
+def _config_fingerprint(config: Any) -> str:
+    payload = json.dumps(config, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class StageCache:
+    """
+    Cache disque des sorties d'étapes : `<cache_dir>/<étape>/<clé>/`
+    (données, état appris, manifeste des composantes de la clé).
+
+    Chaque consultation est journalisée (succès, échec et sa cause) pour
+    `explain()`.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], enabled: bool = True, refresh: bool = False):
+        """
+        Args:
+            cache_dir: Répertoire racine du cache
+            enabled: Cache actif (sinon toutes les étapes sont recalculées, rien n'est écrit)
+            refresh: Ignore les entrées existantes mais enregistre les nouveaux résultats
+        """
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.refresh = refresh
+        self.events: List[Dict[str, Any]] = []
+        self._components: Dict[Tuple[str, str], Dict[str, str]] = {}
+
+    def key(self, stage: str, input_fingerprint: str, config: Any, code: str) -> str:
+        """
+        Clé d'une étape
+
+        Args:
+            stage: Nom de l'étape
+            input_fingerprint: Empreinte des données d'entrée (clé de l'étape amont ou empreinte de fichier)
+            config: Section de configuration lue par l'étape (sérialisable en JSON)
+            code: Version du code de l'étape (voir code_version)
+        """
+        components = {'input': input_fingerprint, 'config': _config_fingerprint(config), 'code': code}
+        key = hashlib.sha256(json.dumps([stage, components], sort_keys=True).encode('utf-8')).hexdigest()[:24]
+        self._components[(stage, key)] = components
+        return key
+
+    def load(self, stage: str, key: str) -> Optional[Tuple[pd.DataFrame, Any]]:
+        """
+        Sortie et état d'une étape en cache
+
+        Returns:
+            (données, état) ou None si l'étape doit être recalculée
+        """
+        entry_dir = self.cache_dir / stage / key
+        if not self.enabled:
+            return self._record(stage, key, False, "cache désactivé")
+        if self.refresh:
+            return self._record(stage, key, False, "recalcul forcé")
+        if not (entry_dir / MANIFEST_FILE).exists():
+            return self._record(stage, key, False, self._miss_reason(stage, key))
+
+        try:
+            result = pd.read_pickle(entry_dir / DATA_FILE), joblib.load(entry_dir / STATE_FILE)
+        except Exception as e:
+            return self._record(stage, key, False, f"entrée illisible ({e})")
+        self._record(stage, key, True, "")
+        return result
+
+    def save(self, stage: str, key: str, data: pd.DataFrame, state: Any = None) -> Optional[Path]:
+        """Enregistre la sortie et l'état d'une étape (le manifeste en dernier : entrée complète ou absente)"""
+        if not self.enabled:
+            return None
+
+        entry_dir = self.cache_dir / stage / key
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        data.to_pickle(entry_dir / DATA_FILE)
+        joblib.dump(state, entry_dir / STATE_FILE)
+
+        manifest = {
+            'stage': stage,
+            'key': key,
+            'components': self._components.get((stage, key), {}),
+            'shape': list(data.shape),
+            'created_at': datetime.now().isoformat()
+        }
+        with open(entry_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return entry_dir
+
+    def _record(self, stage: str, key: str, hit: bool, reason: str) -> None:
+        self.events.append({'stage': stage, 'key': key, 'hit': hit, 'reason': reason})
+        return None
+
+    def _miss_reason(self, stage: str, key: str) -> str:
+        """Composantes de la clé qui diffèrent de la dernière entrée de l'étape"""
+        manifests = []
+        for path in (self.cache_dir / stage).glob(f"*/{MANIFEST_FILE}"):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    manifests.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        if not manifests:
+            return "aucune entrée en cache"
+
+        latest = max(manifests, key=lambda m: m.get('created_at', ''))
+        current = self._components.get((stage, key), {})
+        changed = [label for name, label in _COMPONENTS.items()
+                   if latest.get('components', {}).get(name) != current.get(name)]
+        return ", ".join(changed) or "entrée absente"
+
+    def explain(self) -> List[str]:
+        """Une ligne par consultation : étape, succès/échec, clé et cause de l'échec"""
+        lines = []
+        for event in self.events:
+            status = "✅ HIT " if event['hit'] else "❌ MISS"
+            line = f"   {status} {event['stage']:<10} {event['key']}"
+            lines.append(line + (f"  ({event['reason']})" if event['reason'] else ""))
+        return lines
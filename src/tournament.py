@@ -0,0 +1,254 @@
+"""
+Tournoi d'algorithmes de crédit scoring.
+
+Plusieurs familles de modèles sont entraînées en parallèle, une par
+processus, sur une copie unique de X_train mappée en mémoire (np.load avec
+mmap_mode='r' : les processus partagent les pages du fichier au lieu d'en
+recevoir chacun une copie sérialisée). Chaque candidat dispose d'un budget
+de temps : un processus qui le dépasse est arrêté et le candidat est classé
+« timeout ». Les candidats terminés sont évalués sur le jeu de test (AUC, KS,
+Gini) et leur latence de scoring d'une demande unique est mesurée ; le
+classement est le rang moyen sur ces critères.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import multiprocessing
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier, StackingClassifier
+from sklearn.linear_model import LogisticRegression
+from threadpoolctl import threadpool_limits
+
+from .metrics import score_metrics
+
+
+CANDIDATE_FAMILIES = ['logistic_regression', 'hist_gradient_boosting', 'random_forest', 'stacking']
+
+# Critères de classement : True si une valeur plus grande est meilleure
+RANKING_CRITERIA = {
+    'auc_roc': True,
+    'ks_statistic': True,
+    'gini_coefficient': True,
+    'latency_p50_us': False
+}
+
+# Paramètres par défaut de chaque famille (complétés par la configuration)
+DEFAULT_CANDIDATE_PARAMS = {
+    'logistic_regression': {'C': 1.0, 'penalty': 'l2', 'solver': 'lbfgs', 'max_iter': 1000,
+                            'class_weight': 'balanced'},
+    'hist_gradient_boosting': {'learning_rate': 0.05, 'max_iter': 300, 'max_leaf_nodes': 15,
+                               'l2_regularization': 1.0, 'early_stopping': True, 'class_weight': 'balanced'},
+    'random_forest': {'n_estimators': 300, 'min_samples_leaf': 5, 'max_features': 'sqrt',
+                      'class_weight': 'balanced'},
+    'stacking': {'cv': 5}
+}
+
+
+def build_candidate(family: str, params: Optional[Dict[str, Any]] = None, random_state: int = 42,
+                    n_jobs: int = 1) -> Any:
+    """
+    Estimateur non entraîné d'une famille du tournoi
+
+    Args:
+        family: Famille (voir CANDIDATE_FAMILIES)
+        params: Paramètres propres à la famille (remplacent les valeurs par défaut).
+            Pour 'stacking', les clés 'logistic_regression', 'hist_gradient_boosting'
+            et 'random_forest' paramètrent les modèles de base.
+        random_state: Graine
+        n_jobs: Parallélisme interne (random_forest, stacking)
+
+    Raises:
+        ValueError: Si la famille est inconnue
+    """
+    params = dict(params or {})
+    if family not in CANDIDATE_FAMILIES:
+        raise ValueError(f"Famille de modèle inconnue: {family} (attendu: {CANDIDATE_FAMILIES})")
+
+    if family == 'stacking':
+        base_families = [name for name in CANDIDATE_FAMILIES if name != 'stacking']
+        estimators = [(name, build_candidate(name, params.pop(name, None), random_state, n_jobs))
+                      for name in base_families]
+        return StackingClassifier(
+            estimators=estimators,
+            final_estimator=LogisticRegression(max_iter=1000, random_state=random_state),
+            n_jobs=n_jobs,
+            **{**DEFAULT_CANDIDATE_PARAMS['stacking'], **params}
+        )
+
+    params = {**DEFAULT_CANDIDATE_PARAMS[family], **params}
+    if family == 'logistic_regression':
+        return LogisticRegression(random_state=random_state, **params)
+    if family == 'hist_gradient_boosting':
+        return HistGradientBoostingClassifier(random_state=random_state, **params)
+    return RandomForestClassifier(random_state=random_state, n_jobs=n_jobs, **params)
+
+
+def _candidate_worker(family: str, params: Dict[str, Any], data_dir: str, feature_names: List[str],
+                      random_state: int, n_threads: int, connection: Any):
+    """Entraîne un candidat dans un processus dédié et renvoie son statut par le pipe"""
+    try:
+        with threadpool_limits(limits=n_threads):
+            X = np.load(Path(data_dir) / 'X_train.npy', mmap_mode='r')
+            y = np.load(Path(data_dir) / 'y_train.npy')
+            X = pd.DataFrame(X, columns=feature_names, copy=False)
+
+            model = build_candidate(family, params, random_state, n_jobs=n_threads)
+            start = time.perf_counter()
+            model.fit(X, y)
+            fit_time = time.perf_counter() - start
+
+        model_file = Path(data_dir) / f"{family}.joblib"
+        joblib.dump(model, model_file)
+        connection.send({'status': 'ok', 'fit_time': fit_time, 'model_file': str(model_file)})
+    except Exception as e:
+        connection.send({'status': 'failed', 'error': f"{type(e).__name__}: {e}"})
+    finally:
+        connection.close()
+
+
+def score_candidate(model: Any, X_test: pd.DataFrame, y_test: Sequence[int],
+                    latency_calls: int = 200) -> Dict[str, float]:
+    """
+    Métriques de classement d'un candidat entraîné
+
+    Returns:
+        auc_roc, ks_statistic, gini_coefficient et latence de predict_proba
+        sur une ligne (p50 / p99 en microsecondes)
+    """
+    metrics = score_metrics(y_test, model.predict_proba(X_test)[:, 1])
+
+    # Latence d'une demande unique (lignes préparées hors mesure)
+    rows = [X_test.iloc[[i % len(X_test)]] for i in range(min(latency_calls, len(X_test)))]
+    timings = np.empty(latency_calls)
+    for i in range(latency_calls):
+        start = time.perf_counter()
+        model.predict_proba(rows[i % len(rows)])
+        timings[i] = time.perf_counter() - start
+    timings *= 1e6
+
+    return {
+        'auc_roc': metrics['auc_roc'],
+        'ks_statistic': metrics['ks_statistic'],
+        'gini_coefficient': metrics['gini_coefficient'],
+        'latency_p50_us': float(np.percentile(timings, 50)),
+        'latency_p99_us': float(np.percentile(timings, 99))
+    }
+
+
+def rank_candidates(results: List[Dict[str, Any]],
+                    criteria: Dict[str, bool] = RANKING_CRITERIA) -> List[Dict[str, Any]]:
+    """
+    Classe les candidats par rang moyen sur les critères (AUC en départage)
+
+    Les candidats sans métriques (timeout, échec) sont placés en fin de
+    classement, sans rang.
+    """
+    scored = [r for r in results if r.get('metrics')]
+    others = [r for r in results if not r.get('metrics')]
+    if scored:
+        table = pd.DataFrame([r['metrics'] for r in scored])
+        ranks = pd.concat([table[name].rank(ascending=not higher_is_better, method='min')
+                           for name, higher_is_better in criteria.items()], axis=1)
+        for result, mean_rank in zip(scored, ranks.mean(axis=1)):
+            result['mean_rank'] = float(mean_rank)
+        scored.sort(key=lambda r: (r['mean_rank'], -r['metrics']['auc_roc']))
+        for position, result in enumerate(scored, start=1):
+            result['rank'] = position
+    for result in others:
+        result['rank'] = None
+    return scored + others
+
+
+def run_tournament(X_train: pd.DataFrame, y_train: Sequence[int], X_test: pd.DataFrame, y_test: Sequence[int],
+                   families: Optional[Sequence[str]] = None,
+                   params: Optional[Dict[str, Dict[str, Any]]] = None,
+                   time_budget: float = 300.0, n_workers: Optional[int] = None,
+                   work_dir: Optional[Union[str, Path]] = None, random_state: int = 42,
+                   latency_calls: int = 200) -> List[Dict[str, Any]]:
+    """
+    Entraîne les familles candidates en parallèle, chacune dans son budget de temps
+
+    Args:
+        X_train: Features d'entraînement (écrites une fois en .npy, mappées par les processus)
+        y_train: Cible d'entraînement
+        X_test: Features de test (évaluation et latence)
+        y_test: Cible de test
+        families: Familles candidates (défaut: CANDIDATE_FAMILIES)
+        params: Paramètres par famille
+        time_budget: Budget d'entraînement par candidat (secondes)
+        n_workers: Processus simultanés (défaut: nombre de cœurs, au plus une famille par processus)
+        work_dir: Répertoire de travail (temporaire et supprimé si absent)
+        random_state: Graine
+        latency_calls: Nombre d'appels de la mesure de latence
+
+    Returns:
+        Résultats classés (voir rank_candidates) : family, status ('ok',
+        'timeout', 'failed'), fit_time, metrics, model, error, rank, mean_rank
+    """
+    families = list(families or CANDIDATE_FAMILIES)
+    params = params or {}
+    n_cpus = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers or n_cpus, len(families)))
+    n_threads = max(1, n_cpus // n_workers)
+
+    temporary = work_dir is None
+    work_dir = Path(tempfile.mkdtemp(prefix='tournament_') if temporary else work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        # Copie partagée des données d'entraînement
+        np.save(work_dir / 'X_train.npy', np.ascontiguousarray(X_train.to_numpy()))
+        np.save(work_dir / 'y_train.npy', np.asarray(y_train))
+        feature_names = [str(name) for name in X_train.columns]
+
+        context = multiprocessing.get_context()
+        pending, running, results = list(families), {}, {}
+        while pending or running:
+            while pending and len(running) < n_workers:
+                family = pending.pop(0)
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(
+                    target=_candidate_worker,
+                    args=(family, params.get(family, {}), str(work_dir), feature_names,
+                          random_state, n_threads, sender),
+                    daemon=True
+                )
+                process.start()
+                sender.close()
+                running[family] = (process, receiver, time.perf_counter())
+
+            time.sleep(0.05)
+            for family, (process, receiver, start) in list(running.items()):
+                elapsed = time.perf_counter() - start
+                if receiver.poll():
+                    results[family] = {'family': family, **receiver.recv()}
+                elif elapsed > time_budget:
+                    process.terminate()
+                    results[family] = {'family': family, 'status': 'timeout', 'fit_time': elapsed,
+                                       'error': f"budget de {time_budget:.0f}s dépassé"}
+                elif not process.is_alive():
+                    results[family] = {'family': family, 'status': 'failed', 'fit_time': elapsed,
+                                       'error': f"processus terminé (code {process.exitcode})"}
+                else:
+                    continue
+                process.join()
+                receiver.close()
+                del running[family]
+
+        # Évaluation séquentielle : latences mesurées sans concurrence
+        for result in results.values():
+            if result['status'] == 'ok':
+                result['model'] = joblib.load(result.pop('model_file'))
+                result['metrics'] = score_candidate(result['model'], X_test, y_test, latency_calls)
+    finally:
+        if temporary:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return rank_candidates([results[family] for family in families])
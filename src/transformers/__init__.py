@@ -1,10 +1,12 @@
 """
 Transformers Module for Credit Scoring System
 
-This module contains the feature engineering and variable transformation components.
+This module contains the feature engineering and variable transformation components,
+and the compiled inference graph that fuses them with a model for scoring.
 """
 
 from .feature_engineer import FeatureEngineer
 from .variable_transformer import VariableTransformer
+from .inference_graph import CompiledScoringGraph
 
-__all__ = ['FeatureEngineer', 'VariableTransformer'] 
\ No newline at end of file
+__all__ = ['FeatureEngineer', 'VariableTransformer', 'CompiledScoringGraph'] 
\ No newline at end of file
@@ -8,14 +8,186 @@ Author: Credit Scoring Team
 Created: 2024
 """
 
+import json
 import pandas as pd
 import numpy as np
 import logging
-from typing import Tuple, Dict, List, Any
+from pathlib import Path
+from typing import Tuple, Dict, List, Any, Optional, Union
 from sklearn.preprocessing import LabelEncoder
 import warnings
 warnings.filterwarnings('ignore')
 
+from .lookup_stage import LookupStage, resolve_lookup_specs
+
+
+# Tables de correspondance des features métier
+TAUX_ENDETTEMENT_MAPPING = {
+    'inferieur a 20%': 15,
+    'compris entre 20% et 25%': 22.5,
+    'compris entre 25% et 35%': 30,
+    'superieur a 35%': 40
+}
+
+EPARGNE_MAPPING = {
+    'A11': 0.0,   # < 100 DM
+    'A12': 0.1,   # 100-500 DM
+    'A13': 0.3,   # 500-1000 DM
+    'A14': 0.6,   # >= 1000 DM
+    'A15': 0.0    # Inconnu
+}
+
+HISTORIQUE_SCORES = {
+    'A30': 1.0,   # Pas de crédit / tous payés
+    'A31': 0.9,   # Tous payés à temps
+    'A32': 0.7,   # Payés à temps jusqu'à présent
+    'A33': 0.4,   # Retard dans le passé
+    'A34': 0.1    # Compte critique
+}
+
+OBJET_DIVERSITY = {
+    'A40': 0.2,   # Voiture neuve
+    'A41': 0.3,   # Voiture occasion  
+    'A42': 0.6,   # Mobilier/équipement
+    'A43': 0.4,   # Radio/TV
+    'A44': 0.5,   # Électroménager
+    'A45': 0.7,   # Réparations
+    'A46': 0.8,   # Éducation
+    'A47': 0.6,   # Vacances
+    'A48': 0.9,   # Reconversion
+    'A49': 0.8,   # Entreprise
+    'A410': 0.5   # Autres
+}
+
+ANCIENNETE_MAPPING = {
+    'A71': 0.5,   # Chômeur
+    'A72': 1,     # < 1 an
+    'A73': 2.5,   # 1-4 ans
+    'A74': 7,     # 4-7 ans
+    'A75': 10     # >= 7 ans
+}
+
+# Demandes récentes selon le type d'autres crédits (banque / magasins)
+NOMBRE_CREDIT_INQUIRIES = {'A141': 2, 'A142': 1}
+
+RETARD_FREQUENCY = {
+    'A30': 0.0,   # Pas de crédit
+    'A31': 0.0,   # Tous payés à temps
+    'A32': 0.1,   # Payés à temps jusqu'à présent
+    'A33': 0.6,   # Retard dans le passé
+    'A34': 0.9    # Compte critique
+}
+
+STABILITE_EMPLOI = {
+    'A71': 0.0,   # Chômeur
+    'A72': 0.2,   # < 1 an
+    'A73': 0.6,   # 1-4 ans
+    'A74': 0.8,   # 4-7 ans
+    'A75': 1.0    # >= 7 ans
+}
+
+STATUT_EDUCATION_MATCH = {
+    'A91': 0.2,   # Homme divorcé/séparé
+    'A92': 0.6,   # Femme divorcée/séparée/mariée
+    'A93': 0.8,   # Homme célibataire
+    'A94': 0.7    # Homme marié/veuf
+}
+
+REGIONAL_RISK = {
+    'A151': 0.3,  # Loue
+    'A152': 0.1,  # Propriétaire
+    'A153': 0.5   # Gratuit
+}
+
+# Risque saisonnier par mois de demande
+SEASONAL_RISK = {1: 0.1, 2: 0.1, 3: 0.2, 4: 0.3, 5: 0.4, 6: 0.5,
+                 7: 0.6, 8: 0.5, 9: 0.4, 10: 0.3, 11: 0.2, 12: 0.8}
+
+# Mois proches des vacances (juin-août, décembre)
+HOLIDAY_MONTHS = [6, 7, 8, 12]
+
+# Segments d'âge (features démographiques et interactions mixtes)
+AGE_SEGMENT_BINS = [0, 25, 35, 45, 55, 100]
+AGE_SEGMENT_LABELS = ['young', 'young_adult', 'adult', 'mature', 'senior']
+AGE_CATEGORY_BINS = [0, 30, 50, 100]
+AGE_CATEGORY_LABELS = ['young', 'middle', 'senior']
+
+# Variables discrétisées en classes de largeur égale (bornes apprises par fit)
+EQUAL_WIDTH_BINNED = ['revenus_estimes', 'montant']
+N_EQUAL_WIDTH_BINS = 3
+AMOUNT_LEVEL_LABELS = ['low', 'medium', 'high']
+INCOME_LEVEL_LABELS = ['low', 'med', 'high']
+
+# Features obtenues par correspondance catégorie -> valeur : colonne source,
+# table et valeur par défaut (catégories inconnues ou manquantes ; None = NaN).
+# Surchargeables par ml_workflow.feature_engineering.mappings dans la configuration.
+LOOKUP_FEATURES = {
+    'taux_endettement_num': {'source': 'taux_endettement', 'values': TAUX_ENDETTEMENT_MAPPING, 'default': 25},
+    'savings_rate': {'source': 'epargne', 'values': EPARGNE_MAPPING, 'default': 0},
+    'payment_history_score': {'source': 'historique', 'values': HISTORIQUE_SCORES, 'default': 0.5},
+    'credit_mix_diversity': {'source': 'objet', 'values': OBJET_DIVERSITY, 'default': 0.5},
+    'recent_inquiries_count': {'source': 'nombre_credit', 'values': NOMBRE_CREDIT_INQUIRIES, 'default': 0},
+    'account_age_average': {'source': 'anciennete_emploi', 'values': ANCIENNETE_MAPPING, 'default': 0},
+    'late_payment_frequency': {'source': 'historique', 'values': RETARD_FREQUENCY, 'default': 0.3},
+    'employment_stability_score': {'source': 'anciennete_emploi', 'values': STABILITE_EMPLOI, 'default': 0.3},
+    'education_employment_match': {'source': 'statut', 'values': STATUT_EDUCATION_MATCH, 'default': 0.5},
+    'regional_risk_factor': {'source': 'logement', 'values': REGIONAL_RISK, 'default': 0.4},
+    'seasonal_risk_indicator': {'source': 'application_month', 'values': SEASONAL_RISK, 'default': None}
+}
+
+# Colonnes sources créées par le feature engineering lui-même (features temporelles)
+DERIVED_LOOKUP_SOURCES = ['application_month']
+
+FEATURE_STATE_VERSION = 2
+
+# Noms des tables de l'état version 1 -> feature correspondante
+_V1_MAPPING_FEATURES = {
+    'taux_endettement': 'taux_endettement_num',
+    'epargne': 'savings_rate',
+    'historique_scores': 'payment_history_score',
+    'objet_diversity': 'credit_mix_diversity',
+    'nombre_credit_inquiries': 'recent_inquiries_count',
+    'anciennete': 'account_age_average',
+    'retard_frequency': 'late_payment_frequency',
+    'stabilite_emploi': 'employment_stability_score',
+    'statut_education_match': 'education_employment_match',
+    'regional_risk': 'regional_risk_factor',
+    'seasonal_risk': 'seasonal_risk_indicator'
+}
+
+
+def _equal_width_bins(values: np.ndarray, n_bins: int = N_EQUAL_WIDTH_BINS) -> np.ndarray:
+    """Bornes de `pd.cut(values, bins=n_bins)` (largeur égale, calculées sur les valeurs)"""
+    values = np.asarray(values, dtype=float)
+    mn, mx = np.nanmin(values), np.nanmax(values)
+    if mn == mx:
+        mn -= 0.001 * abs(mn) if mn != 0 else 0.001
+        mx += 0.001 * abs(mx) if mx != 0 else 0.001
+        return np.linspace(mn, mx, n_bins + 1, endpoint=True)
+
+    bins = np.linspace(mn, mx, n_bins + 1, endpoint=True)
+    bins[0] -= (mx - mn) * 0.001
+    return bins
+
+
+def _cut_labels(values: np.ndarray, bins: Any, labels: List[str]) -> np.ndarray:
+    """Équivalent de `pd.cut(values, bins, labels).astype(str)` (intervalles fermés à droite)"""
+    values = np.asarray(values, dtype=float)
+    bins = np.asarray(bins, dtype=float)
+    ids = np.searchsorted(bins, values, side='left')
+    outside = np.isnan(values) | (ids == 0) | (ids == len(bins))
+
+    table = np.asarray(list(labels) + ['nan'], dtype=object)
+    ids = np.where(outside, len(table), ids) - 1
+    return table[ids]
+
+
+def _open_ended(bins: np.ndarray) -> np.ndarray:
+    """Bornes figées dont les classes extrêmes sont ouvertes (valeurs hors de la plage d'apprentissage)"""
+    bins = np.array(bins, dtype=float)
+    bins[0], bins[-1] = -np.inf, np.inf
+    return bins
+
 
 class FeatureEngineer:
     """
@@ -38,6 +210,11 @@ class FeatureEngineer:
         self.logger = logging.getLogger(__name__)
         self.feature_info = {}  # Information sur les features créées
         
+        # État appris par fit (bornes des classes, correspondances)
+        self.bin_edges_: Optional[Dict[str, np.ndarray]] = None
+        self.mappings_: Optional[Dict[str, Dict]] = None
+        self._lookup_stage: Optional[LookupStage] = None
+        
         # Configuration par défaut
         self.default_config = {
             'create_ratios': True,
@@ -46,6 +223,145 @@ class FeatureEngineer:
             'create_risk_indicators': True
         }
         
+    @property
+    def is_fitted(self) -> bool:
+        return self.bin_edges_ is not None
+    
+    def fit(self, df: pd.DataFrame) -> 'FeatureEngineer':
+        """
+        Apprend l'état du feature engineering sur les données d'entraînement
+        
+        Les bornes des classes de largeur égale (revenus estimés, montant) et
+        les correspondances (tables par défaut et configuration) sont figées :
+        `transform` classe ensuite une demande unique comme un batch complet.
+        
+        Args:
+            df: Données nettoyées d'entraînement
+            
+        Returns:
+            self
+        """
+        self.mappings_ = self._configured_mappings()
+        values = {
+            'revenus_estimes': self._estimate_income(df, self._lookup(df, 'taux_endettement_num')),
+            'montant': df['montant'].to_numpy(dtype=float)
+        }
+        self.bin_edges_ = {name: _equal_width_bins(values[name]) for name in EQUAL_WIDTH_BINNED}
+        return self
+    
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applique le feature engineering avec l'état appris par fit
+        
+        Raises:
+            ValueError: Si le FeatureEngineer n'est pas entraîné
+        """
+        return self.engineer_all_features(df, fit=False)
+    
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apprend l'état sur df puis l'applique"""
+        return self.engineer_all_features(df, fit=True)
+    
+    def get_state(self) -> Dict[str, Any]:
+        """
+        État appris, sérialisable en JSON
+        
+        Les tables sont stockées en paires [clé, valeur] pour conserver le type
+        des clés (les mois de SEASONAL_RISK sont des entiers) ; une valeur par
+        défaut NaN est stockée en null.
+        """
+        if not self.is_fitted:
+            raise ValueError("FeatureEngineer non entraîné: appeler fit() avant get_state()")
+        return {
+            'version': FEATURE_STATE_VERSION,
+            'bin_edges': {name: edges.tolist() for name, edges in self.bin_edges_.items()},
+            'mappings': {
+                feature: {
+                    'source': spec['source'],
+                    'values': [[key, value] for key, value in spec['values'].items()],
+                    'default': None if np.isnan(spec['default']) else spec['default']
+                }
+                for feature, spec in self.mappings_.items()
+            }
+        }
+    
+    def set_state(self, state: Dict[str, Any]) -> 'FeatureEngineer':
+        """Restaure un état produit par get_state (versions 1 et 2)"""
+        version = state.get('version')
+        if version == 1:
+            # Tables seules : sources et valeurs par défaut du module
+            overrides = {_V1_MAPPING_FEATURES[name]: {'values': {key: value for key, value in pairs}}
+                         for name, pairs in state['mappings'].items() if name in _V1_MAPPING_FEATURES}
+        elif version == FEATURE_STATE_VERSION:
+            overrides = {feature: {**spec, 'values': {key: value for key, value in spec['values']}}
+                         for feature, spec in state['mappings'].items()}
+        else:
+            raise ValueError(f"Version d'état non supportée: {version}")
+        
+        self.bin_edges_ = {name: np.asarray(edges, dtype=float) for name, edges in state['bin_edges'].items()}
+        self.mappings_ = resolve_lookup_specs(LOOKUP_FEATURES if version == 1 else {}, overrides)
+        return self
+    
+    def save_state(self, path: Union[str, Path]) -> Path:
+        """Sauvegarde l'état appris (JSON)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.get_state(), f, indent=2, ensure_ascii=False)
+        return path
+    
+    @classmethod
+    def load_state(cls, path: Union[str, Path], config: Dict = None) -> 'FeatureEngineer':
+        """Crée un FeatureEngineer entraîné depuis un état sauvegardé"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(config).set_state(json.load(f))
+    
+    def _configured_mappings(self) -> Dict[str, Dict]:
+        """Correspondances par défaut, complétées par ml_workflow.feature_engineering.mappings"""
+        section = self.config.get('ml_workflow', self.config).get('feature_engineering', {})
+        return resolve_lookup_specs(LOOKUP_FEATURES, section.get('mappings'))
+    
+    @property
+    def lookup_stage(self) -> LookupStage:
+        """Correspondances compilées (figées par fit, sinon configuration courante)"""
+        if self._lookup_stage is None or (self.mappings_ is not None and
+                                          self._lookup_stage.specs is not self.mappings_):
+            self._lookup_stage = LookupStage(self.mappings_ or self._configured_mappings())
+        return self._lookup_stage
+    
+    def _lookups(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Features de correspondance des colonnes sources de df (une factorisation par source)"""
+        sources = [source for source in self.lookup_stage.sources if source not in DERIVED_LOOKUP_SOURCES]
+        return self.lookup_stage.transform(df, sources)
+    
+    def _lookup(self, df: pd.DataFrame, feature: str) -> np.ndarray:
+        """Une feature de correspondance (calcule aussi celles de la même source)"""
+        source = self.lookup_stage.specs[feature]['source']
+        return self.lookup_stage.lookup_source(source, df[source])[feature]
+    
+    def _bin_labels(self, values: pd.Series, name: str, labels: List[str]) -> np.ndarray:
+        """
+        Classes de largeur égale d'une variable, en une recherche dichotomique
+        
+        Avec un état appris, les bornes sont celles de l'entraînement (classes
+        extrêmes ouvertes) ; sans état, elles sont calculées sur le batch comme
+        `pd.cut(bins=3)`.
+        """
+        values = values.to_numpy(dtype=float)
+        if self.is_fitted:
+            bins = _open_ended(self.bin_edges_[name])
+        else:
+            bins = _equal_width_bins(values)
+        return _cut_labels(values, bins, labels)
+    
+    def _estimate_income(self, df: pd.DataFrame, taux: np.ndarray) -> np.ndarray:
+        """Revenus estimés à partir du montant et du taux d'endettement numérique"""
+        return np.where(
+            taux > 0,
+            df['montant'] / (taux / 100),
+            df['montant'] * 5  # Estimation conservative
+        )
+    
     def create_business_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         ÉTAPE 3.1: Création des features métier
@@ -62,51 +378,53 @@ class FeatureEngineer:
         df_features = df.copy()
         created_features = []
         
+        # Toutes les correspondances catégorie -> valeur, en une passe par colonne source
+        lookups = self._lookups(df_features)
+        
         # 1. Ratios financiers
         print("\n💰 Création des ratios financiers...")
-        df_features, ratio_features = self._create_financial_ratios(df_features)
+        df_features, ratio_features = self._create_financial_ratios(df_features, lookups)
         created_features.extend(ratio_features)
         
         # 2. Features de comportement crédit
         print("\n📊 Création des features comportement crédit...")
-        df_features, credit_features = self._create_credit_behavior_features(df_features)
+        df_features, credit_features = self._create_credit_behavior_features(df_features, lookups)
         created_features.extend(credit_features)
         
         # 3. Indicateurs de risque
         print("\n⚠️ Création des indicateurs de risque...")
-        df_features, risk_features = self._create_risk_indicators(df_features)
+        df_features, risk_features = self._create_risk_indicators(df_features, lookups)
         created_features.extend(risk_features)
         
         # 4. Features démographiques
         print("\n👥 Création des features démographiques...")
-        df_features, demo_features = self._create_demographic_features(df_features)
+        df_features, demo_features = self._create_demographic_features(df_features, lookups)
         created_features.extend(demo_features)
         
+        # 5. Correspondances additionnelles déclarées dans la configuration
+        extra_features = [name for name in lookups if name not in df_features.columns]
+        for name in extra_features:
+            df_features[name] = lookups[name]
+        if extra_features:
+            print(f"\n🗂️ {len(extra_features)} features de correspondance configurées ajoutées")
+        created_features.extend(extra_features)
+        
         self.feature_info['business_features'] = created_features
         print(f"\n✅ {len(created_features)} features métier créées avec succès!")
         
         return df_features
     
-    def _create_financial_ratios(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    def _create_financial_ratios(self, df: pd.DataFrame,
+                                 lookups: Dict[str, np.ndarray]) -> Tuple[pd.DataFrame, List[str]]:
         """Création des ratios financiers"""
         created_features = []
         
         # 1. Ratio dette/revenus (Dette totale / Revenus estimés)
         # Conversion du taux d'endettement texte en numérique
-        taux_mapping = {
-            'inferieur a 20%': 15,
-            'compris entre 20% et 25%': 22.5,
-            'compris entre 25% et 35%': 30,
-            'superieur a 35%': 40
-        }
-        df['taux_endettement_num'] = df['taux_endettement'].map(taux_mapping).fillna(25)
+        df['taux_endettement_num'] = lookups['taux_endettement_num']
         
         # Estimation des revenus basée sur le montant demandé et le taux d'endettement
-        df['revenus_estimes'] = np.where(
-            df['taux_endettement_num'] > 0,
-            df['montant'] / (df['taux_endettement_num'] / 100),
-            df['montant'] * 5  # Estimation conservative
-        )
+        df['revenus_estimes'] = self._estimate_income(df, lookups['taux_endettement_num'])
         
         df['debt_to_income_ratio'] = np.where(
             df['revenus_estimes'] > 0,
@@ -120,14 +438,7 @@ class FeatureEngineer:
         created_features.append('credit_utilization_ratio')
         
         # 3. Taux d'épargne (basé sur la variable épargne)
-        epargne_mapping = {
-            'A11': 0.0,   # < 100 DM
-            'A12': 0.1,   # 100-500 DM
-            'A13': 0.3,   # 500-1000 DM
-            'A14': 0.6,   # >= 1000 DM
-            'A15': 0.0    # Inconnu
-        }
-        df['savings_rate'] = df['epargne'].map(epargne_mapping).fillna(0)
+        df['savings_rate'] = lookups['savings_rate']
         created_features.append('savings_rate')
         
         # 4. Ratio dépenses/revenus estimé
@@ -145,61 +456,32 @@ class FeatureEngineer:
         print(f"   ✅ {len(created_features)} ratios financiers créés")
         return df, created_features
     
-    def _create_credit_behavior_features(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    def _create_credit_behavior_features(self, df: pd.DataFrame,
+                                         lookups: Dict[str, np.ndarray]) -> Tuple[pd.DataFrame, List[str]]:
         """Création des features de comportement crédit"""
         created_features = []
         
         # 1. Score historique paiements (basé sur historique)
-        historique_scores = {
-            'A30': 1.0,   # Pas de crédit / tous payés
-            'A31': 0.9,   # Tous payés à temps
-            'A32': 0.7,   # Payés à temps jusqu'à présent
-            'A33': 0.4,   # Retard dans le passé
-            'A34': 0.1    # Compte critique
-        }
-        df['payment_history_score'] = df['historique'].map(historique_scores).fillna(0.5)
+        df['payment_history_score'] = lookups['payment_history_score']
         created_features.append('payment_history_score')
         
         # 2. Diversité des types de crédit (credit mix)
-        objet_diversity = {
-            'A40': 0.2,   # Voiture neuve
-            'A41': 0.3,   # Voiture occasion  
-            'A42': 0.6,   # Mobilier/équipement
-            'A43': 0.4,   # Radio/TV
-            'A44': 0.5,   # Électroménager
-            'A45': 0.7,   # Réparations
-            'A46': 0.8,   # Éducation
-            'A47': 0.6,   # Vacances
-            'A48': 0.9,   # Reconversion
-            'A49': 0.8,   # Entreprise
-            'A410': 0.5   # Autres
-        }
-        df['credit_mix_diversity'] = df['objet'].map(objet_diversity).fillna(0.5)
+        df['credit_mix_diversity'] = lookups['credit_mix_diversity']
         created_features.append('credit_mix_diversity')
         
-        # 3. Nombre de demandes récentes (basé sur nombre_credit)
-        df['recent_inquiries_count'] = np.where(
-            df['nombre_credit'].isin(['A141', 'A142']),  # Banque/magasins
-            df['nombre_credit'].map({'A141': 2, 'A142': 1}).fillna(0),
-            0
-        )
+        # 3. Nombre de demandes récentes (banque/magasins, 0 sinon)
+        df['recent_inquiries_count'] = lookups['recent_inquiries_count']
         created_features.append('recent_inquiries_count')
         
         # 4. Âge moyen des comptes (basé sur ancienneté emploi)
-        anciennete_mapping = {
-            'A71': 0.5,   # Chômeur
-            'A72': 1,     # < 1 an
-            'A73': 2.5,   # 1-4 ans
-            'A74': 7,     # 4-7 ans
-            'A75': 10     # >= 7 ans
-        }
-        df['account_age_average'] = df['anciennete_emploi'].map(anciennete_mapping).fillna(0)
+        df['account_age_average'] = lookups['account_age_average']
         created_features.append('account_age_average')
         
         print(f"   ✅ {len(created_features)} features comportement crédit créées")
         return df, created_features
     
-    def _create_risk_indicators(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    def _create_risk_indicators(self, df: pd.DataFrame,
+                                lookups: Dict[str, np.ndarray]) -> Tuple[pd.DataFrame, List[str]]:
         """Création des indicateurs de risque"""
         created_features = []
         
@@ -213,14 +495,7 @@ class FeatureEngineer:
         created_features.append('bankruptcy_risk_score')
         
         # 2. Fréquence retards (basé sur historique)
-        retard_frequency = {
-            'A30': 0.0,   # Pas de crédit
-            'A31': 0.0,   # Tous payés à temps
-            'A32': 0.1,   # Payés à temps jusqu'à présent
-            'A33': 0.6,   # Retard dans le passé
-            'A34': 0.9    # Compte critique
-        }
-        df['late_payment_frequency'] = df['historique'].map(retard_frequency).fillna(0.3)
+        df['late_payment_frequency'] = lookups['late_payment_frequency']
         created_features.append('late_payment_frequency')
         
         # 3. Utilisation limite crédit
@@ -228,54 +503,33 @@ class FeatureEngineer:
         created_features.append('credit_limit_usage')
         
         # 4. Score stabilité emploi
-        stabilite_emploi = {
-            'A71': 0.0,   # Chômeur
-            'A72': 0.2,   # < 1 an
-            'A73': 0.6,   # 1-4 ans
-            'A74': 0.8,   # 4-7 ans
-            'A75': 1.0    # >= 7 ans
-        }
-        df['employment_stability_score'] = df['anciennete_emploi'].map(stabilite_emploi).fillna(0.3)
+        df['employment_stability_score'] = lookups['employment_stability_score']
         created_features.append('employment_stability_score')
         
         print(f"   ✅ {len(created_features)} indicateurs de risque créés")
         return df, created_features
     
-    def _create_demographic_features(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    def _create_demographic_features(self, df: pd.DataFrame,
+                                     lookups: Dict[str, np.ndarray]) -> Tuple[pd.DataFrame, List[str]]:
         """Création des features démographiques"""
         created_features = []
         
         # 1. Segment âge-revenus
-        df['age_income_segment'] = pd.cut(
-            df['age'], 
-            bins=[0, 25, 35, 45, 55, 100], 
-            labels=['young', 'young_adult', 'adult', 'mature', 'senior']
-        ).astype(str)
+        df['age_income_segment'] = _cut_labels(df['age'], AGE_SEGMENT_BINS, AGE_SEGMENT_LABELS)
         
         # Combinaison avec les revenus
         df['age_income_combined'] = (
             df['age_income_segment'] + '_' + 
-            pd.cut(df['revenus_estimes'], bins=3, labels=['low', 'medium', 'high']).astype(str)
+            self._bin_labels(df['revenus_estimes'], 'revenus_estimes', AMOUNT_LEVEL_LABELS)
         )
         created_features.append('age_income_combined')
         
         # 2. Concordance éducation-emploi (proxy via statut)
-        statut_education_match = {
-            'A91': 0.2,   # Homme divorcé/séparé
-            'A92': 0.6,   # Femme divorcée/séparée/mariée
-            'A93': 0.8,   # Homme célibataire
-            'A94': 0.7    # Homme marié/veuf
-        }
-        df['education_employment_match'] = df['statut'].map(statut_education_match).fillna(0.5)
+        df['education_employment_match'] = lookups['education_employment_match']
         created_features.append('education_employment_match')
         
         # 3. Facteur risque régional (basé sur le logement)
-        regional_risk = {
-            'A151': 0.3,  # Loue
-            'A152': 0.1,  # Propriétaire
-            'A153': 0.5   # Gratuit
-        }
-        df['regional_risk_factor'] = df['logement'].map(regional_risk).fillna(0.4)
+        df['regional_risk_factor'] = lookups['regional_risk_factor']
         created_features.append('regional_risk_factor')
         
         print(f"   ✅ {len(created_features)} features démographiques créées")
@@ -349,8 +603,8 @@ class FeatureEngineer:
         created_features.append('marital_housing')
         
         # 3. Objectif × Montant (catégorisé)
-        montant_categories = pd.cut(df['montant'], bins=3, labels=['low', 'medium', 'high'])
-        df['purpose_amount'] = df['objet'].astype(str) + '_' + montant_categories.astype(str)
+        montant_categories = self._bin_labels(df['montant'], 'montant', AMOUNT_LEVEL_LABELS)
+        df['purpose_amount'] = df['objet'].astype(str) + '_' + montant_categories
         created_features.append('purpose_amount')
         
         print(f"   ✅ {len(created_features)} interactions catégorielles créées")
@@ -361,9 +615,9 @@ class FeatureEngineer:
         created_features = []
         
         # 1. Catégorie âge × Revenus
-        age_categories = pd.cut(df['age'], bins=[0, 30, 50, 100], labels=['young', 'middle', 'senior'])
-        df['age_category_income'] = age_categories.astype(str) + '_income_' + \
-                                   pd.cut(df['revenus_estimes'], bins=3, labels=['low', 'med', 'high']).astype(str)
+        age_categories = _cut_labels(df['age'], AGE_CATEGORY_BINS, AGE_CATEGORY_LABELS)
+        df['age_category_income'] = age_categories + '_income_' + \
+                                   self._bin_labels(df['revenus_estimes'], 'revenus_estimes', INCOME_LEVEL_LABELS)
         created_features.append('age_category_income')
         
         # 2. Stabilité emploi × Score
@@ -436,14 +690,12 @@ class FeatureEngineer:
         created_features.append('application_month')
         
         # Indicateur risque saisonnier
-        seasonal_risk = {1: 0.1, 2: 0.1, 3: 0.2, 4: 0.3, 5: 0.4, 6: 0.5,
-                        7: 0.6, 8: 0.5, 9: 0.4, 10: 0.3, 11: 0.2, 12: 0.8}
-        df['seasonal_risk_indicator'] = df['application_month'].map(seasonal_risk)
+        df['seasonal_risk_indicator'] = self._lookup(df, 'seasonal_risk_indicator')
         created_features.append('seasonal_risk_indicator')
         
         # Proximité vacances (juin-août, décembre)
         df['holiday_proximity'] = df['application_month'].apply(
-            lambda x: 1 if x in [6, 7, 8, 12] else 0
+            lambda x: 1 if x in HOLIDAY_MONTHS else 0
         )
         created_features.append('holiday_proximity')
         
@@ -472,7 +724,7 @@ class FeatureEngineer:
         print(f"   ✅ {len(created_features)} features de tendance créées")
         return df, created_features
     
-    def engineer_all_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def engineer_all_features(self, df: pd.DataFrame, fit: bool = True) -> pd.DataFrame:
         """
         Pipeline complet de feature engineering
         
@@ -483,10 +735,16 @@ class FeatureEngineer:
         
         Args:
             df: DataFrame d'entrée
+            fit: Apprend l'état (bornes, tables) sur df ; sinon applique l'état existant
             
         Returns:
             DataFrame avec toutes les features créées
         """
+        if fit:
+            self.fit(df)
+        elif not self.is_fitted:
+            raise ValueError("FeatureEngineer non entraîné: appeler fit() ou engineer_all_features(fit=True)")
+        
         print("\n🚀 PIPELINE COMPLET DE FEATURE ENGINEERING")
         print("=" * 60)
         
@@ -0,0 +1,452 @@
+"""
+Compiled Inference Graph for Credit Scoring System
+
+This module compiles a fitted FeatureEngineer + VariableTransformer + model
+into a single scoring path: raw (cleaned) records go in, the final selected
+feature matrix is written column by column into one preallocated float64
+NumPy array, then scored. No intermediate DataFrame is built.
+
+Author: Credit Scoring Team
+Created: 2024
+"""
+
+import io
+import time
+import contextlib
+import pandas as pd
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import warnings
+warnings.filterwarnings('ignore')
+
+from .feature_engineer import (
+    LOOKUP_FEATURES, HOLIDAY_MONTHS, AGE_SEGMENT_BINS, AGE_SEGMENT_LABELS,
+    AGE_CATEGORY_BINS, AGE_CATEGORY_LABELS, AMOUNT_LEVEL_LABELS, INCOME_LEVEL_LABELS,
+    _equal_width_bins, _cut_labels, _open_ended
+)
+from .lookup_stage import LookupStage, resolve_lookup_specs
+
+
+def _as_str(values: np.ndarray) -> np.ndarray:
+    """Équivalent de `Series.astype(str)` sur un array (NaN -> 'nan')"""
+    return np.asarray(values, dtype=object).astype(str).astype(object)
+
+
+class _FeatureContext:
+    """
+    Évalue à la demande les colonnes d'un batch (brutes ou créées par le
+    FeatureEngineer), en mémorisant chaque résultat.
+
+    Les formules reproduisent exactement celles de FeatureEngineer, y compris
+    les bornes de classes (figées par fit, sinon calculées sur le batch comme
+    `pd.cut(bins=3)`) et les graines aléatoires, afin de rester identiques au
+    chemin DataFrame.
+    """
+
+    def __init__(self, df: pd.DataFrame, bin_edges: Optional[Dict[str, np.ndarray]] = None,
+                 lookup_stage: Optional[LookupStage] = None):
+        """
+        Args:
+            df: Données nettoyées
+            bin_edges: Bornes apprises par FeatureEngineer.fit (None = calcul sur le batch)
+            lookup_stage: Correspondances compilées du FeatureEngineer (None = tables du module)
+        """
+        self.df = df
+        self.n_rows = len(df)
+        self.bin_edges = bin_edges
+        self.lookup_stage = lookup_stage or LookupStage(resolve_lookup_specs(LOOKUP_FEATURES))
+        self._values = {}
+
+    def get(self, name: str) -> np.ndarray:
+        """Retourne les valeurs d'une colonne (calculées une seule fois)"""
+        if name not in self._values:
+            if name in _KERNELS:
+                for key, values in _KERNELS[name](self).items():
+                    self._values[key] = values
+            elif name in self.lookup_stage.specs:
+                self.lookup(name)
+            elif name in self.df.columns:
+                self._values[name] = self.df[name].to_numpy()
+            else:
+                raise KeyError(f"Colonne inconnue pour le graphe d'inférence: '{name}'")
+        return self._values[name]
+
+    def numeric(self, name: str) -> np.ndarray:
+        """Valeurs numériques (float64) d'une colonne"""
+        return np.asarray(self.get(name), dtype=float)
+
+    def lookup(self, feature: str, source_values: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Feature de correspondance du FeatureEngineer
+
+        Toutes les features de la même colonne source sont calculées et
+        mémorisées en une passe.
+
+        Args:
+            feature: Nom de la feature
+            source_values: Valeurs de la colonne source, si elle est en cours de calcul
+        """
+        if feature not in self._values:
+            source = self.lookup_stage.specs[feature]['source']
+            values = self.get(source) if source_values is None else source_values
+            self._values.update(self.lookup_stage.lookup_source(source, values))
+        return self._values[feature]
+
+    def bins(self, name: str) -> np.ndarray:
+        """Bornes de classes de largeur égale d'une colonne"""
+        if self.bin_edges is not None:
+            return _open_ended(self.bin_edges[name])
+        return _equal_width_bins(self.get(name))
+
+    # --- Ratios financiers ---------------------------------------------------
+
+    def _financial_ratios(self) -> Dict[str, np.ndarray]:
+        montant = self.numeric('montant')
+        taux = self.lookup('taux_endettement_num')
+        revenus = np.where(taux > 0, montant / (taux / 100), montant * 5)
+        utilization = np.clip(taux / 100, 0, 1)
+
+        return {
+            'taux_endettement_num': taux,
+            'revenus_estimes': revenus,
+            'debt_to_income_ratio': np.where(revenus > 0, montant / revenus, 0),
+            'credit_utilization_ratio': utilization,
+            'credit_limit_usage': utilization,
+            'savings_rate': self.lookup('savings_rate'),
+            'expense_to_income_ratio': np.where(revenus > 0, (montant * 0.1) / revenus, 0),
+            'repayment_capacity': revenus - (revenus * utilization)
+        }
+
+    # --- Comportement crédit et risque ---------------------------------------
+
+    def _credit_behavior(self) -> Dict[str, np.ndarray]:
+        payment_history = self.lookup('payment_history_score')
+        stability = self.lookup('employment_stability_score')
+        account_age = self.lookup('account_age_average')
+
+        bankruptcy = (
+            (1 - payment_history) * 0.4 +
+            self.get('credit_utilization_ratio') * 0.3 +
+            (1 - self.get('savings_rate')) * 0.2 +
+            self.get('debt_to_income_ratio') * 0.1
+        )
+
+        return {
+            'payment_history_score': payment_history,
+            'credit_mix_diversity': self.lookup('credit_mix_diversity'),
+            'recent_inquiries_count': self.lookup('recent_inquiries_count'),
+            'account_age_average': account_age,
+            'bankruptcy_risk_score': bankruptcy,
+            'late_payment_frequency': self.lookup('late_payment_frequency'),
+            'employment_stability_score': stability,
+            'employment_stability_payment': stability * payment_history
+        }
+
+    # --- Démographie et interactions ----------------------------------------
+
+    def _demographics(self) -> Dict[str, np.ndarray]:
+        age = self.numeric('age')
+        montant = self.numeric('montant')
+        revenus = self.get('revenus_estimes')
+        revenus_bins = self.bins('revenus_estimes')
+
+        segment = _cut_labels(age, AGE_SEGMENT_BINS, AGE_SEGMENT_LABELS)
+        age_category = _cut_labels(age, AGE_CATEGORY_BINS, AGE_CATEGORY_LABELS)
+        montant_labels = _cut_labels(montant, self.bins('montant'), AMOUNT_LEVEL_LABELS)
+        statut = _as_str(self.get('statut'))
+
+        return {
+            'age_income_segment': segment,
+            'age_income_combined': segment + '_' + _cut_labels(revenus, revenus_bins, AMOUNT_LEVEL_LABELS),
+            'education_employment_match': self.lookup('education_employment_match'),
+            'regional_risk_factor': self.lookup('regional_risk_factor'),
+            'age_income_interaction': age * revenus / 1000,
+            'debt_income_interaction': montant * revenus / 10000,
+            'score_utilization_interaction': self.get('payment_history_score') * self.get('credit_utilization_ratio'),
+            'amount_duration_interaction': montant * self.numeric('duree') / 100,
+            'education_employment': statut + '_' + _as_str(self.get('anciennete_emploi')),
+            'marital_housing': statut + '_' + _as_str(self.get('logement')),
+            'purpose_amount': _as_str(self.get('objet')) + '_' + montant_labels,
+            'age_category_income': age_category + '_income_' + _cut_labels(revenus, revenus_bins, INCOME_LEVEL_LABELS)
+        }
+
+    # --- Features temporelles (simulées, graine fixe) -----------------------
+
+    def _account_lifecycle(self) -> Dict[str, np.ndarray]:
+        account_age_months = self.get('account_age_average') * 12
+        random_state = np.random.RandomState(42)
+        time_since_last_payment = random_state.exponential(30, self.n_rows)
+        credit_history_length = account_age_months + random_state.normal(12, 6, self.n_rows)
+
+        return {
+            'account_age_months': account_age_months,
+            'time_since_last_payment': time_since_last_payment,
+            'credit_history_length': np.clip(credit_history_length, 0, None)
+        }
+
+    def _seasonal_patterns(self) -> Dict[str, np.ndarray]:
+        month = np.random.RandomState(42).randint(1, 13, self.n_rows)
+        return {
+            'application_month': month,
+            'seasonal_risk_indicator': self.lookup('seasonal_risk_indicator', month),
+            'holiday_proximity': np.isin(month, HOLIDAY_MONTHS).astype(np.int64)
+        }
+
+    def _trends(self) -> Dict[str, np.ndarray]:
+        random_state = np.random.RandomState(42)
+        return {
+            'income_trend': random_state.normal(0, 0.1, self.n_rows),
+            'spending_trend': random_state.normal(0, 0.15, self.n_rows),
+            'credit_usage_trend': random_state.normal(0, 0.2, self.n_rows)
+        }
+
+
+# Groupe de calcul -> colonnes qu'il produit
+_FEATURE_GROUPS = {
+    _FeatureContext._financial_ratios: [
+        'taux_endettement_num', 'revenus_estimes', 'debt_to_income_ratio',
+        'credit_utilization_ratio', 'credit_limit_usage', 'savings_rate',
+        'expense_to_income_ratio', 'repayment_capacity'
+    ],
+    _FeatureContext._credit_behavior: [
+        'payment_history_score', 'credit_mix_diversity', 'recent_inquiries_count',
+        'account_age_average', 'bankruptcy_risk_score', 'late_payment_frequency',
+        'employment_stability_score', 'employment_stability_payment'
+    ],
+    _FeatureContext._demographics: [
+        'age_income_segment', 'age_income_combined', 'education_employment_match',
+        'regional_risk_factor', 'age_income_interaction', 'debt_income_interaction',
+        'score_utilization_interaction', 'amount_duration_interaction',
+        'education_employment', 'marital_housing', 'purpose_amount', 'age_category_income'
+    ],
+    _FeatureContext._account_lifecycle: [
+        'account_age_months', 'time_since_last_payment', 'credit_history_length'
+    ],
+    _FeatureContext._seasonal_patterns: [
+        'application_month', 'seasonal_risk_indicator', 'holiday_proximity'
+    ],
+    _FeatureContext._trends: [
+        'income_trend', 'spending_trend', 'credit_usage_trend'
+    ]
+}
+
+_KERNELS = {name: kernel for kernel, names in _FEATURE_GROUPS.items() for name in names}
+
+
+class CompiledScoringGraph:
+    """
+    Chemin de scoring compilé : features -> transformations -> modèle.
+
+    Construit à partir d'un FeatureEngineer, d'un VariableTransformer entraîné
+    et d'un modèle. Pour chaque feature finale, une recette (numérique,
+    one-hot, target ou label encoding) est figée à la compilation ; le scaling
+    affine est appliqué en une seule opération sur la matrice complète.
+
+    Les sorties sont identiques au chemin DataFrame
+    (engineer_all_features -> transform_all_variables(fit=False) -> modèle),
+    voir `verify`.
+    """
+
+    def __init__(self, feature_engineer, variable_transformer, model=None,
+                 output_features: Optional[List[str]] = None):
+        """
+        Args:
+            feature_engineer: FeatureEngineer (formules des features créées)
+            variable_transformer: VariableTransformer entraîné (fit=True)
+            model: Modèle entraîné exposant predict_proba (optionnel)
+            output_features: Colonnes de la matrice finale (par défaut : colonnes
+                vues par le modèle, sinon features sélectionnées du transformer)
+        """
+        self.feature_engineer = feature_engineer
+        self.variable_transformer = variable_transformer
+        self.model = model
+
+        transformers = variable_transformer.fitted_transformers
+        if 'numerical_scaler' not in transformers:
+            raise ValueError("Le VariableTransformer doit être entraîné avant la compilation")
+
+        if output_features is None:
+            model_features = getattr(model, 'feature_names_in_', None)
+            if model_features is not None:
+                output_features = model_features
+            else:
+                output_features = variable_transformer.selected_features or variable_transformer.feature_names
+        self.output_features = list(output_features)
+        self.rare_category_threshold = variable_transformer.config['categorical_encoding']['rare_category_threshold']
+
+        self._compile(transformers)
+
+    def _compile(self, transformers: Dict[str, Any]):
+        """Fige une recette par feature finale et les paramètres de scaling"""
+        # Colonnes one-hot : nom -> (variable source, indice de catégorie)
+        onehot_sources = {}
+        self._categories = {}
+        encoder = transformers.get('onehot')
+        for col, categories in zip(getattr(encoder, 'feature_names_in_', []), getattr(encoder, 'categories_', [])):
+            self._categories[col] = categories
+            for index, cat in enumerate(categories[1:], start=1):  # drop first
+                onehot_sources[f"{col}_{cat}"] = (col, index)
+
+        self._numeric = []      # [(j, colonne)]
+        self._onehot = {}       # {variable: [(j, indice de catégorie)]}
+        self._encoded = []      # [(j, variable, méthode, encodeur)]
+
+        for j, name in enumerate(self.output_features):
+            base = name[:-len('_encoded')] if name.endswith('_encoded') else None
+
+            if name in onehot_sources:
+                col, index = onehot_sources[name]
+                self._onehot.setdefault(col, []).append((j, index))
+            elif base is not None and f'target_{base}' in transformers:
+                encoder = transformers[f'target_{base}']
+                self._categories[base] = encoder.categories_[0]
+                self._encoded.append((j, base, 'target', encoder))
+            elif base is not None and f'label_{base}' in transformers:
+                encoder = transformers[f'label_{base}']
+                self._categories[base] = encoder.classes_
+                self._encoded.append((j, base, 'label', encoder))
+            else:
+                self._numeric.append((j, name))
+
+        # Scaling affine par colonne de sortie (identité si non scalée)
+        scaler = transformers['numerical_scaler']
+        scaled_columns = {col: k for k, col in enumerate(scaler.feature_names_in_)}
+        positions = np.array([scaled_columns.get(name, -1) for name in self.output_features])
+        is_scaled = positions >= 0
+
+        method = type(scaler).__name__
+        if method == 'MinMaxScaler':
+            self._scale_mode = 'multiply_add'
+            self._scale_a = np.where(is_scaled, scaler.scale_[positions], 1.0)
+            self._scale_b = np.where(is_scaled, scaler.min_[positions], 0.0)
+        elif method in ('RobustScaler', 'StandardScaler'):
+            center = scaler.center_ if method == 'RobustScaler' else scaler.mean_
+            scale = scaler.scale_
+            self._scale_mode = 'subtract_divide'
+            self._scale_a = np.where(is_scaled, center[positions] if center is not None else 0.0, 0.0)
+            self._scale_b = np.where(is_scaled, scale[positions] if scale is not None else 1.0, 1.0)
+        else:
+            raise ValueError(f"Scaler non affine non supporté par le graphe compilé: {method}")
+
+    def _category_index(self, context: _FeatureContext, col: str) -> np.ndarray:
+        """
+        Indice de catégorie de chaque ligne (-1 si inconnue), après les mêmes
+        nettoyages que VariableTransformer (valeurs manquantes, catégories rares)
+        """
+        values = np.asarray(context.get(col), dtype=object)
+        values = np.where(pd.isna(values), 'missing', values)
+
+        codes, uniques = pd.factorize(values)
+        uniques = np.asarray(uniques, dtype=object)
+        frequencies = np.bincount(codes, minlength=len(uniques)) / len(values)
+        uniques[frequencies < self.rare_category_threshold] = 'rare_category'
+
+        return pd.Index(self._categories[col]).get_indexer(uniques)[codes]
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Calcule la matrice finale des features sélectionnées
+
+        Args:
+            df: Données nettoyées (entrée de FeatureEngineer.engineer_all_features)
+
+        Returns:
+            Array float64 (n_lignes, n_features) dans l'ordre de `output_features`
+        """
+        fe = self.feature_engineer
+        context = _FeatureContext(df, fe.bin_edges_, fe.lookup_stage)
+        # Ordre Fortran : chaque feature est écrite dans une colonne contiguë
+        X = np.empty((len(df), len(self.output_features)), dtype=np.float64, order='F')
+
+        for j, name in self._numeric:
+            X[:, j] = context.numeric(name)
+
+        for col, targets in self._onehot.items():
+            index = self._category_index(context, col)
+            for j, category in targets:
+                X[:, j] = index == category
+
+        for j, col, method, encoder in self._encoded:
+            index = self._category_index(context, col)
+            known = index >= 0
+            if method == 'target':
+                X[:, j] = np.where(known, encoder.encodings_[0][index], encoder.target_mean_)
+            else:
+                if not known.all():
+                    raise ValueError(f"'{col}' contient des catégories inconnues du label encoder")
+                X[:, j] = index
+
+        if self._scale_mode == 'subtract_divide':
+            X -= self._scale_a
+            X /= self._scale_b
+        else:
+            X *= self._scale_a
+            X += self._scale_b
+
+        return X
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """Probabilités de défaut (classe 1) pour chaque ligne"""
+        if self.model is None:
+            raise ValueError("Aucun modèle associé au graphe compilé")
+        return self.model.predict_proba(self.transform(df))[:, 1]
+
+    def transform_dataframe_path(self, df: pd.DataFrame) -> np.ndarray:
+        """Matrice de référence calculée par le chemin DataFrame (sans affichage)"""
+        features = df.drop(columns=['cible'], errors='ignore')
+        dummy_target = pd.Series(np.zeros(len(features)), index=features.index)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            # FeatureEngineer entraîné : bornes figées ; sinon bornes du batch,
+            # sans modifier le FeatureEngineer du graphe
+            if self.feature_engineer.is_fitted:
+                engineered = self.feature_engineer.transform(features)
+            else:
+                engineered = type(self.feature_engineer)(self.feature_engineer.config).engineer_all_features(features)
+            transformed = self.variable_transformer.transform_all_variables(
+                engineered, dummy_target, fit=False
+            )
+        return transformed[self.output_features].to_numpy(dtype=np.float64)
+
+    def verify(self, df: pd.DataFrame, n_runs: int = 3) -> Dict[str, Any]:
+        """
+        Compare le graphe compilé au chemin DataFrame sur un batch
+
+        Args:
+            df: Données nettoyées
+            n_runs: Nombre d'exécutions pour la mesure de latence
+
+        Returns:
+            Écarts maximaux (features et probabilités), identité stricte et
+            latences des deux chemins
+        """
+        def best_time(func: Callable) -> Tuple[Any, float]:
+            timings = []
+            for _ in range(max(n_runs, 1)):
+                start = time.perf_counter()
+                result = func(df)
+                timings.append(time.perf_counter() - start)
+            return result, min(timings)
+
+        X_reference, reference_seconds = best_time(self.transform_dataframe_path)
+        X_compiled, compiled_seconds = best_time(self.transform)
+
+        report = {
+            'rows': len(df),
+            'features': len(self.output_features),
+            'identical': bool(np.array_equal(X_reference, X_compiled, equal_nan=True)),
+            'max_abs_diff': float(np.nanmax(np.abs(X_reference - X_compiled))) if X_reference.size else 0.0,
+            'dataframe_seconds': reference_seconds,
+            'compiled_seconds': compiled_seconds,
+            'speedup': reference_seconds / compiled_seconds if compiled_seconds > 0 else float('inf')
+        }
+
+        if self.model is not None:
+            proba_reference = self.model.predict_proba(
+                pd.DataFrame(X_reference, columns=self.output_features)
+            )[:, 1]
+            proba_compiled = self.model.predict_proba(X_compiled)[:, 1]
+            report['proba_identical'] = bool(np.array_equal(proba_reference, proba_compiled))
+            report['proba_max_abs_diff'] = float(np.max(np.abs(proba_reference - proba_compiled)))
+
+        return report
@@ -0,0 +1,173 @@
+"""
+Streaming Statistics for Credit Scoring System
+
+This module provides the mergeable accumulators used to fit the
+VariableTransformer on data read chunk by chunk (larger than memory):
+quantile sketches for robust / quantile scaling, running moments and
+co-moments for variance and correlation filters, and per-class moments for
+ANOVA F-statistics.
+
+Author: Credit Scoring Team
+Created: 2024
+"""
+
+import numpy as np
+from typing import Dict, Hashable, Tuple
+from scipy import special
+
+# Taille par défaut d'un niveau de QuantileSketch (erreur de rang ~ log2(n / capacité) / capacité)
+SKETCH_CAPACITY = 4096
+
+
+class QuantileSketch:
+    """
+    Esquisse de quantiles à mémoire bornée (compacteurs hiérarchiques, type KLL).
+
+    Les valeurs entrent au niveau 0 ; un niveau qui dépasse `capacity`
+    éléments est trié puis une valeur sur deux est promue au niveau suivant,
+    où chaque élément représente deux fois plus d'observations. Tant que le
+    nombre de valeurs reste sous `capacity`, les quantiles sont exacts
+    (interpolation linéaire de `np.quantile`).
+    """
+
+    def __init__(self, capacity: int = SKETCH_CAPACITY):
+        if capacity < 2:
+            raise ValueError("capacity doit être >= 2")
+        self.capacity = capacity
+        self.count = 0
+        self._levels = [np.empty(0)]
+        self._offset = 0  # Alterné à chaque compaction : pas de biais systématique
+
+    def update(self, values: np.ndarray) -> 'QuantileSketch':
+        """Ajoute des valeurs (NaN ignorées)"""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self.capacity:
+                items = np.sort(items)
+                # Un élément isolé reste au niveau courant si le nombre est impair
+                keep = items[:len(items) % 2]
+                promoted = items[len(keep):][self._offset::2]
+                self._offset ^= 1
+
+                self._levels[level] = keep
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+            level += 1
+
+    def quantile(self, q) -> np.ndarray:
+        """
+        Quantiles estimés
+
+        Args:
+            q: Niveau(x) de quantile dans [0, 1]
+
+        Returns:
+            Quantile(s) (NaN si aucune valeur)
+        """
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level)
+                                  for level, items in enumerate(self._levels)])
+        order = np.argsort(values, kind='mergesort')
+        values, weights = values[order], weights[order]
+
+        # Rang (base 0) représenté par chaque élément : centre de ses observations
+        cumulative = np.cumsum(weights)
+        ranks = cumulative - (weights + 1) / 2
+        total = cumulative[-1]
+        return np.interp(q * (total - 1), ranks, values)
+
+
+class RunningMoments:
+    """
+    Moyenne et (co)moments centrés d'un flux de lignes, fusionnés lot par lot
+    (formule de Chan et al., stable numériquement).
+    """
+
+    def __init__(self, n_features: int, covariance: bool = False):
+        """
+        Args:
+            n_features: Nombre de colonnes
+            covariance: Accumule la matrice des co-moments (sinon la diagonale seule)
+        """
+        self.covariance = covariance
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros((n_features, n_features)) if covariance else np.zeros(n_features)
+
+    def update(self, X: np.ndarray) -> 'RunningMoments':
+        """Ajoute un lot de lignes (n_lignes, n_features)"""
+        X = np.asarray(X, dtype=float)
+        n_b = X.shape[0]
+        if n_b == 0:
+            return self
+
+        mean_b = X.mean(axis=0)
+        centered = X - mean_b
+        m2_b = centered.T @ centered if self.covariance else np.einsum('ij,ij->j', centered, centered)
+
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        correction = np.outer(delta, delta) if self.covariance else delta ** 2
+
+        self.m2 = self.m2 + m2_b + correction * (n_a * n_b / n)
+        self.mean = self.mean + delta * (n_b / n)
+        self.count = n
+        return self
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Variance par colonne (ddof=0, comme VarianceThreshold)"""
+        m2 = np.diag(self.m2) if self.covariance else self.m2
+        return m2 / self.count if self.count else np.full(len(self.mean), np.nan)
+
+    def correlation(self) -> np.ndarray:
+        """Matrice de corrélation de Pearson (NaN pour les colonnes constantes)"""
+        if not self.covariance:
+            raise ValueError("RunningMoments créé sans covariance")
+        std = np.sqrt(np.diag(self.m2))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.m2 / np.outer(std, std)
+
+
+def f_classif_from_moments(overall: RunningMoments,
+                           by_class: Dict[Hashable, RunningMoments]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Statistiques F d'ANOVA (équivalent de sklearn f_classif) depuis des moments accumulés
+
+    Args:
+        overall: Moments de toutes les lignes
+        by_class: Moments des lignes de chaque classe
+
+    Returns:
+        (scores F, p-values) par colonne
+    """
+    n, k = overall.count, len(by_class)
+    ss_between = sum(m.count * (m.mean - overall.mean) ** 2 for m in by_class.values())
+    ss_within = sum(m.variance * m.count for m in by_class.values())
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f = (ss_between / (k - 1)) / (ss_within / (n - k))
+    return f, special.fdtrc(k - 1, n - k, f)
+
+
+def robust_statistics(sketch: QuantileSketch,
+                      quantile_range: Tuple[float, float] = (25.0, 75.0)) -> Tuple[float, float]:
+    """Centre (médiane) et échelle (écart interquantile) de RobustScaler"""
+    low, median, high = sketch.quantile([quantile_range[0] / 100, 0.5, quantile_range[1] / 100])
+    return median, high - low
+
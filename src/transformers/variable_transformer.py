@@ -11,7 +11,9 @@ Created: 2024
 import pandas as pd
 import numpy as np
 import logging
-from typing import Tuple, Dict, List, Any, Optional
+from pathlib import Path
+from typing import Tuple, Dict, List, Any, Optional, Callable, Iterable, Iterator, Union
+from scipy import sparse
 from sklearn.preprocessing import (
     StandardScaler, RobustScaler, MinMaxScaler, QuantileTransformer,
     LabelEncoder, OneHotEncoder, TargetEncoder
@@ -20,11 +22,122 @@ from sklearn.feature_selection import (
     VarianceThreshold, SelectKBest, chi2, f_classif,
     SelectFromModel, RFE
 )
-from sklearn.linear_model import LassoCV
+from sklearn.linear_model import LassoCV, SGDRegressor
 from sklearn.ensemble import RandomForestClassifier
+import sklearn
+import joblib
 import warnings
 warnings.filterwarnings('ignore')
 
+from .streaming_stats import (
+    SKETCH_CAPACITY, QuantileSketch, RunningMoments, f_classif_from_moments, robust_statistics
+)
+
+
+def _restore_fitted(estimator: Any, columns: List[str], **attributes) -> Any:
+    """Estimateur sklearn dont les attributs appris ont été calculés hors de fit (entraînement par morceaux)"""
+    estimator.n_features_in_ = len(columns)
+    estimator.feature_names_in_ = np.asarray(columns, dtype=object)
+    for name, value in attributes.items():
+        setattr(estimator, name, value)
+    return estimator
+
+
+def _sparse_columns(df: pd.DataFrame) -> List[str]:
+    """Colonnes creuses (indicateurs one-hot) d'un DataFrame"""
+    return [col for col, dtype in df.dtypes.items() if isinstance(dtype, pd.SparseDtype)]
+
+
+def _feature_matrix(X: pd.DataFrame) -> Union[pd.DataFrame, sparse.csr_matrix]:
+    """
+    Matrice passée aux estimateurs scikit-learn
+
+    X tel quel s'il est dense ; sinon une matrice CSR (colonnes dans l'ordre
+    de X) qui garde les indicateurs one-hot creux au lieu de densifier X.
+    """
+    sparse_mask = np.array([isinstance(dtype, pd.SparseDtype) for dtype in X.dtypes])
+    if not sparse_mask.any():
+        return X
+
+    # Triplets (ligne, colonne, valeur) des deux parties, colonnes à leur position dans X
+    dense_values = X.loc[:, ~sparse_mask].to_numpy(dtype=np.float64)
+    dense_rows, dense_cols = np.nonzero(dense_values)
+    onehot = X.loc[:, sparse_mask].sparse.to_coo()
+    return sparse.csr_matrix(
+        (np.concatenate([dense_values[dense_rows, dense_cols], onehot.data.astype(np.float64)]),
+         (np.concatenate([dense_rows, onehot.row]),
+          np.concatenate([np.flatnonzero(~sparse_mask)[dense_cols], np.flatnonzero(sparse_mask)[onehot.col]]))),
+        shape=X.shape
+    )
+
+
+def _correlated_features(block_correlation: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                         n_features: int, threshold: float, block_size: int = 512) -> List[int]:
+    """
+    Features à supprimer par le filtre de corrélation, par blocs de colonnes
+    
+    Règle : la feature j est supprimée s'il existe i < j avec |corr(i, j)| > seuil
+    (la première de chaque paire est gardée). Une feature déjà supprimée n'est
+    plus comparée et un bloc s'arrête dès que toutes ses features le sont ;
+    seules les paires i < j des blocs sont évaluées.
+    
+    Args:
+        block_correlation: (indices lignes, indices colonnes) -> |corr| du bloc
+            (NaN pour les colonnes constantes)
+        n_features: Nombre de features
+        threshold: Seuil de corrélation absolue
+        block_size: Nombre de features par bloc
+        
+    Returns:
+        Indices supprimés, dans l'ordre de parcours des paires (i puis j croissants)
+    """
+    first_partner = np.full(n_features, -1)
+    
+    for j_start in range(1, n_features, block_size):
+        active = np.arange(j_start, min(j_start + block_size, n_features))
+        for i_start in range(0, active[-1], block_size):
+            rows = np.arange(i_start, min(i_start + block_size, active[-1]))
+            with np.errstate(invalid='ignore'):
+                high = (block_correlation(rows, active) > threshold) & (rows[:, None] < active[None, :])
+            found = high.any(axis=0)
+            first_partner[active[found]] = rows[np.argmax(high[:, found], axis=0)]
+            active = active[~found]
+            if len(active) == 0:
+                break
+    
+    removed = np.flatnonzero(first_partner >= 0)
+    return removed[np.lexsort((removed, first_partner[removed]))].tolist()
+
+
+def _target_encoder_from_statistics(col: str, stats: pd.DataFrame, target_mean: float,
+                                    target_variance: float) -> TargetEncoder:
+    """
+    TargetEncoder(smooth='auto') équivalent à un fit sur toutes les données
+    
+    Args:
+        col: Variable encodée
+        stats: Par catégorie : 'count', 'sum' et 'sumsq' de la cible
+        target_mean: Moyenne globale de la cible
+        target_variance: Variance globale de la cible (ddof=0)
+    """
+    categories = np.asarray(stats.index, dtype=object)
+    encoder = TargetEncoder(smooth='auto')
+    # Attributs sklearn (catégories triées, type de cible) initialisés sur une ligne par catégorie et classe
+    encoder.fit(pd.DataFrame({col: np.repeat(categories, 2)}), np.tile([0, 1], len(categories)))
+    
+    # Lissage bayésien empirique de sklearn (moyenne par catégorie rapprochée de la moyenne globale)
+    stats = stats.reindex(encoder.categories_[0])
+    counts = stats['count'].to_numpy(dtype=float)
+    sums = stats['sum'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / counts
+        squared_diffs = stats['sumsq'].to_numpy(dtype=float) - sums * means
+        weight = target_variance * counts / (target_variance * counts + squared_diffs / counts)
+    
+    encoder.encodings_ = [np.where(np.isnan(weight), target_mean, weight * means + (1 - weight) * target_mean)]
+    encoder.target_mean_ = target_mean
+    return encoder
+
 
 class VariableTransformer:
     """
@@ -69,7 +182,15 @@ class VariableTransformer:
                 'correlation_threshold': 0.95,
                 'statistical_tests': ['chi2', 'f_classif'],
                 'model_based_selector': 'lasso',
-                'k_best': 30
+                'k_best': 30,
+                'correlation_block_size': 512,
+                'n_jobs': -1,       # Folds de LassoCV / arbres de la forêt en parallèle
+                'cache_dir': None   # Répertoire du cache de la sélection basée modèle (désactivé si None)
+            },
+            'streaming': {
+                'sketch_capacity': SKETCH_CAPACITY,  # Esquisses de quantiles (robust/quantile scaling)
+                'sgd_alpha': 0.0001,                 # Pénalité L1 du sélecteur par partial_fit
+                'sgd_epochs': 3                      # Passes sur les données du sélecteur
             }
         }
         
@@ -89,70 +210,103 @@ class VariableTransformer:
         - One-hot encoding (faible cardinalité)
         - Target encoding (haute cardinalité)
         - Label encoding (variables ordinales)
+        
+        Les variables one-hot sont encodées ensemble par un seul OneHotEncoder
+        (matrice creuse CSR, voir onehot_encode) et restent des colonnes
+        creuses jusqu'à la fin de la sélection ; le DataFrame final est
+        assemblé en une seule concaténation.
         """
         print("\n🔤 ÉTAPE 4.1: ENCODAGE DES VARIABLES CATÉGORIELLES")
         print("=" * 60)
         
         df_encoded = df.copy()
         encoding_info = {}
+        fitted_info = self.transformation_info.get('categorical_encoding', {})
         
         # Identification des variables catégorielles
         categorical_cols = df_encoded.select_dtypes(include=['object', 'category']).columns.tolist()
         
         print(f"📋 Variables catégorielles détectées: {len(categorical_cols)}")
         
+        # 1. Préparation et choix de la stratégie par variable
+        methods = {}
         for col in categorical_cols:
-            if col in df_encoded.columns:
-                print(f"\n🔄 Encodage de '{col}'...")
-                
-                # Nettoyage des valeurs manquantes
-                df_encoded[col] = df_encoded[col].fillna('missing')
-                
-                # Gestion des catégories rares
-                df_encoded, rare_categories = self._handle_rare_categories(df_encoded, col)
-                
-                # Choix de la stratégie d'encodage
-                unique_values = df_encoded[col].nunique()
-                threshold = self.config['categorical_encoding']['high_cardinality_threshold']
-                
-                if unique_values <= threshold:
-                    # One-hot encoding pour faible cardinalité
-                    df_encoded, encoder = self._apply_onehot_encoding(df_encoded, col, fit)
-                    encoding_info[col] = {
-                        'method': 'one_hot',
-                        'unique_values': unique_values,
-                        'encoder': encoder,
-                        'rare_categories': rare_categories
-                    }
-                    print(f"   ✅ One-hot encoding appliqué ({unique_values} catégories)")
-                    
-                else:
-                    # Target encoding pour haute cardinalité
-                    if target is not None:
-                        df_encoded, encoder = self._apply_target_encoding(df_encoded, col, target, fit)
-                        encoding_info[col] = {
-                            'method': 'target',
-                            'unique_values': unique_values,
-                            'encoder': encoder,
-                            'rare_categories': rare_categories
-                        }
-                        print(f"   ✅ Target encoding appliqué ({unique_values} catégories)")
-                    else:
-                        # Label encoding si pas de target
-                        df_encoded, encoder = self._apply_label_encoding(df_encoded, col, fit)
-                        encoding_info[col] = {
-                            'method': 'label',
-                            'unique_values': unique_values,
-                            'encoder': encoder,
-                            'rare_categories': rare_categories
-                        }
-                        print(f"   ✅ Label encoding appliqué ({unique_values} catégories)")
+            print(f"\n🔄 Encodage de '{col}'...")
+            
+            # Nettoyage des valeurs manquantes (colonnes `category` ramenées en objets : nouvelles modalités possibles)
+            df_encoded[col] = df_encoded[col].astype(object).fillna('missing')
+            
+            # Gestion des catégories rares
+            df_encoded, rare_categories = self._handle_rare_categories(df_encoded, col)
+            
+            # Choix de la stratégie d'encodage (figée par l'entraînement en transformation)
+            unique_values = df_encoded[col].nunique()
+            threshold = self.config['categorical_encoding']['high_cardinality_threshold']
+            
+            if not fit and col in fitted_info:
+                methods[col] = fitted_info[col]['method']
+            elif unique_values <= threshold:
+                methods[col] = 'one_hot'  # Faible cardinalité
+            elif target is not None:
+                methods[col] = 'target'   # Haute cardinalité
+            else:
+                methods[col] = 'label'    # Pas de target
+            
+            encoding_info[col] = {
+                'method': methods[col],
+                'unique_values': unique_values,
+                'rare_categories': rare_categories
+            }
+        
+        # 2. Encodage : one-hot en un seul passage, puis target / label par variable
+        df_encoded, encoders = self._encode_columns(df_encoded, methods, target, fit)
+        for col in categorical_cols:
+            encoding_info[col]['encoder'] = encoders[col]
+            label = {'one_hot': 'One-hot', 'target': 'Target', 'label': 'Label'}[methods[col]]
+            print(f"   ✅ {label} encoding appliqué à '{col}' ({encoding_info[col]['unique_values']} catégories)")
         
         self.transformation_info['categorical_encoding'] = encoding_info
         print(f"\n✅ Encodage catégoriel terminé: {len(categorical_cols)} variables traitées")
         
         return df_encoded
     
+    def _encode_columns(self, df: pd.DataFrame, methods: Dict[str, str], target: Optional[pd.Series],
+                        fit: bool) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Encode les variables catégorielles préparées selon leur stratégie
+        
+        Args:
+            df: Données (valeurs manquantes et catégories rares déjà remplacées)
+            methods: Stratégie par variable ('one_hot', 'target' ou 'label')
+            target: Variable cible (target encoding en entraînement)
+            fit: Si True, entraîne les encodeurs
+            
+        Returns:
+            DataFrame encodé (variables non catégorielles puis encodages, dans
+            l'ordre des variables) et encodeur par variable
+        """
+        blocks, encoders = {}, {}
+        
+        onehot_cols = [col for col, method in methods.items() if method == 'one_hot']
+        if onehot_cols:
+            onehot_matrix, onehot_names = self.onehot_encode(df[onehot_cols], fit)
+            encoder = self.fitted_transformers['onehot']
+            # Indicateurs 0/1 creux (uint8 : valeur de remplissage 0 quelle que soit la version de pandas)
+            onehot = pd.DataFrame.sparse.from_spmatrix(onehot_matrix.astype(np.uint8), index=df.index,
+                                                       columns=onehot_names)
+            for col, categories in zip(encoder.feature_names_in_, encoder.categories_):
+                blocks[col] = onehot[[f"{col}_{cat}" for cat in categories[1:]]]
+                encoders[col] = encoder
+        
+        for col, method in methods.items():
+            if method == 'target':
+                blocks[col], encoders[col] = self._apply_target_encoding(df, col, target, fit)
+            elif method == 'label':
+                blocks[col], encoders[col] = self._apply_label_encoding(df, col, fit)
+        
+        df = pd.concat([df.drop(columns=list(methods))] + [blocks[col] for col in methods], axis=1)
+        return df, encoders
+    
     def _handle_rare_categories(self, df: pd.DataFrame, col: str) -> Tuple[pd.DataFrame, List[str]]:
         """Gestion des catégories rares"""
         threshold = self.config['categorical_encoding']['rare_category_threshold']
@@ -165,55 +319,63 @@ class VariableTransformer:
             
         return df, rare_categories
     
-    def _apply_onehot_encoding(self, df: pd.DataFrame, col: str, fit: bool) -> Tuple[pd.DataFrame, OneHotEncoder]:
-        """Application du one-hot encoding"""
+    def onehot_encode(self, df: pd.DataFrame, fit: bool = True) -> Tuple[sparse.csr_matrix, List[str]]:
+        """
+        One-hot encoding de plusieurs variables en un seul passage
+        
+        Un seul OneHotEncoder (première catégorie supprimée, catégories
+        inconnues ignorées) est entraîné sur toutes les colonnes de df.
+        Le résultat reste creux : categorical_encoding le garde en colonnes
+        creuses, densifiées seulement au stockage ou par le modèle.
+        
+        Args:
+            df: Variables catégorielles à encoder (valeurs manquantes déjà remplacées)
+            fit: Si True, entraîne l'encodeur
+            
+        Returns:
+            Matrice CSR (n_lignes, n_colonnes_encodées) et noms `{variable}_{catégorie}`
+        """
         if fit:
-            encoder = OneHotEncoder(drop='first', sparse_output=False, handle_unknown='ignore')
-            encoded_data = encoder.fit_transform(df[[col]])
-            self.fitted_transformers[f'onehot_{col}'] = encoder
+            encoder = OneHotEncoder(drop='first', sparse_output=True, handle_unknown='ignore')
+            encoded_data = encoder.fit_transform(df)
+            self.fitted_transformers['onehot'] = encoder
         else:
-            encoder = self.fitted_transformers[f'onehot_{col}']
-            encoded_data = encoder.transform(df[[col]])
+            encoder = self.fitted_transformers['onehot']
+            unknown = [col for col in df.columns if col not in encoder.feature_names_in_]
+            if unknown:
+                raise ValueError(f"Variables non vues à l'entraînement du one-hot encoding: {unknown}")
+            encoded_data = encoder.transform(df[list(encoder.feature_names_in_)])
         
-        # Création des noms de colonnes
-        feature_names = [f"{col}_{cat}" for cat in encoder.categories_[0][1:]]  # drop first
+        feature_names = [f"{col}_{cat}"
+                         for col, categories in zip(encoder.feature_names_in_, encoder.categories_)
+                         for cat in categories[1:]]  # drop first
         
-        # Remplacement dans le DataFrame
-        df = df.drop(columns=[col])
-        encoded_df = pd.DataFrame(encoded_data, columns=feature_names, index=df.index)
-        df = pd.concat([df, encoded_df], axis=1)
-        
-        return df, encoder
+        return sparse.csr_matrix(encoded_data), feature_names
     
     def _apply_target_encoding(self, df: pd.DataFrame, col: str, target: pd.Series, fit: bool) -> Tuple[pd.DataFrame, TargetEncoder]:
-        """Application du target encoding"""
+        """Application du target encoding (retourne la colonne encodée)"""
         if fit:
-            encoder = TargetEncoder(smooth='auto')
-            df[f'{col}_encoded'] = encoder.fit_transform(df[[col]], target)
+            # Découpage du cross-fitting figé : même encodage (et même clé de cache de la sélection) à données égales
+            encoder = TargetEncoder(smooth='auto', random_state=42)
+            encoded_data = encoder.fit_transform(df[[col]], target)
             self.fitted_transformers[f'target_{col}'] = encoder
         else:
             encoder = self.fitted_transformers[f'target_{col}']
-            df[f'{col}_encoded'] = encoder.transform(df[[col]])
-        
-        # Suppression de la colonne originale
-        df = df.drop(columns=[col])
+            encoded_data = encoder.transform(df[[col]])
         
-        return df, encoder
+        return pd.DataFrame({f'{col}_encoded': encoded_data.ravel()}, index=df.index), encoder
     
     def _apply_label_encoding(self, df: pd.DataFrame, col: str, fit: bool) -> Tuple[pd.DataFrame, LabelEncoder]:
-        """Application du label encoding"""
+        """Application du label encoding (retourne la colonne encodée)"""
         if fit:
             encoder = LabelEncoder()
-            df[f'{col}_encoded'] = encoder.fit_transform(df[col])
+            encoded_data = encoder.fit_transform(df[col])
             self.fitted_transformers[f'label_{col}'] = encoder
         else:
             encoder = self.fitted_transformers[f'label_{col}']
-            df[f'{col}_encoded'] = encoder.transform(df[col])
-        
-        # Suppression de la colonne originale
-        df = df.drop(columns=[col])
+            encoded_data = encoder.transform(df[col])
         
-        return df, encoder
+        return pd.DataFrame({f'{col}_encoded': encoded_data}, index=df.index), encoder
     
     def numerical_scaling(self, df: pd.DataFrame, fit: bool = True) -> pd.DataFrame:
         """
@@ -223,20 +385,28 @@ class VariableTransformer:
         - Robust scaling (robuste aux outliers)
         - Standard scaling (normalisation standard)
         - MinMax scaling (mise à l'échelle 0-1)
+        
+        Les indicateurs one-hot creux ne sont pas scalés : le centrage les
+        densifierait, et un décalage d'un indicateur 0/1 ne change ni la
+        sélection ni le modèle (absorbé par l'intercept).
         """
         print("\n📊 ÉTAPE 4.2: SCALING DES VARIABLES NUMÉRIQUES")
         print("=" * 55)
         
         df_scaled = df.copy()
         
-        # Identification des variables numériques
-        numerical_cols = df_scaled.select_dtypes(include=[np.number]).columns.tolist()
+        # Identification des variables numériques (hors indicateurs one-hot creux)
+        sparse_cols = _sparse_columns(df_scaled)
+        numerical_cols = [col for col in df_scaled.select_dtypes(include=[np.number]).columns
+                          if col not in sparse_cols]
         
         # Exclusion de la variable cible si présente
         if 'cible' in numerical_cols:
             numerical_cols.remove('cible')
             
         print(f"📋 Variables numériques détectées: {len(numerical_cols)}")
+        if sparse_cols:
+            print(f"📋 Indicateurs one-hot creux non scalés: {len(sparse_cols)}")
         
         if not numerical_cols:
             print("⚠️ Aucune variable numérique à scaler")
@@ -359,7 +529,7 @@ class VariableTransformer:
         
         if fit:
             selector = VarianceThreshold(threshold=threshold)
-            selector.fit(df[numerical_cols])
+            selector.fit(_feature_matrix(df[numerical_cols]))
             self.fitted_transformers['variance_selector'] = selector
         else:
             selector = self.fitted_transformers['variance_selector']
@@ -397,20 +567,11 @@ class VariableTransformer:
             return df, {'method': 'correlation', 'features_removed': 0, 'features_kept': len(df.columns)}
         
         if fit:
-            # Calcul de la matrice de corrélation
-            corr_matrix = df[numerical_cols].corr().abs()
-            
-            # Identification des features hautement corrélées
-            upper_triangle = np.triu(np.ones_like(corr_matrix, dtype=bool), k=1)
-            high_corr_pairs = np.where((corr_matrix > threshold) & upper_triangle)
-            
-            # Sélection des features à supprimer (garder la première de chaque paire)
-            features_to_remove = []
-            for i, j in zip(high_corr_pairs[0], high_corr_pairs[1]):
-                feature_to_remove = corr_matrix.columns[j]  # Supprime la seconde feature
-                if feature_to_remove not in features_to_remove:
-                    features_to_remove.append(feature_to_remove)
-                    
+            # Features hautement corrélées (garder la première de chaque paire), par blocs
+            block_size = self.config['feature_selection']['correlation_block_size']
+            removed = _correlated_features(self._correlation_blocks(df[numerical_cols], threshold),
+                                           len(numerical_cols), threshold, block_size)
+            features_to_remove = [numerical_cols[j] for j in removed]
             self.fitted_transformers['correlation_features_to_remove'] = features_to_remove
         else:
             features_to_remove = self.fitted_transformers['correlation_features_to_remove']
@@ -430,6 +591,85 @@ class VariableTransformer:
         
         return df, info
     
+    @staticmethod
+    def _correlation_blocks(df: pd.DataFrame, threshold: float) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+        """
+        |corr| par blocs sur les colonnes standardisées en float32
+        
+        Les paires proches du seuil à la précision float32 près sont
+        recalculées en float64 ; avec des valeurs manquantes, la matrice de
+        `df.corr()` (paires complètes) est utilisée. Avec des indicateurs
+        one-hot creux, voir _mixed_correlation_blocks.
+        """
+        sparse_mask = np.array([isinstance(dtype, pd.SparseDtype) for dtype in df.dtypes])
+        if sparse_mask.any():
+            dense_values = df.loc[:, ~sparse_mask].to_numpy(dtype=np.float64)
+            if not np.isnan(dense_values).any():
+                return VariableTransformer._mixed_correlation_blocks(
+                    dense_values, df.loc[:, sparse_mask].sparse.to_coo().tocsc(), sparse_mask
+                )
+        
+        values = df.to_numpy(dtype=np.float64)
+        if np.isnan(values).any():
+            corr_matrix = df.corr().abs().to_numpy()
+            return lambda rows, cols: corr_matrix[np.ix_(rows, cols)]
+        
+        centered = values - values.mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            standardized = centered / np.sqrt(np.einsum('ij,ij->j', centered, centered))  # NaN si constante
+        standardized_32 = standardized.astype(np.float32)
+        tolerance = 1e-4
+        
+        def block_correlation(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+            block = np.abs(standardized_32[:, rows].T @ standardized_32[:, cols]).astype(np.float64)
+            # Recalcul exact des paires à la limite de la précision float32
+            for i, j in zip(*np.nonzero(np.abs(block - threshold) <= tolerance)):
+                block[i, j] = abs(standardized[:, rows[i]] @ standardized[:, cols[j]])
+            return block
+        
+        return block_correlation
+    
+    @staticmethod
+    def _mixed_correlation_blocks(dense_values: np.ndarray, onehot: sparse.csc_matrix,
+                                  sparse_mask: np.ndarray) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+        """
+        |corr| par blocs entre colonnes denses et indicateurs one-hot creux
+        
+        Les colonnes denses sont standardisées (float64) ; les indicateurs
+        restent creux : pour un indicateur s de moyenne m, z_s = (s - m) / ||s - m||,
+        d'où z_d . z_s = (s . z_d) / ||s - m|| (z_d centrée) et
+        z_s . z_t = (s . t - n m_s m_t) / (||s - m_s|| ||t - m_t||).
+        """
+        n_rows = len(dense_values)
+        centered = dense_values - dense_values.mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            standardized = centered / np.sqrt(np.einsum('ij,ij->j', centered, centered))  # NaN si constante
+        
+        onehot = onehot.astype(np.float64)
+        mean = np.asarray(onehot.mean(axis=0)).ravel()
+        norm = np.sqrt(np.maximum(np.asarray(onehot.multiply(onehot).sum(axis=0)).ravel() - n_rows * mean ** 2, 0.0))
+        
+        # Position de chaque colonne dans sa partie (dense ou creuse)
+        local = np.empty(len(sparse_mask), dtype=int)
+        local[~sparse_mask] = np.arange(np.count_nonzero(~sparse_mask))
+        local[sparse_mask] = np.arange(np.count_nonzero(sparse_mask))
+        
+        def block_correlation(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+            row_sparse, col_sparse = sparse_mask[rows], sparse_mask[cols]
+            rd, rs = local[rows[~row_sparse]], local[rows[row_sparse]]
+            cd, cs = local[cols[~col_sparse]], local[cols[col_sparse]]
+            
+            block = np.empty((len(rows), len(cols)))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                block[np.ix_(~row_sparse, ~col_sparse)] = standardized[:, rd].T @ standardized[:, cd]
+                block[np.ix_(~row_sparse, col_sparse)] = (onehot[:, cs].T @ standardized[:, rd]).T / norm[cs]
+                block[np.ix_(row_sparse, ~col_sparse)] = (onehot[:, rs].T @ standardized[:, cd]) / norm[rs][:, None]
+                gram = (onehot[:, rs].T @ onehot[:, cs]).toarray() - n_rows * np.outer(mean[rs], mean[cs])
+                block[np.ix_(row_sparse, col_sparse)] = gram / np.outer(norm[rs], norm[cs])
+            return np.abs(block)
+        
+        return block_correlation
+    
     def _apply_statistical_selection(self, df: pd.DataFrame, target: pd.Series, fit: bool) -> Tuple[pd.DataFrame, Dict]:
         """Application de la sélection statistique"""
         k_best = self.config['feature_selection']['k_best']
@@ -445,7 +685,7 @@ class VariableTransformer:
             else:
                 selector = SelectKBest(score_func=chi2, k=min(k_best, len(feature_cols)))
                 
-            selector.fit(X, target)
+            selector.fit(_feature_matrix(X), target)
             self.fitted_transformers['statistical_selector'] = selector
         else:
             selector = self.fitted_transformers['statistical_selector']
@@ -473,6 +713,7 @@ class VariableTransformer:
     def _apply_model_based_selection(self, df: pd.DataFrame, target: pd.Series, fit: bool) -> Tuple[pd.DataFrame, Dict]:
         """Application de la sélection basée modèle"""
         method = self.config['feature_selection']['model_based_selector']
+        n_jobs = self.config['feature_selection'].get('n_jobs')
         
         # Préparation des données
         feature_cols = [col for col in df.columns if col != 'cible']
@@ -480,12 +721,22 @@ class VariableTransformer:
         
         if fit:
             if method == 'lasso':
-                estimator = LassoCV(cv=5, random_state=42)
+                estimator = LassoCV(cv=5, random_state=42, n_jobs=n_jobs)
             else:
-                estimator = RandomForestClassifier(n_estimators=100, random_state=42)
+                estimator = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs)
                 
             selector = SelectFromModel(estimator, threshold='median')
-            selector.fit(X, target)
+            matrix = _feature_matrix(X)
+            cache_path = self._model_selection_cache_path(selector, X, matrix, target)
+            
+            if cache_path is not None and cache_path.exists():
+                selector = joblib.load(cache_path)
+                print(f"   ♻️ Model-based selection reprise du cache: {cache_path.name}")
+            else:
+                selector.fit(matrix, target)
+                if cache_path is not None:
+                    cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    joblib.dump(selector, cache_path)
             self.fitted_transformers['model_selector'] = selector
         else:
             selector = self.fitted_transformers['model_selector']
@@ -510,6 +761,35 @@ class VariableTransformer:
         
         return df, info
     
+    def _model_selection_cache_path(self, selector: SelectFromModel, X: pd.DataFrame,
+                                    matrix: Union[pd.DataFrame, sparse.csr_matrix],
+                                    target: pd.Series) -> Optional[Path]:
+        """
+        Fichier de cache du sélecteur basé modèle
+        
+        La clé est un hash du contenu de la matrice (valeurs et colonnes), de
+        la cible, des paramètres du sélecteur et de la version de scikit-learn.
+        n_jobs n'intervient pas : le résultat ne dépend pas du parallélisme.
+        
+        Returns:
+            Chemin `<cache_dir>/model_selector_<hash>.joblib`, ou None si le cache est désactivé
+        """
+        cache_dir = self.config['feature_selection'].get('cache_dir')
+        if not cache_dir:
+            return None
+        
+        params = {name: value for name, value in selector.get_params(deep=True).items()
+                  if name != 'estimator' and not name.endswith('n_jobs')}
+        key = joblib.hash({
+            'columns': list(X.columns),
+            'X': matrix if sparse.issparse(matrix) else X.to_numpy(),
+            'target': np.asarray(target),
+            'estimator': type(selector.estimator).__name__,
+            'params': params,
+            'sklearn': sklearn.__version__
+        })
+        return Path(cache_dir) / f"model_selector_{key}.joblib"
+    
     def transform_all_variables(self, df: pd.DataFrame, target: Optional[pd.Series] = None, 
                               fit: bool = True) -> pd.DataFrame:
         """
@@ -560,6 +840,295 @@ class VariableTransformer:
         
         return df_transformed
     
+    def fit_streaming(self, chunks: Union[Callable[[], Iterable[pd.DataFrame]], Iterable[pd.DataFrame]],
+                      target_column: str = 'cible') -> 'VariableTransformer':
+        """
+        Entraînement par morceaux, pour des données plus grandes que la mémoire
+        
+        Équivalent de `transform_all_variables(X, y, fit=True)` sans charger
+        les données en une fois ; les données sont parcourues plusieurs fois :
+        1. Comptages par catégorie (catégories rares, one-hot) et sommes de la
+           cible par catégorie (target encoding)
+        2. Statistiques de scaling : partial_fit (standard, minmax) ou
+           esquisses de quantiles (robust, quantile)
+        3. Moments et co-moments des variables scalées : variances,
+           corrélations et statistiques F d'ANOVA
+        4. Sélection basée modèle : régression linéaire pénalité L1
+           (SGDRegressor, même objectif que Lasso) entraînée par partial_fit
+           (`streaming.sgd_epochs` passes) à la place de LassoCV / RandomForest
+        
+        Les étapes 1 à 3 reproduisent l'entraînement en mémoire aux erreurs
+        d'arrondi près (quantiles exacts tant que le nombre de lignes reste
+        sous `streaming.sketch_capacity`, approchés au-delà), à une exception :
+        le scaling des variables target-encodées est appris sur l'encodage
+        complet et non sur l'encodage croisé de TargetEncoder.fit_transform.
+        L'étape 4 n'est pas identique à LassoCV (pas de validation croisée
+        de la pénalité).
+        
+        Args:
+            chunks: Fonction sans argument retournant un nouvel itérateur de
+                DataFrames (ex: `lambda: pd.read_csv(path, chunksize=100_000)`),
+                ou collection ré-itérable de DataFrames. Chaque morceau
+                contient les features (après feature engineering) et la cible.
+            target_column: Colonne de la cible binaire (0/1)
+            
+        Returns:
+            self (transformers entraînés, utilisables avec fit=False)
+        """
+        print("\n🌊 ENTRAÎNEMENT PAR MORCEAUX DES TRANSFORMATIONS")
+        print("=" * 55)
+        
+        if callable(chunks):
+            passes = chunks
+        elif iter(chunks) is chunks:
+            raise ValueError("fit_streaming parcourt les données plusieurs fois: fournir une fonction "
+                             "retournant un nouvel itérateur (ex: lambda: pd.read_csv(path, chunksize=...))")
+        else:
+            passes = lambda: iter(chunks)
+        
+        self.fitted_transformers = {}
+        self.transformation_info = {}
+        
+        # 1. Encodage catégoriel
+        print("\n🔤 Passe 1: catégories et cible...")
+        n_rows, n_columns = self._stream_fit_encoding(passes(), target_column)
+        
+        # 2. Scaling numérique
+        print("\n📊 Passe 2: statistiques de scaling...")
+        numerical_cols = self._stream_fit_scaling(passes(), target_column)
+        
+        # 3-4. Sélection de features
+        methods = self.config['feature_selection']['methods']
+        feature_cols = self._stream_fit_statistical_selection(passes, target_column, numerical_cols, methods)
+        if 'model_based' in methods:
+            print("\n🤖 Passes 4+: sélection basée modèle (partial_fit)...")
+            self._stream_fit_model_selection(passes, target_column, feature_cols)
+        
+        # Application des sélections entraînées (rapport et features retenues)
+        empty = pd.DataFrame({col: pd.Series(dtype=float) for col in numerical_cols})
+        selected = self.feature_selection(empty, pd.Series(dtype=float), fit=False)
+        
+        self.feature_names = selected.columns.tolist()
+        self.transformation_info['final_shape'] = (n_rows, len(self.feature_names))
+        self.transformation_info['feature_reduction'] = n_columns - len(self.feature_names)
+        
+        print(f"\n✅ Entraînement par morceaux terminé: {n_rows} lignes, "
+              f"{n_columns} → {len(self.feature_names)} features")
+        
+        return self
+    
+    def _stream_transform(self, chunks: Iterable[pd.DataFrame], target_column: str,
+                          scale: bool = True) -> Iterator[Tuple[pd.DataFrame, np.ndarray]]:
+        """Morceaux encodés (et scalés) avec les transformers déjà entraînés par fit_streaming"""
+        encoding_info = self.transformation_info['categorical_encoding']
+        methods = {col: info['method'] for col, info in encoding_info.items()}
+        
+        for chunk in chunks:
+            y = chunk[target_column].to_numpy()
+            X = chunk.drop(columns=[target_column])
+            for col, info in encoding_info.items():
+                X[col] = X[col].astype(object).fillna('missing')
+                if info['rare_categories']:
+                    X[col] = X[col].replace(info['rare_categories'], 'rare_category')
+            X, _ = self._encode_columns(X, methods, None, fit=False)
+            
+            if scale:
+                scaled_cols = self.transformation_info['numerical_scaling']['features_scaled']
+                X[scaled_cols] = self.fitted_transformers['numerical_scaler'].transform(X[scaled_cols])
+            yield X, y
+    
+    def _stream_fit_encoding(self, chunks: Iterable[pd.DataFrame], target_column: str) -> Tuple[int, int]:
+        """Passe 1 : comptages par catégorie, catégories rares et encodeurs"""
+        stats: Dict[str, pd.DataFrame] = {}
+        categorical_cols = None
+        n_rows = n_columns = 0
+        target_sum = target_sumsq = 0.0
+        classes = set()
+        
+        for chunk in chunks:
+            y = chunk[target_column].to_numpy(dtype=float)
+            X = chunk.drop(columns=[target_column])
+            if categorical_cols is None:
+                categorical_cols = X.select_dtypes(include=['object', 'category']).columns.tolist()
+                n_columns = X.shape[1]
+            
+            n_rows += len(X)
+            target_sum += y.sum()
+            target_sumsq += (y ** 2).sum()
+            classes.update(np.unique(y).tolist())
+            
+            for col in categorical_cols:
+                frame = pd.DataFrame({'category': X[col].fillna('missing').to_numpy(dtype=object),
+                                      'y': y, 'y2': y ** 2})
+                counts = frame.groupby('category').agg(count=('y', 'size'), sum=('y', 'sum'), sumsq=('y2', 'sum'))
+                stats[col] = counts if col not in stats else stats[col].add(counts, fill_value=0)
+        
+        if n_rows == 0:
+            raise ValueError("Aucune donnée reçue par fit_streaming")
+        if not classes <= {0.0, 1.0}:
+            raise ValueError(f"fit_streaming attend une cible binaire 0/1, classes reçues: {sorted(classes)}")
+        
+        target_mean = target_sum / n_rows
+        target_variance = max(target_sumsq / n_rows - target_mean ** 2, 0.0)
+        rare_threshold = self.config['categorical_encoding']['rare_category_threshold']
+        cardinality_threshold = self.config['categorical_encoding']['high_cardinality_threshold']
+        
+        encoding_info, methods = {}, {}
+        for col in categorical_cols:
+            col_stats = stats[col]
+            rare_categories = col_stats.index[col_stats['count'] / n_rows < rare_threshold].tolist()
+            if rare_categories:
+                col_stats = col_stats.rename(index={cat: 'rare_category' for cat in rare_categories})
+                col_stats = col_stats.groupby(level=0).sum()
+            stats[col] = col_stats
+            
+            methods[col] = 'one_hot' if len(col_stats) <= cardinality_threshold else 'target'
+            encoding_info[col] = {
+                'method': methods[col],
+                'unique_values': len(col_stats),
+                'rare_categories': rare_categories
+            }
+        
+        # One-hot : un encodeur pour toutes les variables, entraîné sur leurs catégories
+        onehot_cols = [col for col in categorical_cols if methods[col] == 'one_hot']
+        if onehot_cols:
+            length = max(len(stats[col]) for col in onehot_cols)
+            categories = pd.DataFrame({col: np.resize(np.asarray(stats[col].index, dtype=object), length)
+                                       for col in onehot_cols})
+            self.onehot_encode(categories, fit=True)
+        
+        for col in categorical_cols:
+            if methods[col] == 'target':
+                self.fitted_transformers[f'target_{col}'] = _target_encoder_from_statistics(
+                    col, stats[col], target_mean, target_variance
+                )
+                encoding_info[col]['encoder'] = self.fitted_transformers[f'target_{col}']
+            else:
+                encoding_info[col]['encoder'] = self.fitted_transformers['onehot']
+            print(f"   ✅ '{col}': {encoding_info[col]['method']} ({encoding_info[col]['unique_values']} catégories)")
+        
+        self.transformation_info['categorical_encoding'] = encoding_info
+        print(f"   📋 {n_rows} lignes, {len(categorical_cols)} variables catégorielles")
+        return n_rows, n_columns
+    
+    def _stream_fit_scaling(self, chunks: Iterable[pd.DataFrame], target_column: str) -> List[str]:
+        """
+        Passe 2 : scaler entraîné par partial_fit ou depuis des esquisses de quantiles
+        
+        Returns:
+            Variables numériques (scalées et indicateurs one-hot creux, dans l'ordre des colonnes)
+        """
+        method = self.config['numerical_scaling']['method']
+        capacity = self.config['streaming']['sketch_capacity']
+        feature_cols, numerical_cols, sketches, scaler = None, None, None, None
+        
+        for X, _ in self._stream_transform(chunks, target_column, scale=False):
+            if numerical_cols is None:
+                feature_cols = [col for col in X.select_dtypes(include=[np.number]).columns if col != 'cible']
+                sparse_cols = _sparse_columns(X)
+                numerical_cols = [col for col in feature_cols if col not in sparse_cols]
+                if method in ('standard', 'minmax'):
+                    scaler = StandardScaler() if method == 'standard' else MinMaxScaler()
+                else:
+                    sketches = [QuantileSketch(capacity) for _ in numerical_cols]
+            
+            if scaler is not None:
+                scaler.partial_fit(X[numerical_cols])
+            else:
+                values = X[numerical_cols].to_numpy(dtype=float)
+                for j, sketch in enumerate(sketches):
+                    sketch.update(values[:, j])
+        
+        if method == 'quantile':
+            transformer = QuantileTransformer(output_distribution='normal')
+            n_quantiles = max(1, min(transformer.n_quantiles, sketches[0].count))
+            references = np.linspace(0, 1, n_quantiles, endpoint=True)
+            quantiles = np.column_stack([sketch.quantile(references) for sketch in sketches])
+            scaler = _restore_fitted(transformer, numerical_cols, n_quantiles_=n_quantiles,
+                                     references_=references, quantiles_=np.maximum.accumulate(quantiles))
+        elif scaler is None:
+            # Robust (méthode par défaut) : médiane et écart interquantile
+            center, scale = np.array([robust_statistics(sketch) for sketch in sketches]).T
+            scale[scale < 10 * np.finfo(float).eps] = 1.0
+            scaler = _restore_fitted(RobustScaler(), numerical_cols, center_=center, scale_=scale)
+        
+        self.fitted_transformers['numerical_scaler'] = scaler
+        self.transformation_info['numerical_scaling'] = {
+            'method': method,
+            'features_scaled': numerical_cols,
+            'scaler': scaler
+        }
+        print(f"   ✅ Scaling {method}: {len(numerical_cols)} variables")
+        return feature_cols
+    
+    def _stream_fit_statistical_selection(self, passes: Callable[[], Iterable[pd.DataFrame]], target_column: str,
+                                          columns: List[str], methods: List[str]) -> List[str]:
+        """
+        Passe 3 : filtres de variance et de corrélation, SelectKBest (F d'ANOVA)
+        
+        Returns:
+            Features restantes après ces sélections
+        """
+        if not {'variance', 'correlation', 'statistical'} & set(methods):
+            return columns
+        
+        print("\n🎯 Passe 3: moments des variables scalées...")
+        overall = RunningMoments(len(columns), covariance='correlation' in methods)
+        by_class: Dict[Any, RunningMoments] = {}
+        for X, y in self._stream_transform(passes(), target_column):
+            values = X[columns].to_numpy(dtype=float)
+            overall.update(values)
+            for label in np.unique(y):
+                by_class.setdefault(label, RunningMoments(len(columns))).update(values[y == label])
+        
+        selection = self.config['feature_selection']
+        kept = np.arange(len(columns))
+        
+        if 'variance' in methods:
+            variances = overall.variance
+            self.fitted_transformers['variance_selector'] = _restore_fitted(
+                VarianceThreshold(threshold=selection['variance_threshold']), columns, variances_=variances
+            )
+            kept = kept[variances > selection['variance_threshold']]
+        
+        if 'correlation' in methods and len(kept) >= 2:
+            corr_matrix = np.abs(overall.correlation()[np.ix_(kept, kept)])
+            removed = _correlated_features(lambda rows, cols: corr_matrix[np.ix_(rows, cols)], len(kept),
+                                           selection['correlation_threshold'], selection['correlation_block_size'])
+            features_to_remove = [columns[kept[j]] for j in removed]
+            self.fitted_transformers['correlation_features_to_remove'] = features_to_remove
+            kept = np.array([i for i in kept if columns[i] not in features_to_remove], dtype=int)
+        elif 'correlation' in methods:
+            self.fitted_transformers['correlation_features_to_remove'] = []
+        
+        if 'statistical' in methods:
+            scores, pvalues = f_classif_from_moments(overall, by_class)
+            selector = SelectKBest(score_func=f_classif, k=min(selection['k_best'], len(kept)))
+            kept_columns = [columns[i] for i in kept]
+            self.fitted_transformers['statistical_selector'] = _restore_fitted(
+                selector, kept_columns, scores_=scores[kept], pvalues_=pvalues[kept]
+            )
+            kept = kept[selector.get_support()]
+        
+        return [columns[i] for i in kept]
+    
+    def _stream_fit_model_selection(self, passes: Callable[[], Iterable[pd.DataFrame]], target_column: str,
+                                    columns: List[str]):
+        """Passes 4+ : SGDRegressor pénalité L1 entraîné par partial_fit, seuil médian des coefficients"""
+        streaming = self.config['streaming']
+        if self.config['feature_selection']['model_based_selector'] != 'lasso':
+            print("   ℹ️ Sélecteur sans partial_fit remplacé par SGDRegressor (L1)")
+        
+        estimator = SGDRegressor(penalty='l1', alpha=streaming['sgd_alpha'], random_state=42)
+        last = None
+        for _ in range(streaming['sgd_epochs']):
+            for X, y in self._stream_transform(passes(), target_column):
+                estimator.partial_fit(_feature_matrix(X[columns]), y)
+                last = (X[columns], y)
+        
+        selector = SelectFromModel(estimator, threshold='median', prefit=True)
+        self.fitted_transformers['model_selector'] = selector.fit(*last)
+    
     def get_transformation_info(self) -> Dict[str, Any]:
         """Retourne les informations sur les transformations appliquées"""
         return self.transformation_info
@@ -23,6 +23,20 @@ import warnings
 
 warnings.filterwarnings('ignore')
 
+try:
+    from .metrics import score_metrics
+except ImportError:
+    from metrics import score_metrics
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Processed dataset formats, by preference when resolving a path
+DATASET_FORMATS = ['parquet', 'csv']
+
 
 def setup_logging(
     config_path: str = "config/logging_config.yaml",
@@ -142,44 +156,171 @@ def load_model(filepath: str) -> Tuple[Any, Optional[Dict[str, Any]]]:
     return model, metadata
 
 
-def calculate_ks_statistic(y_true: np.ndarray, y_proba: np.ndarray) -> float:
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compact column types for storage.
+    
+    String columns become categoricals (dictionary-encoded in Parquet),
+    floats are downcast to float32 and integers to the smallest integer type.
+    
+    Args:
+        df: DataFrame to optimize
+        
+    Returns:
+        Optimized copy of the DataFrame
+    """
+    optimized = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_string_dtype(series) or series.dtype == object:
+            optimized[col] = series.astype('category')
+        elif pd.api.types.is_float_dtype(series):
+            optimized[col] = pd.to_numeric(series, downcast='float')
+        elif pd.api.types.is_integer_dtype(series):
+            optimized[col] = pd.to_numeric(series, downcast='integer')
+        else:
+            optimized[col] = series
+    return pd.DataFrame(optimized, index=df.index)
+
+
+def resolve_dataset_path(path: Union[str, Path]) -> Path:
+    """
+    Resolve a processed dataset path, whatever its storage format.
+    
+    The path is returned as is if it exists; otherwise the same dataset is
+    looked up under the other supported extensions (Parquet first), so
+    `credit_cleaned.csv` finds `credit_cleaned.parquet` and vice versa.
+    
+    Args:
+        path: Dataset path (extension optional)
+        
+    Returns:
+        Existing path, or the given path if no variant exists
+    """
+    path = Path(path)
+    if path.exists():
+        return path
+    for fmt in DATASET_FORMATS:
+        candidate = path.with_suffix(f'.{fmt}')
+        if candidate.exists():
+            return candidate
+    return path
+
+
+def save_dataset(
+    df: pd.DataFrame,
+    path: Union[str, Path],
+    format: str = 'parquet',
+    export_csv: bool = False,
+    optimize: bool = True
+) -> Path:
+    """
+    Save a processed dataset in a columnar format.
+    
+    Parquet is used when pyarrow is installed, CSV otherwise. Sparse
+    columns (one-hot indicators) are written dense.
+    
+    Args:
+        df: Dataset to save (the index is not stored)
+        path: Target path, its extension is replaced by the format's
+        format: 'parquet' or 'csv'
+        export_csv: Also write a CSV copy next to the Parquet file
+        optimize: Compact column types first (see optimize_dtypes)
+        
+    Returns:
+        Path of the written dataset
+    """
+    if format not in DATASET_FORMATS:
+        raise ValueError(f"Unsupported dataset format: {format} (expected one of {DATASET_FORMATS})")
+    if format == 'parquet' and not PARQUET_AVAILABLE:
+        logging.warning("pyarrow not available. Dataset saved as CSV.")
+        format = 'csv'
+    
+    path = Path(path).with_suffix(f'.{format}')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    sparse_dtypes = {col: dtype.subtype for col, dtype in df.dtypes.items() if isinstance(dtype, pd.SparseDtype)}
+    if sparse_dtypes:
+        df = df.astype(sparse_dtypes)
+    
+    if format == 'parquet':
+        (optimize_dtypes(df) if optimize else df).to_parquet(path, index=False)
+    if format == 'csv' or export_csv:
+        df.to_csv(path.with_suffix('.csv'), index=False)
+    
+    logging.info(f"Dataset saved to {path}")
+    return path
+
+
+def load_dataset(
+    path: Union[str, Path],
+    columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Load a processed dataset saved by save_dataset (or any CSV).
+    
+    Args:
+        path: Dataset path, resolved with resolve_dataset_path
+        columns: Columns to read (projection pushed down to the reader);
+            columns absent from the dataset are ignored
+        
+    Returns:
+        Loaded DataFrame
+    """
+    path = resolve_dataset_path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Dataset not found: {path}")
+    
+    if path.suffix == '.parquet':
+        if columns is not None:
+            import pyarrow.parquet as pq
+            available = set(pq.read_schema(path).names)
+            columns = [col for col in columns if col in available]
+        return pd.read_parquet(path, columns=columns)
+    
+    wanted = None if columns is None else set(columns)
+    return pd.read_csv(path, usecols=None if wanted is None else (lambda col: col in wanted))
+
+
+def calculate_ks_statistic(
+    y_true: np.ndarray,
+    y_proba: np.ndarray,
+    sample_weight: Optional[np.ndarray] = None
+) -> float:
     """
     Calculate Kolmogorov-Smirnov statistic.
     
+    Same value as scipy's two-sample ks_2samp on the scores of each class,
+    computed by the single-sort kernel of src.metrics.
+    
     Args:
         y_true: True binary labels
         y_proba: Predicted probabilities
+        sample_weight: Optional observation weights
         
     Returns:
         KS statistic value
     """
-    from scipy.stats import ks_2samp
-    
-    # Split predictions by actual class
-    pos_scores = y_proba[y_true == 1]
-    neg_scores = y_proba[y_true == 0]
-    
-    # Calculate KS statistic
-    ks_stat, _ = ks_2samp(pos_scores, neg_scores)
-    return ks_stat
+    return score_metrics(y_true, y_proba, sample_weight, n_bins=1)['ks_statistic']
 
 
-def calculate_gini_coefficient(y_true: np.ndarray, y_proba: np.ndarray) -> float:
+def calculate_gini_coefficient(
+    y_true: np.ndarray,
+    y_proba: np.ndarray,
+    sample_weight: Optional[np.ndarray] = None
+) -> float:
     """
-    Calculate Gini coefficient from ROC AUC.
+    Calculate Gini coefficient from ROC AUC (2 * AUC - 1).
     
     Args:
         y_true: True binary labels
         y_proba: Predicted probabilities
+        sample_weight: Optional observation weights
         
     Returns:
         Gini coefficient
     """
-    from sklearn.metrics import roc_auc_score
-    
-    auc = roc_auc_score(y_true, y_proba)
-    gini = 2 * auc - 1
-    return gini
+    return score_metrics(y_true, y_proba, sample_weight, n_bins=1)['gini_coefficient']
 
 
 def calculate_psi(
@@ -253,7 +394,7 @@ def create_score_bands(
 def assign_risk_class(
     scores: np.ndarray,
     risk_bands: Dict[str, List[int]]
-) -> List[str]:
+) -> pd.Categorical:
     """
     Assign risk classes based on scores.
     
@@ -262,22 +403,11 @@ def assign_risk_class(
         risk_bands: Dictionary mapping risk levels to score ranges
         
     Returns:
-        List of risk classes
+        Categorical array of risk classes ("unknown" outside all bands)
     """
-    risk_classes = []
-    
-    for score in scores:
-        assigned = False
-        for risk_level, (min_score, max_score) in risk_bands.items():
-            if min_score <= score <= max_score:
-                risk_classes.append(risk_level)
-                assigned = True
-                break
-        
-        if not assigned:
-            risk_classes.append("unknown")
+    from .decision_engine import ScoreBanding
     
-    return risk_classes
+    return ScoreBanding.from_ranges(risk_bands, unknown_label="unknown").assign(scores)
 
 
 def validate_data_quality(
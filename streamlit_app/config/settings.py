@@ -5,6 +5,7 @@ Fichier de configuration centralisé pour l'application Streamlit
 """
 
 import os
+import sys
 from pathlib import Path
 from typing import Dict, Any
 
@@ -578,44 +579,68 @@ def validate_config() -> bool:
 # FONCTIONS UTILITAIRES MÉTIER
 # =============================================================================
 
+# Moteur de bandes vectorisé partagé avec le pipeline CLI (src/decision_engine.py)
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+from src.decision_engine import ScoreBanding
+
+RISK_BANDING = ScoreBanding.from_ranges(
+    {name: config["range"] for name, config in RISK_CLASSES.items()}, unknown_label="D"
+)
+RATING_BANDING = ScoreBanding.from_minimums(
+    {name: config["score_min"] for name, config in CLIENT_RATINGS.items()}, unknown_label="HIGH_RISK"
+)
+DECISION_BANDING = ScoreBanding.from_minimums(
+    {name: config["score_threshold"] for name, config in DECISION_MATRIX.items()}, unknown_label="REJECTED"
+)
+
+def get_risk_classes(scores) -> Any:
+    """Classes de risque (vectorisé) pour un ensemble de scores."""
+    return RISK_BANDING.assign(scores)
+
+def get_client_ratings(scores) -> Any:
+    """Notations client (vectorisé) pour un ensemble de scores."""
+    return RATING_BANDING.assign(scores)
+
+def get_final_decisions(scores) -> Any:
+    """Décisions finales (vectorisé) pour un ensemble de scores."""
+    return DECISION_BANDING.assign(scores)
+
 def get_risk_class(score: float) -> Dict[str, Any]:
     """Retourne la classe de risque basée sur le score."""
-    for class_name, config in RISK_CLASSES.items():
-        if config["range"][0] <= score <= config["range"][1]:
-            return {
-                "class": class_name,
-                "description": config["description"],
-                "color": config["color"],
-                "default_rate": config["default_rate"],
-                "range": config["range"]
-            }
-    return RISK_CLASSES["D"]  # Par défaut
+    class_name = RISK_BANDING.categories[RISK_BANDING.codes(score)[0]]
+    config = RISK_CLASSES[class_name]
+    return {
+        "class": class_name,
+        "description": config["description"],
+        "color": config["color"],
+        "default_rate": config["default_rate"],
+        "range": config["range"]
+    }
 
 def get_client_rating(score: float) -> Dict[str, Any]:
     """Retourne la notation client basée sur le score."""
-    for rating, config in CLIENT_RATINGS.items():
-        if score >= config["score_min"]:
-            return {
-                "rating": rating,
-                "benefits": config["benefits"],
-                "color": config["color"],
-                "score_min": config["score_min"]
-            }
-    return CLIENT_RATINGS["HIGH_RISK"]  # Par défaut
+    rating = RATING_BANDING.categories[RATING_BANDING.codes(score)[0]]
+    config = CLIENT_RATINGS[rating]
+    return {
+        "rating": rating,
+        "benefits": config["benefits"],
+        "color": config["color"],
+        "score_min": config["score_min"]
+    }
 
 def get_final_decision(score: float) -> Dict[str, Any]:
     """Retourne la décision finale basée sur le score."""
-    for decision, config in DECISION_MATRIX.items():
-        if score >= config["score_threshold"]:
-            return {
-                "decision": decision,
-                "message": config["message"],
-                "color": config["color"],
-                "icon": config["icon"],
-                "confidence": config["confidence"],
-                "threshold": config["score_threshold"]
-            }
-    return DECISION_MATRIX["REJECTED"]  # Par défaut
+    decision = DECISION_BANDING.categories[DECISION_BANDING.codes(score)[0]]
+    config = DECISION_MATRIX[decision]
+    return {
+        "decision": decision,
+        "message": config["message"],
+        "color": config["color"],
+        "icon": config["icon"],
+        "confidence": config["confidence"],
+        "threshold": config["score_threshold"]
+    }
 
 def probability_to_score(probability: float) -> int:
     """Convertit une probabilité de défaut en score sur 1000."""
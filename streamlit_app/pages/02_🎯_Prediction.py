@@ -72,7 +72,7 @@ def main():
         st.markdown('</div>', unsafe_allow_html=True)
         
         # Affichage des statuts système
-        display_system_status()
+        display_system_status(model_manager)
     
     with col2:
         if predict_button and client_data:
@@ -629,15 +629,20 @@ def create_temporal_analysis() -> go.Figure:
     
     return fig
 
-def display_system_status():
+def display_system_status(model_manager):
     """Affiche le statut du système."""
     
     st.markdown('<div class="metric-card" style="margin-top: 2rem;">', unsafe_allow_html=True)
     st.markdown("#### 🖥️ Statut Système")
     
-    # Simulation statuts
+    # Statut réel du modèle (registre partagé), autres statuts simulés
+    if model_manager.is_model_loaded():
+        model_status = (f"✅ Opérationnel ({model_manager.model_version})", "success")
+    else:
+        model_status = ("⚠️ Simulation (modèle indisponible)", "info")
+    
     statuses = [
-        ("Modèle", "✅ Opérationnel", "success"),
+        ("Modèle", *model_status),
         ("Base de données", "✅ Connectée", "success"), 
         ("API", "✅ Disponible", "success"),
         ("Cache", "⚡ Optimisé", "info")
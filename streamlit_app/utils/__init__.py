@@ -4,8 +4,10 @@ Utilities package for Credit Scoring Dashboard
 
 from .model_loader import ModelLoader
 from .data_processor import CreditScoringProcessor
+from .model_registry import ModelRegistry, get_model_registry
 
 # Alias pour compatibilité
 ModelManager = ModelLoader
 
-__all__ = ['ModelLoader', 'ModelManager', 'CreditScoringProcessor'] 
\ No newline at end of file
+__all__ = ['ModelLoader', 'ModelManager', 'CreditScoringProcessor',
+           'ModelRegistry', 'get_model_registry'] 
\ No newline at end of file
@@ -30,6 +30,7 @@ class CreditScoringProcessor:
     def __init__(self):
         """Initialisation du processeur."""
         self.feature_mappings = self._init_feature_mappings()
+        self.raw_mappings = self._init_raw_mappings()
         self.business_rules = self._init_business_rules()
         logger.info("CreditScoringProcessor initialisé avec succès")
     
@@ -106,6 +107,77 @@ class CreditScoringProcessor:
             }
         }
     
+    def _init_raw_mappings(self) -> Dict[str, Dict]:
+        """
+        Correspondances formulaire -> modalités des données d'entraînement (credit.csv nettoyé).
+        
+        Une valeur sans correspondance est laissée manquante et imputée par le
+        plan de nettoyage du modèle (mode des données d'entraînement).
+        """
+        return {
+            'objet': {
+                'car': 'voiture (nouveau)',
+                'furniture/equipment': 'mobilier / equipement',
+                'radio/TV': 'radio / television',
+                'domestic appliances': 'appareils menagers',
+                'repairs': 'reparations',
+                'education': 'education',
+                'business': 'business',
+                'vacation/others': 'vacances'
+            },
+            'epargne': {
+                'rich': 'superieur a 1000',
+                'quite rich': 'comprise entre 500 et 1000',
+                'little': 'inferieur a 100',
+                'critical': 'inferieur a 100',
+                'unknown': "compte d'epargne inconnu / non"
+            },
+            'compte': {
+                'rich': 'superieur ou egale a 200',
+                'moderate': 'superieur ou egale a 200',
+                'little': 'compris entre 0 et 200',
+                'critical': 'inferieur a 0',
+                'unknown': 'pas de compte courant'
+            },
+            'logement': {
+                'own': 'proprietaire',
+                'rent': 'locataire',
+                'free': 'logement gratuit'
+            },
+            'emploi': {
+                'management': 'cadres',
+                'entrepreneur': 'cadres',
+                'technician': 'employe qualifie / fonctionnaire',
+                'admin.': 'employe qualifie / fonctionnaire',
+                'services': 'employe qualifie / fonctionnaire',
+                'self-employed': 'employe qualifie / fonctionnaire',
+                'blue-collar': 'non qualifie',
+                'housemaid': 'non qualifie',
+                'unemployed': 'sans emploi',
+                'student': 'sans emploi'
+            },
+            'historique': {
+                'Excellent': 'tous les credits de cette banque ont ete rembourses',
+                'Bon': "credits deja rembourses jusqu'a maintenant",
+                'Moyen': 'retard dans le paiement dans le passe',
+                'Mauvais': 'compte critique /autres credits existants (pas dans cette banque)',
+                'Aucun historique': 'aucun credit pris /tous les credits ont ete rembourses'
+            },
+            # Clé (Sex, marital_status)
+            'statut': {
+                ('male', 'Célibataire'): 'celibataire',
+                ('male', 'Marié(e)'): 'homme: marie/veuf',
+                ('male', 'Veuf/Veuve'): 'homme: marie/veuf',
+                ('male', 'Union libre'): 'homme: marie/veuf',
+                ('male', 'Divorcé(e)'): 'homme:divorce/separe',
+                ('female', 'Célibataire'): 'celibataire',
+                ('female', 'Marié(e)'): 'femme:divorcee/separee/mariee',
+                ('female', 'Veuf/Veuve'): 'femme:divorcee/separee/mariee',
+                ('female', 'Union libre'): 'femme:divorcee/separee/mariee',
+                ('female', 'Divorcé(e)'): 'femme:divorcee/separee/mariee'
+            }
+        }
+    
     def _init_business_rules(self) -> Dict[str, Any]:
         """Initialise les règles métier pour l'analyse."""
         return {
@@ -147,15 +219,16 @@ class CreditScoringProcessor:
             # 2. Feature engineering
             engineered_features = self._engineer_features(validated_data)
             
-            # 3. Simulation de prédiction (remplacer par vraie prédiction)
-            probability_default = self._predict_default_probability(engineered_features)
+            # 3. Prédiction (simulation si le modèle est indisponible)
+            probabilities, model_version = self._predict_default_probabilities([engineered_features])
+            probability_default = probabilities[0]
             
             # 4. Calcul du score sur 1000
             credit_score = probability_to_score(probability_default)
             
             # 5. Analyse complète
             analysis_result = self._comprehensive_analysis(
-                validated_data, engineered_features, probability_default, credit_score
+                validated_data, engineered_features, probability_default, credit_score, model_version
             )
             
             logger.info(f"Traitement client terminé - Score: {credit_score}")
@@ -165,6 +238,36 @@ class CreditScoringProcessor:
             logger.error(f"Erreur traitement données client: {str(e)}")
             raise
     
+    def process_clients_batch(self, clients_data: List[Dict[str, Any]],
+                              strict: bool = False) -> List[Dict[str, Any]]:
+        """
+        Traite plusieurs demandes avec une seule prédiction du modèle.
+        
+        Validation, feature engineering et analyse restent calculés par client ;
+        seules les probabilités de défaut sont obtenues par un unique
+        `predict_proba` sur le lot.
+        
+        Args:
+            clients_data: Données de formulaire, une par client
+            strict: Propage les erreurs de scoring (modèle ou pipeline d'entrée
+                indisponible, échec du modèle) au lieu de simuler la prédiction
+            
+        Returns:
+            Résultats dans l'ordre des demandes (même format que process_client_data)
+        """
+        validated = [self._validate_client_data(data) for data in clients_data]
+        engineered = [self._engineer_features(data) for data in validated]
+        probabilities, model_version = self._predict_default_probabilities(engineered, strict=strict)
+        
+        results = []
+        for data, features, probability_default in zip(validated, engineered, probabilities):
+            credit_score = probability_to_score(probability_default)
+            results.append(self._comprehensive_analysis(data, features, probability_default,
+                                                        credit_score, model_version))
+        
+        logger.info(f"Traitement par lot terminé - {len(results)} client(s)")
+        return results
+    
     def _validate_client_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Valide et nettoie les données client."""
         validated = {}
@@ -366,32 +469,44 @@ class CreditScoringProcessor:
     
     def _predict_default_probability(self, features: Dict[str, Any]) -> float:
         """
-        Fait une prédiction avec le modèle Régression Logistique entraîné.
+        Fait une prédiction avec le modèle entraîné (simulation s'il est indisponible).
         """
-        try:
-            # Importer le modèle loader
-            from .model_loader import ModelLoader
-            
-            # Charger le modèle
-            model_loader = ModelLoader()
-            model, metadata = model_loader.load_model()
+        return self._predict_default_probabilities([features])[0][0]
+    
+    def _predict_default_probabilities(self, features_list: List[Dict[str, Any]],
+                                       strict: bool = False) -> Tuple[List[float], Optional[str]]:
+        """
+        Prédit les probabilités de défaut d'un lot de clients en un seul appel au modèle.
+        
+        Args:
+            features_list: Données validées et features engineered, une par client
+            strict: Propage les erreurs au lieu de simuler la prédiction
             
-            if model is None:
-                logger.warning("Modèle non disponible, utilisation de la simulation")
-                return self._simulate_prediction(features)
+        Returns:
+            Tuple (probabilités, version du modèle utilisé ; None si simulées)
+        """
+        try:
+            # Modèle partagé par le processus (chargé une seule fois par version)
+            from .model_registry import get_model_registry
+            entry = get_model_registry().get()
             
-            # Préparer les données pour le modèle
-            model_features = self._prepare_features_for_model(features)
+            # Matrice attendue par le modèle (une ligne par client)
+            model_features = self._prepare_features_for_model(features_list, entry)
             
-            # Faire la prédiction
-            probability = model.predict_proba(model_features)[0][1]  # Probabilité de défaut
+            # Faire la prédiction (scoreur linéaire rapide si disponible)
+            if entry['fast_scorer'] is not None:
+                probabilities = entry['fast_scorer'].predict_proba(model_features)
+            else:
+                probabilities = entry['model'].predict_proba(model_features)[:, 1]  # Probabilité de défaut
             
-            logger.info(f"Prédiction avec modèle réel: {probability:.3f}")
-            return probability
+            logger.info(f"Prédiction avec modèle réel: {len(features_list)} client(s)")
+            return [float(p) for p in probabilities], entry['version']
             
         except Exception as e:
-            logger.warning(f"Erreur lors de l'utilisation du modèle, utilisation de la simulation: {str(e)}")
-            return self._simulate_prediction(features)
+            if strict:
+                raise
+            logger.warning(f"Modèle inutilisable, utilisation de la simulation: {str(e)}")
+            return [self._simulate_prediction(features) for features in features_list], None
     
     def _simulate_prediction(self, features: Dict[str, Any]) -> float:
         """
@@ -433,42 +548,79 @@ class CreditScoringProcessor:
         # Contraindre entre 0.05 et 0.95
         return max(0.05, min(0.95, probability))
     
-    def _prepare_features_for_model(self, features: Dict[str, Any]) -> pd.DataFrame:
+    def _to_raw_record(self, features: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Prépare les features pour qu'elles soient compatibles avec le modèle entraîné.
+        Traduit une demande du formulaire dans le schéma brut des données d'entraînement.
+        
+        Les variables sans équivalent dans le formulaire restent à None.
         """
-        # Créer un DataFrame avec les features attendues par le modèle
-        model_data = {
-            'Age': features['Age'],
-            'Job': features['Job'],
-            'Housing': features['Housing'],
-            'Saving_accounts': features['Saving_accounts'],
-            'Checking_account': features['Checking_account'], 
-            'Credit_amount': features['Credit_amount'],
-            'Duration': features['Duration'],
-            'Purpose': features['Purpose'],
-            'Sex': features['Sex']
-        }
+        mappings = self.raw_mappings
+        
+        # Taux d'effort de la mensualité sur le revenu mensuel
+        monthly_income = features.get('monthly_income', 0)
+        installment_rate = features['Credit_amount'] / features['Duration'] / monthly_income if monthly_income > 0 else None
+        if installment_rate is None:
+            taux_endettement = None
+        elif installment_rate < 0.20:
+            taux_endettement = 'inferieur a 20%'
+        elif installment_rate < 0.25:
+            taux_endettement = 'compris entre 20% et 25%'
+        elif installment_rate < 0.35:
+            taux_endettement = 'compris entre 25% et 35%'
+        else:
+            taux_endettement = 'superieur a 35%'
         
-        # Ajouter les features engineered si elles existent
-        if 'Income_Credit_Ratio' in features:
-            model_data['Income_Credit_Ratio'] = features['Income_Credit_Ratio']
-        if 'Duration_Risk_Score' in features:
-            model_data['Duration_Risk_Score'] = features['Duration_Risk_Score']
-        if 'Financial_Stability_Score' in features:
-            model_data['Financial_Stability_Score'] = features['Financial_Stability_Score']
+        return {
+            'duree': features['Duration'],
+            'montant': features['Credit_amount'],
+            'age': features['Age'],
+            'historique': mappings['historique'].get(features.get('payment_history')),
+            'objet': mappings['objet'].get(features.get('Purpose')),
+            'epargne': mappings['epargne'].get(features.get('Saving_accounts')),
+            'compte': mappings['compte'].get(features.get('Checking_account')),
+            'logement': mappings['logement'].get(features.get('Housing')),
+            'emploi': mappings['emploi'].get(features.get('Job')),
+            'anciennete_emploi': 'sans emploi' if features.get('Job') == 'unemployed' else None,
+            'statut': mappings['statut'].get((features.get('Sex'), features.get('marital_status'))),
+            'taux_endettement': taux_endettement,
+            'credit_exterieur': 'banque' if features.get('existing_debt', 0) > 0 else 'aucun credit'
+        }
+    
+    def _prepare_features_for_model(self, features_list: List[Dict[str, Any]],
+                                    entry: Dict[str, Any]) -> np.ndarray:
+        """
+        Calcule la matrice attendue par le modèle : schéma brut, plan de
+        nettoyage puis graphe de scoring compilé du modèle.
         
-        df = pd.DataFrame([model_data])
-        return df
+        Args:
+            features_list: Données validées et features engineered, une par client
+            entry: Entrée du registre de modèles
+            
+        Returns:
+            Array (n_clients, n_features) dans l'ordre des colonnes du modèle
+            
+        Raises:
+            ValueError: Si le pipeline d'entrée du modèle est indisponible
+        """
+        if entry['scoring_graph'] is None:
+            raise ValueError(f"Pipeline d'entrée indisponible pour le modèle {entry['version']} "
+                             f"(lancer process-data puis train-model)")
+        
+        raw_columns = [col for col in entry['cleaning_plan'].fill_values if col != 'cible']
+        raw = pd.DataFrame([self._to_raw_record(features) for features in features_list],
+                           columns=raw_columns, dtype=object)
+        raw[['duree', 'montant', 'age']] = raw[['duree', 'montant', 'age']].astype(float)
+        return entry['scoring_graph'].transform(entry['cleaning_plan'].clean(raw))
     
     def _comprehensive_analysis(
         self, 
         client_data: Dict[str, Any],
         features: Dict[str, Any], 
         probability: float, 
-        score: int
+        score: int,
+        model_version: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Génère l'analyse complète du client."""
+        """Génère l'analyse complète du client (model_version None = prédiction simulée)."""
         
         # Métriques de base
         risk_class = get_risk_class(score)
@@ -520,7 +672,8 @@ class CreditScoringProcessor:
             
             # Métadonnées
             'analysis_timestamp': datetime.now().isoformat(),
-            'model_version': "1.0.0",
+            'model_version': model_version,
+            'simulated': model_version is None,
             'confidence_level': self._calculate_confidence_level(features)
         }
         
@@ -18,7 +18,7 @@ import json
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import streamlit as st
 from datetime import datetime
 import logging
@@ -27,92 +27,135 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Accès aux modules du projet (src/)
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+from src.data_processing import CleaningPlan
+from src.linear_scorer import LinearScorer
+from src.model_artifact import ModelArtifact, is_artifact, list_artifacts
+from src.model_index import INDEX_FILENAME, DEFAULT_SELECTION_RULES, ModelIndex
+from src.transformers import CompiledScoringGraph, FeatureEngineer
+
+from .model_registry import get_model_registry
+
 class ModelLoader:
     """
     Classe pour charger et gérer le modèle de credit scoring.
     
     Fonctionnalités:
-    - Chargement automatique du meilleur modèle
-    - Cache intelligent pour les performances
+    - Chargement automatique du meilleur modèle (index SQLite, règles de sélection)
+    - Registre partagé par processus (un chargement par version, remplacement à chaud)
     - Validation de l'intégrité du modèle
     - Gestion des erreurs robuste
     - Logging détaillé des opérations
     """
     
-    def __init__(self):
-        """Initialise le loader avec les chemins du projet"""
+    def __init__(self, selection_rules: Optional[List[str]] = None):
+        """
+        Initialise le loader avec les chemins du projet
+        
+        Args:
+            selection_rules: Règles de sélection essayées dans l'ordre
+                ('pinned', 'latest_production', 'best_auc', 'version:<nom>')
+        """
         self.project_root = Path(__file__).parent.parent.parent
         self.modeling_path = self.project_root / "modeling"
         self.models_path = self.modeling_path / "models"
         self.final_models_path = self.models_path / "final_models"
+        self.artifacts_path = self.models_path / "artifacts"
+        self.processed_data_path = self.project_root / "data" / "processed"
+        self.index_path = self.models_path / INDEX_FILENAME
+        self.selection_rules = list(selection_rules or DEFAULT_SELECTION_RULES)
         
-        self.model = None
+        self.fast_scorer = None
         self.model_metadata = None
         self.model_features = None
         self.model_version = None
         self.last_loaded = None
+        self._registry_entry = None
         
         logger.info(f"🚀 ModelLoader initialisé - Projet: {self.project_root}")
     
-    @st.cache_resource
-    def load_model(_self) -> Tuple[Any, Dict]:
+    def load_model(self) -> Tuple[Any, Dict]:
         """
-        Charge le modèle de credit scoring avec cache Streamlit.
+        Charge le modèle de credit scoring via le registre du processus.
+        
+        Le fichier n'est chargé et validé qu'une fois par version ; les appels
+        suivants réutilisent le modèle partagé (remplacé à chaud si un modèle
+        plus récent apparaît dans final_models/).
         
         Returns:
             Tuple[model, metadata]: Le modèle chargé et ses métadonnées
-            
-        Raises:
-            FileNotFoundError: Si aucun modèle n'est trouvé
-            Exception: Si erreur de chargement
+        """
+        if self._current_entry() is None:
+            return None, None
+        return self.model, self.model_metadata
+    
+    @property
+    def model(self) -> Any:
+        """Estimateur courant (désérialisé au premier accès pour un artefact linéaire)"""
+        return self._registry_entry['model'] if self._registry_entry is not None else None
+    
+    def _current_entry(self) -> Optional[Dict[str, Any]]:
+        """
+        Entrée courante du registre, sans forcer le chargement de l'estimateur.
+        
+        Returns:
+            Entrée du registre, ou None si aucun modèle n'a pu être chargé
         """
         try:
-            logger.info("🔄 Début du chargement du modèle...")
-            
-            # 1. Recherche du meilleur modèle
-            model_path = _self._find_best_model()
-            
-            # 2. Chargement du modèle
-            logger.info(f"📥 Chargement du modèle: {model_path}")
-            model = _self._load_model_file(model_path)
-            
-            # 3. Chargement des métadonnées
-            metadata = _self._load_metadata(model_path)
-            
-            # 4. Validation du modèle
-            _self._validate_model(model, metadata)
-            
-            # 5. Chargement des features
-            features = _self._get_model_features()
+            entry = get_model_registry().get()
             
-            _self.model = model
-            _self.model_metadata = metadata
-            _self.model_features = features
-            _self.last_loaded = datetime.now()
+            if entry is not self._registry_entry:
+                self._registry_entry = entry
+                self.fast_scorer = entry['fast_scorer']
+                self.model_metadata = entry['metadata']
+                self.model_features = entry['features']
+                self.model_version = entry['version']
+                self.last_loaded = entry['loaded_at']
+                logger.info(f"✅ Modèle disponible: {self.model_version}")
             
-            logger.info("✅ Modèle chargé avec succès!")
-            
-            return model, metadata
+            return entry
             
         except Exception as e:
             logger.error(f"❌ Erreur lors du chargement du modèle: {str(e)}")
             st.error(f"Erreur chargement modèle: {str(e)}")
-            return None, None
+            return None
+    
+    def is_model_loaded(self) -> bool:
+        """
+        Indique si un modèle est disponible (le charge si nécessaire).
+        
+        Returns:
+            True si un modèle est chargé
+        """
+        return self._current_entry() is not None
     
     def _find_best_model(self) -> Path:
         """
         Trouve le meilleur modèle disponible.
         
         Returns:
-            Chemin vers le modèle
+            Chemin vers le modèle (répertoire d'artefact ou fichier .pkl)
         """
-        # Option 1: Modèle dans final_models/ (le plus récent)
+        # Option 0: Index des modèles (alias résolus par clé, sans scan du répertoire)
+        record = self._index_record()
+        if record is not None:
+            return Path(record['path'])
+        
+        # Option 1: Artefacts versionnés, classés depuis leurs manifestes (AUC puis date)
+        artifacts = list_artifacts(self.artifacts_path)
+        if artifacts:
+            return artifacts[0].path
+        
+        # Option 2: Modèle dans final_models/ (le plus récent)
         if self.final_models_path.exists():
             model_files = list(self.final_models_path.glob("*.pkl"))
             if model_files:
                 return max(model_files, key=lambda x: x.stat().st_mtime)
         
-        # Option 2: best_model.pkl dans models/
+        # Option 3: best_model.pkl dans models/
         best_model = self.models_path / "best_model.pkl"
         if best_model.exists():
             logger.info("🎯 Utilisation de best_model.pkl")
@@ -126,6 +169,30 @@ class ModelLoader:
             f"Vérifiez que la Phase 1 est terminée."
         )
     
+    def _model_index(self) -> Optional[ModelIndex]:
+        """Index des modèles (None tant qu'aucun modèle n'a été indexé)"""
+        return ModelIndex(self.index_path) if self.index_path.exists() else None
+    
+    def _index_record(self, model_path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+        """
+        Enregistrement de l'index pour un chemin, ou désigné par les règles de sélection.
+        
+        Les enregistrements dont le fichier a disparu sont ignorés.
+        """
+        index = self._model_index()
+        if index is None:
+            return None
+        
+        if model_path is not None:
+            return index.find_by_path(model_path)
+        
+        for rule in self.selection_rules:
+            record = index.resolve(rule)
+            if record is not None and Path(record['path']).exists():
+                logger.info(f"🗂️ Modèle sélectionné par l'index ({rule}): {record['version']}")
+                return record
+        return None
+    
     def _load_model_file(self, model_path: Path) -> Any:
         """
         Charge le fichier modèle (pickle ou joblib).
@@ -136,20 +203,108 @@ class ModelLoader:
         Returns:
             Le modèle chargé
         """
+        # Artefact : seul l'estimateur est désérialisé
+        if is_artifact(model_path):
+            logger.info("📦 Modèle chargé depuis l'artefact")
+            return ModelArtifact(model_path).estimator
+        
         try:
             # Essayer pickle d'abord
             with open(model_path, 'rb') as f:
                 model = pickle.load(f)
             logger.info("📦 Modèle chargé avec pickle")
-            return model
         except:
             try:
                 # Essayer joblib
                 model = joblib.load(model_path)
                 logger.info("📦 Modèle chargé avec joblib")
-                return model
             except Exception as e:
                 raise Exception(f"Impossible de charger le modèle: {str(e)}")
+        
+        # Les modèles sauvegardés par TrainingPipeline sont des dictionnaires
+        if isinstance(model, dict) and 'model' in model:
+            model = model['model']
+        return model
+    
+    def _load_artifact_scorer(self, model_path: Path) -> Optional[LinearScorer]:
+        """
+        Scoreur rapide lu depuis les arrays memory-mappés d'un artefact.
+        
+        Le scoreur a été vérifié contre l'estimateur lors de la sauvegarde :
+        l'estimateur n'a pas besoin d'être désérialisé pour scorer.
+        
+        Args:
+            model_path: Chemin vers le modèle
+            
+        Returns:
+            Le scoreur rapide, ou None si le chemin n'est pas un artefact linéaire
+        """
+        if not is_artifact(model_path):
+            return None
+        
+        scorer = ModelArtifact(model_path).linear_scorer()
+        if scorer is not None:
+            logger.info(f"⚡ Scoring rapide depuis l'artefact ({scorer.method}, {scorer.n_models} modèle(s))")
+        return scorer
+    
+    def _load_input_pipeline(self, model_path: Path,
+                             feature_names: Optional[List[str]] = None) -> Tuple[Any, Any]:
+        """
+        Pipeline d'entrée du modèle : plan de nettoyage et graphe de scoring compilé.
+        
+        Pris dans l'artefact, sinon dans les sorties du pipeline de données
+        (data/processed) pour les modèles qui ne l'embarquent pas.
+        
+        Args:
+            model_path: Chemin vers le modèle
+            feature_names: Colonnes attendues par le modèle, dans l'ordre
+            
+        Returns:
+            Tuple (CleaningPlan, CompiledScoringGraph), ou (None, None) si indisponible
+        """
+        if is_artifact(model_path):
+            artifact = ModelArtifact(model_path)
+            cleaning_plan, scoring_graph = artifact.cleaning_plan(), artifact.scoring_graph()
+            if cleaning_plan is not None and scoring_graph is not None:
+                return cleaning_plan, scoring_graph
+        
+        plan_path = self.processed_data_path / "cleaning_plan.json"
+        state_path = self.processed_data_path / "feature_engineer_state.json"
+        transformer_path = self.processed_data_path / "variable_transformer.joblib"
+        if not (plan_path.exists() and state_path.exists() and transformer_path.exists()):
+            logger.warning("⚠️ Pipeline d'entrée du modèle indisponible (lancer process-data puis train-model)")
+            return None, None
+        
+        scoring_graph = CompiledScoringGraph(FeatureEngineer.load_state(state_path), joblib.load(transformer_path),
+                                             output_features=feature_names)
+        logger.info(f"🔧 Pipeline d'entrée repris de {self.processed_data_path}")
+        return CleaningPlan.load(plan_path), scoring_graph
+    
+    def _build_fast_scorer(self, model: Any) -> Optional[LinearScorer]:
+        """
+        Exporte le modèle vers un LinearScorer et vérifie son équivalence.
+        
+        Args:
+            model: Le modèle chargé
+            
+        Returns:
+            Le scoreur rapide, ou None si le modèle n'est pas linéaire ou si
+            les probabilités diffèrent de sklearn au-delà de la tolérance
+        """
+        try:
+            scorer = LinearScorer.from_model(model)
+        except (ValueError, AttributeError) as e:
+            logger.info(f"ℹ️ Scoring rapide indisponible: {str(e)}")
+            return None
+        
+        check_data = np.random.random((100, scorer.n_features))
+        report = scorer.verify(model, check_data, tolerance=1e-9)
+        if not report['within_tolerance']:
+            logger.warning(f"⚠️ Scoring rapide désactivé: écart max {report['max_abs_diff']:.2e}")
+            return None
+        
+        logger.info(f"⚡ Scoring rapide activé ({scorer.method}, {scorer.n_models} modèle(s))")
+        return scorer
     
     def _load_metadata(self, model_path: Path) -> Dict:
         """
@@ -161,6 +316,39 @@ class ModelLoader:
         Returns:
             Dict avec les métadonnées
         """
+        # Modèle indexé : métriques et statut lus dans l'index
+        record = self._index_record(model_path)
+        if record is not None:
+            metadata = record['metadata']
+            return {
+                "model_type": metadata.get('model_type'),
+                "model_version": record['version'],
+                "auc_roc": record['auc_roc'],
+                "ks_statistic": record['ks_statistic'],
+                "gini_coefficient": record['gini_coefficient'],
+                "production_ready": record['production_ready'],
+                "algorithm": metadata.get('model_type'),
+                "training_date": record['trained_at'],
+                "sha256": record['sha256'],
+                "performance_summary": metadata.get('metrics', {})
+            }
+        
+        # Artefact : métadonnées lues dans le manifeste
+        if is_artifact(model_path):
+            manifest = ModelArtifact(model_path).manifest
+            metrics = manifest.get('metrics', {})
+            return {
+                "model_type": manifest.get('model_type'),
+                "model_version": manifest.get('version'),
+                "auc_roc": metrics.get('auc_roc'),
+                "ks_statistic": metrics.get('ks_statistic'),
+                "gini_coefficient": metrics.get('gini_coefficient'),
+                "production_ready": manifest.get('metadata', {}).get('production_ready', True),
+                "algorithm": manifest.get('base_estimator') or manifest.get('model_type'),
+                "training_date": manifest.get('created_at'),
+                "performance_summary": metrics
+            }
+        
         # Métadonnées par défaut
         metadata = {
             "model_type": "LogisticRegression",
@@ -195,7 +383,7 @@ class ModelLoader:
                 raise Exception("Le modèle n'a pas de méthode predict")
             
             # Test avec des données factices
-            n_features = getattr(model, 'n_features_in_', 15)  # Default à 15
+            n_features = getattr(model, 'n_features_in_', getattr(model, 'n_features', 15))  # Default à 15
             test_data = np.random.random((1, n_features))
             
             # Test prédiction
@@ -244,19 +432,49 @@ class ModelLoader:
         Returns:
             Dict avec toutes les informations du modèle
         """
-        if not self.model:
-            self.load_model()
+        entry = self._current_entry()
         
         return {
-            'model_loaded': self.model is not None,
+            'model_loaded': entry is not None,
+            'model_version': self.model_version,
             'last_loaded': self.last_loaded,
             'metadata': self.model_metadata,
             'features': self.model_features,
             'n_features': len(self.model_features) if self.model_features else 0,
-            'model_type': type(self.model).__name__ if self.model else None,
-            'performance': self.model_metadata.get('performance_summary', {}) if self.model_metadata else {}
+            'model_type': entry['model_type'] if entry is not None else None,
+            'performance': self.model_metadata.get('performance_summary', {}) if self.model_metadata else {},
+            'available_models': self.list_models()
         }
     
+    def list_models(self) -> list:
+        """
+        Liste les modèles disponibles, classés par AUC.
+        
+        Aucun estimateur n'est désérialisé : les modèles sont lus dans l'index,
+        à défaut dans le manifeste JSON de chaque artefact.
+        
+        Returns:
+            Liste de résumés (du meilleur au moins bon)
+        """
+        index = self._model_index()
+        if index is not None:
+            aliases = index.aliases()
+            return [
+                {
+                    'name': record['version'],
+                    'path': record['path'],
+                    'created_at': record['trained_at'],
+                    'auc_roc': record['auc_roc'],
+                    'ks_statistic': record['ks_statistic'],
+                    'gini_coefficient': record['gini_coefficient'],
+                    'n_features': record['n_features'],
+                    'production_ready': record['production_ready'],
+                    'aliases': [alias for alias, version in aliases.items() if version == record['version']]
+                }
+                for record in index.list()
+            ]
+        return [artifact.summary() for artifact in list_artifacts(self.artifacts_path)]
+    
     def predict(self, data: pd.DataFrame) -> Dict[str, Any]:
         """
         Fait une prédiction avec le modèle chargé.
@@ -267,13 +485,17 @@ class ModelLoader:
         Returns:
             Dict avec les résultats de prédiction
         """
-        if not self.model:
-            self.load_model()
+        self._current_entry()
         
         try:
-            # Prédiction
-            prediction = self.model.predict(data)[0]
-            probabilities = self.model.predict_proba(data)[0]
+            # Prédiction (produit matriciel direct si le scoreur rapide est disponible)
+            if self.fast_scorer is not None:
+                default_probability = float(self.fast_scorer.predict_proba(data)[0])
+                probabilities = np.array([1.0 - default_probability, default_probability])
+                prediction = int(default_probability > 0.5)
+            else:
+                prediction = self.model.predict(data)[0]
+                probabilities = self.model.predict_proba(data)[0]
             
             # Score de risque (0-100)
             risk_probability = probabilities[1] if len(probabilities) > 1 else probabilities[0]
@@ -0,0 +1,289 @@
+"""
+🗂️ MODEL REGISTRY - MODÈLES PARTAGÉS PAR PROCESSUS
+==================================================
+
+Registre unique par processus des modèles chargés : un seul chargement par
+version, partagé par le ModelLoader, le CreditScoringProcessor et les pages.
+Utilisable depuis les threads de script Streamlit, avec remplacement à chaud
+du modèle lorsqu'un nouveau modèle (artefact ou fichier de final_models/)
+devient le meilleur candidat.
+
+Auteur: Équipe Data Science
+Version: 1.0.0
+"""
+
+import time
+import threading
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _version_name(path: Path) -> str:
+    """Nom de version : répertoire d'artefact ou nom du fichier sans extension"""
+    return path.name if path.is_dir() else path.stem
+
+
+def _file_signature(path: Path) -> tuple:
+    """Signature d'un modèle : chemin + date de modification (du manifeste pour un artefact)"""
+    target = path / 'manifest.json' if path.is_dir() else path
+    return (str(path), target.stat().st_mtime_ns)
+
+
+class _RegistryEntry(dict):
+    """
+    Entrée du registre dont l'estimateur peut être chargé à la demande.
+
+    Sans clé 'model', le premier accès à entry['model'] appelle `load_model`
+    (artefact linéaire servi par son scoreur memory-mappé).
+    """
+
+    def __init__(self, *args, load_model=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._load_model = load_model
+        self._model_lock = threading.Lock()
+
+    def __missing__(self, key):
+        if key != 'model' or self._load_model is None:
+            raise KeyError(key)
+        with self._model_lock:
+            if 'model' not in self:
+                logger.info(f"📥 Chargement différé de l'estimateur: {self.get('version')}")
+                self['model'] = self._load_model()
+        return dict.__getitem__(self, 'model')
+
+
+class ModelRegistry:
+    """
+    Registre thread-safe des modèles chargés.
+
+    - Une entrée par version (nom du fichier modèle), chargée une seule fois
+    - La version courante est celle choisie par le loader (règles de sélection
+      de l'index des modèles, sinon meilleur artefact selon les manifestes,
+      sinon le plus récent de final_models/, sinon best_model.pkl)
+    - Le répertoire est re-vérifié au plus toutes les `check_interval`
+      secondes ; un nouveau fichier est chargé pendant que les lecteurs
+      continuent d'utiliser l'ancien modèle, puis remplace la version courante
+    """
+
+    def __init__(self, loader: Any, check_interval: float = 5.0, max_versions: int = 3):
+        """
+        Args:
+            loader: ModelLoader fournissant la recherche et le chargement des fichiers
+            check_interval: Délai minimal (secondes) entre deux scans du répertoire
+            max_versions: Nombre maximal de versions gardées en mémoire
+        """
+        self.loader = loader
+        self.check_interval = check_interval
+        self.max_versions = max_versions
+
+        self._lock = threading.RLock()        # Accès aux entrées
+        self._load_lock = threading.Lock()    # Un seul chargement à la fois
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._current_version: Optional[str] = None
+        self._current_signature = None
+        self._last_check = float('-inf')
+
+    def get(self, version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Retourne le modèle demandé (chargé au premier accès).
+
+        Args:
+            version: Version (nom du fichier sans extension) ; None = version courante
+
+        Returns:
+            Entrée du registre: version, path, signature, model, model_type,
+            metadata, features, fast_scorer, cleaning_plan, scoring_graph,
+            loaded_at (pour un artefact linéaire, 'model' n'est désérialisé
+            qu'au premier accès ; cleaning_plan et scoring_graph valent None
+            si le pipeline d'entrée du modèle est indisponible)
+
+        Raises:
+            FileNotFoundError: Si aucun modèle n'est disponible
+        """
+        if version is not None:
+            return self._get_version(version)
+
+        self.refresh()
+        with self._lock:
+            return self._models[self._current_version]
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Re-scanne le répertoire des modèles et bascule sur un fichier plus récent.
+
+        Args:
+            force: Ignore le délai minimal entre deux scans
+
+        Returns:
+            True si la version courante a changé
+        """
+        if not force and self._current_version is not None and \
+                time.monotonic() - self._last_check < self.check_interval:
+            return False
+
+        with self._load_lock:
+            # Un autre thread a pu rafraîchir pendant l'attente du verrou
+            if not force and self._current_version is not None and \
+                    time.monotonic() - self._last_check < self.check_interval:
+                return False
+
+            try:
+                path = self.loader._find_best_model()
+                signature = _file_signature(path)
+            except FileNotFoundError:
+                if self._current_version is None:
+                    raise
+                logger.warning("⚠️ Aucun fichier modèle trouvé, conservation du modèle courant")
+                self._last_check = time.monotonic()
+                return False
+
+            self._last_check = time.monotonic()
+            if signature == self._current_signature:
+                return False
+
+            # Version déjà en mémoire et fichier inchangé : pas de rechargement
+            with self._lock:
+                entry = self._models.get(_version_name(path))
+            if entry is None or entry['signature'] != signature:
+                entry = self._load(path)
+
+            with self._lock:
+                previous = self._current_version
+                self._models[entry['version']] = entry
+                self._current_version = entry['version']
+                self._current_signature = signature
+                self._evict()
+
+        if previous is not None:
+            logger.info(f"🔄 Modèle remplacé à chaud: {previous} → {entry['version']}")
+        return True
+
+    def _get_version(self, version: str) -> Dict[str, Any]:
+        """Retourne une version précise, chargée depuis son fichier si besoin"""
+        with self._lock:
+            if version in self._models:
+                return self._models[version]
+
+        with self._load_lock:
+            with self._lock:
+                if version in self._models:
+                    return self._models[version]
+
+            index = self.loader._model_index()
+            record = index.get(version) if index is not None else None
+            candidates = [Path(record['path'])] if record is not None else []
+            candidates += [self.loader.artifacts_path / version,
+                          self.loader.final_models_path / f"{version}.pkl",
+                          self.loader.models_path / f"{version}.pkl"]
+            path = next((p for p in candidates if p.exists()), None)
+            if path is None:
+                raise FileNotFoundError(f"Version de modèle introuvable: {version}")
+
+            entry = self._load(path)
+            with self._lock:
+                self._models[version] = entry
+                self._evict()
+            return entry
+
+    def _load(self, path: Path) -> Dict[str, Any]:
+        """
+        Charge, valide et prépare un fichier modèle (appelé sous _load_lock)
+
+        Pour un artefact linéaire, le scoreur rapide est lu depuis ses arrays
+        memory-mappés et l'estimateur n'est désérialisé que si un appelant
+        accède à entry['model'].
+        """
+        logger.info(f"📥 Chargement du modèle: {path}")
+        metadata = self.loader._load_metadata(path)
+        fast_scorer = self.loader._load_artifact_scorer(path)
+
+        if fast_scorer is not None:
+            self.loader._validate_model(fast_scorer, metadata)
+            entry = _RegistryEntry(load_model=lambda: self.loader._load_model_file(path))
+            model_type = metadata.get('model_type')
+            feature_names = fast_scorer.feature_names or None
+        else:
+            model = self.loader._load_model_file(path)
+            self.loader._validate_model(model, metadata)
+            entry = _RegistryEntry(model=model)
+            fast_scorer = self.loader._build_fast_scorer(model)
+            model_type = type(model).__name__
+            feature_names = getattr(model, 'feature_names_in_', None)
+
+        cleaning_plan, scoring_graph = self.loader._load_input_pipeline(path, feature_names)
+        entry.update({
+            'version': _version_name(path),
+            'path': path,
+            'signature': _file_signature(path),
+            'model_type': model_type,
+            'metadata': metadata,
+            'features': scoring_graph.output_features if scoring_graph is not None
+                        else self.loader._get_model_features(),
+            'fast_scorer': fast_scorer,
+            'cleaning_plan': cleaning_plan,
+            'scoring_graph': scoring_graph,
+            'loaded_at': datetime.now()
+        })
+        return entry
+
+    def _evict(self):
+        """Libère les versions les plus anciennes au-delà de max_versions"""
+        while len(self._models) > self.max_versions:
+            oldest = min(
+                (v for v in self._models if v != self._current_version),
+                key=lambda v: self._models[v]['loaded_at']
+            )
+            del self._models[oldest]
+            logger.info(f"🗑️ Version libérée du registre: {oldest}")
+
+    @property
+    def current_version(self) -> Optional[str]:
+        """Version courante (None si aucun modèle chargé)"""
+        return self._current_version
+
+    def loaded_versions(self) -> List[str]:
+        """Versions actuellement en mémoire"""
+        with self._lock:
+            return list(self._models)
+
+    def current_entry(self) -> Optional[Dict[str, Any]]:
+        """Entrée courante sans re-scan ni chargement (None si aucun modèle chargé)"""
+        with self._lock:
+            return self._models.get(self._current_version)
+
+    def is_loaded(self) -> bool:
+        """Indique si un modèle courant est chargé"""
+        return self._current_version is not None
+
+    def clear(self):
+        """Vide le registre (le prochain accès recharge le modèle)"""
+        with self._load_lock, self._lock:
+            self._models.clear()
+            self._current_version = None
+            self._current_signature = None
+            self._last_check = float('-inf')
+
+
+# Registre unique du processus
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Retourne le registre de modèles du processus (créé au premier appel).
+
+    Returns:
+        ModelRegistry partagé
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                from .model_loader import ModelLoader
+                _registry = ModelRegistry(ModelLoader())
+    return _registry